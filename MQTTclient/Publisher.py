@@ -26,10 +26,17 @@ class Publisher:
         print(str(rc))
 
     def publish(self, topic, message):
+        # 연결이 끊겨 보내지 못했다면 False를 반환합니다.
         if isinstance(message, bytes):
-            self.client.publish(topic, message)
+            result = self.client.publish(topic, message)
         else:
-            self.client.publish(topic, message.encode('utf8'))
+            result = self.client.publish(topic, message.encode('utf8'))
+
+        return result.rc == mqtt.MQTT_ERR_SUCCESS
+
+    def close(self):
+        self.client.loop_stop()
+        self.client.disconnect()
 
     
 
@@ -0,0 +1,36 @@
+from typing import Optional
+
+class RateFeedback:
+    """
+    Controller가 sender에게 보내는 전송 fps 조절용 정보입니다.
+
+    Attributes:
+        _arrival_rate (float): 마지막으로 스케줄링한 경로의 backlog와 작업을 처리하는 데 걸리는 예상 시간. (sec)
+        _latency (Optional[float]): sender가 보낸 작업들의 최근 종단 간 지연 시간의 지수 이동 평균. (ms) 끝난 작업이 없다면 None.
+        _job_name (Optional[str]): 피드백 대상 작업 이름. None이라면 sender의 모든 작업에 해당합니다.
+        _congested (bool): 가중치가 더 큰 작업이 SLO를 넘기고 있어 전송 fps를 줄여야 하는지 여부.
+    """
+    def __init__(self, arrival_rate: float, latency: Optional[float], job_name: Optional[str] = None, congested: bool = False):
+        self._arrival_rate: float = arrival_rate
+        self._latency: Optional[float] = latency
+        self._job_name: Optional[str] = job_name
+        self._congested: bool = congested
+
+    @property
+    def arrival_rate(self) -> float:
+        return self._arrival_rate
+
+    @property
+    def latency(self) -> Optional[float]:
+        """
+        최근 종단 간 지연 시간을 반환합니다. (ms)
+        """
+        return self._latency
+
+    @property
+    def job_name(self) -> Optional[str]:
+        return self._job_name
+
+    @property
+    def congested(self) -> bool:
+        return self._congested
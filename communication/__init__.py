@@ -2,4 +2,5 @@ from communication.RequestConfig import RequestConfig
 from communication.NodeLinkInfo import NodeLinkInfo
 from communication.RequestBacklog import RequestBacklog
 from communication.RequestNetworkPerformance import RequestNetworkPerformance
-from communication.NetworkPerformance import NetworkPerformance
\ No newline at end of file
+from communication.NetworkPerformance import NetworkPerformance
+from communication.RateFeedback import RateFeedback
\ No newline at end of file
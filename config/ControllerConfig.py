@@ -1,5 +1,9 @@
 from typing import Dict
 
+DEFAULT_RATE_FEEDBACK_THRESHOLD = 0.1
+DEFAULT_RATE_FEEDBACK_MAX_INTERVAL = 1.0 # sec
+DEFAULT_SCHEDULING_SLOT = 0 # sec
+
 class ControllerConfig:
     """
     Controller 설정 정보를 저장하는 클래스입니다.
@@ -7,6 +11,9 @@ class ControllerConfig:
     Attributes:
         _experiment_name (str): 실험 이름
         _sync_time (int): 동기화 시간. (sec)
+        _rate_feedback_threshold (float): sender에게 RateFeedback을 다시 보내는 상대 변화량. (예: 0.1은 10%)
+        _rate_feedback_max_interval (float): 변화가 없더라도 RateFeedback을 다시 보내는 최대 간격. (sec)
+        _scheduling_slot (float): 스케줄링 요청을 모아 함께 스케줄링하는 time slot 길이. (sec) 0이라면 요청마다 바로 스케줄링합니다.
     """
         
     def __init__(self, controller_config: Dict[str, any]):
@@ -18,6 +25,9 @@ class ControllerConfig:
 
         self._experiment_name: str = controller_config["experiment_name"]
         self._sync_time: float = float(controller_config["sync_time"])
+        self._rate_feedback_threshold: float = float(controller_config.get("rate_feedback_threshold", DEFAULT_RATE_FEEDBACK_THRESHOLD))
+        self._rate_feedback_max_interval: float = float(controller_config.get("rate_feedback_max_interval", DEFAULT_RATE_FEEDBACK_MAX_INTERVAL))
+        self._scheduling_slot: float = float(controller_config.get("scheduling_slot", DEFAULT_SCHEDULING_SLOT))
 
     def _check_validate(self, controller_config: Dict[str, any]):
         """
@@ -31,6 +41,13 @@ class ControllerConfig:
         for key in required_keys:
             if key not in controller_config:
                 raise ValueError(f"Missing required key: {key}")
+
+        for key in ["rate_feedback_threshold", "rate_feedback_max_interval"]:
+            if key in controller_config and float(controller_config[key]) <= 0:
+                raise ValueError(f"{key} must be positive, but got {controller_config[key]}")
+
+        if "scheduling_slot" in controller_config and float(controller_config["scheduling_slot"]) < 0:
+            raise ValueError(f"scheduling_slot must be non-negative, but got {controller_config['scheduling_slot']}")
             
     @property
     def experiment_name(self) -> str:
@@ -38,4 +55,16 @@ class ControllerConfig:
     
     @property
     def sync_time(self) -> float:
-        return self._sync_time
\ No newline at end of file
+        return self._sync_time
+
+    @property
+    def rate_feedback_threshold(self) -> float:
+        return self._rate_feedback_threshold
+
+    @property
+    def rate_feedback_max_interval(self) -> float:
+        return self._rate_feedback_max_interval
+
+    @property
+    def scheduling_slot(self) -> float:
+        return self._scheduling_slot
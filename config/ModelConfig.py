@@ -1,9 +1,22 @@
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+# 서브모듈 구간을 지원하는 모델과 구간의 끝. yolov5는 서브모듈 34개(0 ~ 33)와 후처리(34)입니다.
+SUBMODULE_ENDS = {
+    "yolov5": 35,
+}
 
 class ModelConfig:
     """
     Model 설정 정보를 저장하는 클래스입니다.
 
+    모델 이름은 스케줄링의 단위(stage)이며, 설정 순서대로 실행됩니다.
+    model과 submodules를 지정하면 모델의 서브모듈 [start, end) 구간을 하나의 stage로 사용할 수 있습니다. (yolov5만 지원)
+    예: "yolov5_head": {"input_size": [1, 3, 320, 320], "model": "yolov5", "submodules": [0, 12]}
+    yolov5의 서브모듈은 0 ~ 33이며, 34번은 후처리(박스 디코딩, NMS)입니다. [34, 35)는 후처리만 실행하는 stage입니다.
+    같은 모델의 구간을 나눈 stage들은 연속해서 설정해야 하며, 구간이 빈틈이나 겹침 없이 이어져 모델 전체(yolov5는 [0, 35))를 덮어야 합니다.
+    input_size는 구간과 관계없이 원래 모델의 입력 크기입니다.
+    transfer_dtype을 지정하면 stage의 출력을 다음 노드로 전송할 때 그 정밀도로 보냅니다. (기본값: float32)
+
     Attributes:
         _model_config (Dict[str, any]): 모델 이름과 모델 설정 정보가 담긴 Json 형식의 딕셔너리.
     """
@@ -28,12 +41,127 @@ class ModelConfig:
                 if key not in model_config:
                     raise ValueError(f"'{key}'가 누락되었습니다.")
 
+            if "submodules" in model_config:
+                self._validate_submodules(model_config)
+
+            if "transfer_dtype" in model_config:
+                self._validate_transfer_dtype(model_config["transfer_dtype"])
+
+        self._validate_stages(model_configs)
+
+    def _validate_submodules(self, model_config: Dict[str, any]):
+        """
+        서브모듈 구간이 올바른지 검증합니다.
+
+        Raises:
+            ValueError: model이 없거나 구간이 [start, end) 형식이 아닐 때 발생합니다.
+        """
+        if "model" not in model_config:
+            raise ValueError("'submodules'를 사용하려면 'model'이 필요합니다.")
+
+        if model_config["model"] not in SUBMODULE_ENDS:
+            raise ValueError(f"Invalid model: {model_config['model']}. 'submodules' is supported only for {list(SUBMODULE_ENDS.keys())}.")
+
+        submodules = model_config["submodules"]
+        submodule_end = SUBMODULE_ENDS[model_config["model"]]
+
+        if len(submodules) != 2 or not 0 <= submodules[0] < submodules[1] <= submodule_end:
+            raise ValueError(f"Invalid submodules: {submodules}. Submodules must be [start, end) with 0 <= start < end <= {submodule_end}.")
+
+    def _validate_stages(self, model_configs: Dict[str, any]):
+        """
+        같은 모델의 구간을 나눈 연속된 stage들이 빈틈이나 겹침 없이 모델 전체를 덮는지 검증합니다.
+        구간이 끊기면 다음 stage가 읽을 텐서가 전달되지 않으므로, 실행 중이 아니라 설정을 읽을 때 실패합니다.
+
+        Raises:
+            ValueError: 구간이 0에서 시작하지 않거나, 이전 구간의 끝에서 이어지지 않거나, 모델의 끝까지 덮지 않을 때 발생합니다.
+        """
+        base_model = None
+        previous_end = None
+        previous_model_name = None
+
+        for model_name, model_config in list(model_configs.items()) + [(None, {})]:
+            submodules = model_config.get("submodules")
+            model = model_config.get("model")
+
+            # 같은 모델의 구간이 끝났다면 모델의 끝까지 덮었는지 확인합니다.
+            if base_model is not None and (submodules is None or model != base_model or submodules[0] == 0):
+                if previous_end != SUBMODULE_ENDS[base_model]:
+                    raise ValueError(f"Invalid submodules of {previous_model_name}: {base_model} ends at {previous_end}, but must end at {SUBMODULE_ENDS[base_model]}.")
+
+                base_model = None
+
+            if submodules is None:
+                continue
+
+            if base_model is None:
+                if submodules[0] != 0:
+                    raise ValueError(f"Invalid submodules of {model_name}: {list(submodules)}. The first stage of {model} must start at 0.")
+
+                base_model = model
+
+            elif submodules[0] != previous_end:
+                raise ValueError(f"Invalid submodules of {model_name}: {list(submodules)}. It must start at {previous_end} where {previous_model_name} ends.")
+
+            previous_end = submodules[1]
+            previous_model_name = model_name
+
+    def _validate_transfer_dtype(self, transfer_dtype: str):
+        """
+        전송 정밀도가 올바른지 검증합니다.
+
+        Raises:
+            ValueError: 지원하지 않는 정밀도일 때 발생합니다.
+        """
+        available_transfer_dtypes = ["float32", "float16", "bfloat16"]
+
+        if transfer_dtype not in available_transfer_dtypes:
+            raise ValueError(f"Invalid transfer_dtype: {transfer_dtype}. transfer_dtype must be in {available_transfer_dtypes}.")
+
     def _init_model_configs(self, model_configs: Dict[str, any]):
         for model_name, model_config in model_configs.items():
             model_config["input_size"] = tuple(model_config["input_size"])
 
+            if "submodules" in model_config:
+                model_config["submodules"] = tuple(model_config["submodules"])
+
     def get_model_names(self) -> List[str]:
         return list(self._model_configs.keys())
         
     def get_input_size(self, model_name: str) -> Tuple[int, ...]:
-        return self._model_configs[model_name]["input_size"]
\ No newline at end of file
+        return self._model_configs[model_name]["input_size"]
+    
+    def get_dynamic_batch(self, model_name: str) -> bool:
+        """
+        ONNX로 내보낼 때 batch 차원을 동적으로 둘 지 여부를 반환합니다. (기본값: False)
+        """
+        return bool(self._model_configs[model_name].get("dynamic_batch", False))
+    
+    def get_transfer_dtype(self, model_name: str) -> str:
+        """
+        stage의 출력 중 실수 텐서를 전송할 때의 정밀도를 반환합니다. (기본값: float32)
+        """
+        return self._model_configs[model_name].get("transfer_dtype", "float32")
+    
+    def get_base_model(self, model_name: str) -> str:
+        """
+        stage가 실행하는 원래 모델 이름을 반환합니다. model을 지정하지 않았다면 모델 이름 그대로입니다.
+        """
+        return self._model_configs[model_name].get("model", model_name)
+    
+    def get_submodules(self, model_name: str) -> Optional[Tuple[int, int]]:
+        """
+        stage가 실행하는 서브모듈 구간 [start, end)을 반환합니다. 모델 전체를 실행한다면 None을 반환합니다.
+        """
+        return self._model_configs[model_name].get("submodules")
+    
+    def get_profile_name(self, model_name: str) -> str:
+        """
+        프로파일 캐시에 사용할 이름을 반환합니다. 같은 구간이라면 stage 이름이 달라도 같은 프로파일을 사용합니다. (예: yolov5[0:12])
+        """
+        submodules = self.get_submodules(model_name)
+
+        if submodules is None:
+            return self.get_base_model(model_name)
+
+        return f"{self.get_base_model(model_name)}[{submodules[0]}:{submodules[1]}]"
@@ -1,5 +1,20 @@
 import importlib
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+DEFAULT_LATENCY_SLO = 1_000 # ms
+DEFAULT_MAX_FPS = 30
+DEFAULT_JOB_WEIGHT = 1.0
+
+# 스케줄링 캐시의 양자화 단위와 경로를 재사용하는 최대 시간입니다. 부하가 높으면 오히려 느려지므로 기본값은 사용하지 않는 것입니다. (layeredgraph/ScheduleCache.py 참고)
+DEFAULT_SCHEDULE_CACHE_STEP = 0.002 # sec
+DEFAULT_SCHEDULE_CACHE_TTL = 0 # sec
+
+# 입력 프레임 코덱과 품질 범위입니다. (utils/video_utils.py 참고)
+INPUT_CODEC_QUALITY_RANGES = {
+    "jpeg": (1, 100),
+    "webp": (1, 100),
+    "png": (0, 9),
+}
 
 class NetworkConfig:
     """
@@ -8,11 +23,19 @@ class NetworkConfig:
     Attributes:
         _queue_name (str): 큐 이름.
         _scheduling_algorithm (str): 스케줄링 알고리즘 이름.
+        _scheduling_options (Dict[str, any]): 스케줄링 알고리즘 생성자에 넘기는 인자. (예: DriftPlusPenalty의 {"v": 0.1})
         _collect_garbage_job_time (int): 가비지 컬렉션 작업 시간. (sec)
-        _jobs (Dict[str, any]): 작업 정보.
+        _jobs (Dict[str, any]): 작업 정보. latency_slo (ms)와 max_fps를 설정하면 sender가 이를 넘지 않도록 전송 fps를 조절합니다.
+            weight를 설정하면 스케줄러가 링크의 capacity를 작업들의 weight 비율로 나누어 쓴다고 보고 경로를 고릅니다.
+            slo_class를 설정하면 작업에 없는 latency_slo와 weight를 slo_classes에서 가져옵니다.
+            input_codec(jpeg, webp, png)과 input_quality를 설정하면 sender가 프레임을 압축하여 보내고, 첫 번째 모델을 실행하는 노드에서 압축을 풉니다.
+        _slo_classes (Dict[str, Dict[str, any]]): SLO 클래스 이름과 latency_slo (ms), weight. (예: {"realtime": {"latency_slo": 200, "weight": 4}})
         _network (Dict[str, any]): 네트워크 정보.
         _router (Dict[str, any]): 라우터 정보.
         _models (Dict[str, List[str]]): 각 노드가 소지할 수 있는 모델들.
+        _backends (Dict[str, str]): 각 노드가 모델을 실행하는 백엔드(torch, onnx). 설정하지 않은 노드는 torch를 사용합니다.
+        _schedule_cache_step (float): 스케줄링 캐시가 링크의 예상 처리 시간을 양자화하는 단위. (sec)
+        _schedule_cache_ttl (float): 스케줄링 캐시가 경로를 재사용하는 최대 시간. (sec) 0(기본값)이라면 캐시를 사용하지 않습니다.
     """
     def __init__(self, network_config: Dict[str, any]):
         """
@@ -23,11 +46,16 @@ class NetworkConfig:
 
         self._queue_name: str = network_config["queue_name"]
         self._scheduling_algorithm: str = network_config["scheduling_algorithm"]
+        self._scheduling_options: Dict[str, any] = network_config.get("scheduling_options", {})
         self._collect_garbage_job_time: int = int(network_config["collect_garbage_job_time"])
         self._jobs: Dict[str, any] = network_config["jobs"]
+        self._slo_classes: Dict[str, Dict[str, any]] = network_config.get("slo_classes", {})
         self._network: Dict[str, any] = network_config["network"]
         self._router: List[str] = network_config["router"]
         self._models: Dict[str, any] = network_config["models"]
+        self._backends: Dict[str, str] = network_config.get("backends", {})
+        self._schedule_cache_step: float = float(network_config.get("schedule_cache_step", DEFAULT_SCHEDULE_CACHE_STEP))
+        self._schedule_cache_ttl: float = float(network_config.get("schedule_cache_ttl", DEFAULT_SCHEDULE_CACHE_TTL))
 
     def _check_validate(self, network_config: Dict[str, any]):
         """
@@ -53,9 +81,24 @@ class NetworkConfig:
         
         # 스케줄링 알고리즘 클래스 존재 여부 검증
         self._validate_scheduling_algorithm(network_config["scheduling_algorithm"])
+
+        if not isinstance(network_config.get("scheduling_options", {}), dict):
+            raise ValueError(f"scheduling_options must be a dictionary, but got {network_config['scheduling_options']}")
         
+        # slo_classes 검증
+        self._validate_slo_classes(network_config.get("slo_classes", {}))
+
         # jobs 검증
-        self._validate_jobs(network_config["jobs"])
+        self._validate_jobs(network_config["jobs"], network_config.get("slo_classes", {}))
+
+        # backends 검증
+        self._validate_backends(network_config.get("backends", {}))
+
+        if "schedule_cache_step" in network_config and float(network_config["schedule_cache_step"]) <= 0:
+            raise ValueError(f"schedule_cache_step must be positive, but got {network_config['schedule_cache_step']}")
+
+        if "schedule_cache_ttl" in network_config and float(network_config["schedule_cache_ttl"]) < 0:
+            raise ValueError(f"schedule_cache_ttl must be non-negative, but got {network_config['schedule_cache_ttl']}")
     
     def _validate_scheduling_algorithm(self, algorithm_path: str):
         """
@@ -82,12 +125,25 @@ class NetworkConfig:
         except Exception as e:
             raise ValueError(f"Error validating scheduling algorithm {algorithm_path}: {str(e)}")
 
-    def _validate_jobs(self, jobs: Dict[str, any]):
+    def _validate_slo_classes(self, slo_classes: Dict[str, Dict[str, any]]):
+        """
+        slo_classes 설정이 올바른지 검증합니다.
+
+        Raises:
+            ValueError: latency_slo나 weight가 양수가 아닐 때 발생합니다.
+        """
+        for slo_class, slo in slo_classes.items():
+            for key in ["latency_slo", "weight"]:
+                if key in slo and float(slo[key]) <= 0:
+                    raise ValueError(f"{key} of SLO class {slo_class} must be positive, but got {slo[key]}")
+
+    def _validate_jobs(self, jobs: Dict[str, any], slo_classes: Dict[str, Dict[str, any]]):
         """
         jobs 설정이 올바른지 검증합니다.
         
         Args:
             jobs (Dict[str, any]): jobs 설정 정보
+            slo_classes (Dict[str, Dict[str, any]]): SLO 클래스 설정 정보
             
         Raises:
             ValueError: jobs 설정이 올바르지 않을 때 발생합니다.
@@ -103,6 +159,55 @@ class NetworkConfig:
                 if key not in job_info:
                     raise ValueError(f"Missing required key: {key}")
 
+            for key in ["latency_slo", "max_fps", "weight"]:
+                if key in job_info and float(job_info[key]) <= 0:
+                    raise ValueError(f"{key} must be positive, but got {job_info[key]}")
+
+            if "slo_class" in job_info and job_info["slo_class"] not in slo_classes:
+                raise ValueError(f"Unknown SLO class: {job_info['slo_class']}. slo_class must be in {list(slo_classes.keys())}.")
+
+            self._validate_input_codec(job_info)
+
+    def _validate_input_codec(self, job_info: Dict[str, any]):
+        """
+        작업의 입력 프레임 코덱과 품질이 올바른지 검증합니다.
+
+        Raises:
+            ValueError: 지원하지 않는 코덱이거나 품질이 범위를 벗어났을 때 발생합니다.
+        """
+        if "input_quality" in job_info and "input_codec" not in job_info:
+            raise ValueError("input_quality requires input_codec")
+
+        if "input_codec" not in job_info:
+            return
+
+        input_codec = job_info["input_codec"]
+
+        if input_codec not in INPUT_CODEC_QUALITY_RANGES:
+            raise ValueError(f"Invalid input_codec: {input_codec}. input_codec must be in {list(INPUT_CODEC_QUALITY_RANGES.keys())}.")
+
+        if "input_quality" in job_info:
+            min_quality, max_quality = INPUT_CODEC_QUALITY_RANGES[input_codec]
+
+            if not min_quality <= int(job_info["input_quality"]) <= max_quality:
+                raise ValueError(f"input_quality of {input_codec} must be in [{min_quality}, {max_quality}], but got {job_info['input_quality']}")
+
+    def _validate_backends(self, backends: Dict[str, str]):
+        """
+        backends 설정이 올바른지 검증합니다.
+
+        Args:
+            backends (Dict[str, str]): 노드 IP와 백엔드 이름.
+
+        Raises:
+            ValueError: 지원하지 않는 백엔드일 때 발생합니다.
+        """
+        available_backends = ["torch", "onnx"]
+
+        for ip, backend in backends.items():
+            if backend not in available_backends:
+                raise ValueError(f"Invalid backend for {ip}: {backend}. Backend must be in {available_backends}.")
+
     @property
     def queue_name(self) -> str:
         return self._queue_name
@@ -111,10 +216,22 @@ class NetworkConfig:
     def scheduling_algorithm(self) -> str:
         return self._scheduling_algorithm
     
+    @property
+    def scheduling_options(self) -> Dict[str, any]:
+        return self._scheduling_options
+
     @property
     def collect_garbage_job_time(self) -> int:
         return self._collect_garbage_job_time
 
+    @property
+    def schedule_cache_step(self) -> float:
+        return self._schedule_cache_step
+
+    @property
+    def schedule_cache_ttl(self) -> float:
+        return self._schedule_cache_ttl
+
     def get_job_names(self) -> List[str]:
         return list(self._jobs.keys())
 
@@ -126,7 +243,50 @@ class NetworkConfig:
     
     def get_job_destination(self, job_name: str) -> str:
         return self._jobs[job_name]["destination"]
+
+    def get_job_slo_class(self, job_name: str) -> Optional[str]:
+        return self._jobs[job_name].get("slo_class")
+
+    def _get_job_slo(self, job_name: str, key: str, default: float) -> float:
+        """
+        작업의 SLO 값을 작업, SLO 클래스, 기본값 순서로 찾아 반환합니다.
+        """
+        job = self._jobs[job_name]
+        slo_class = self._slo_classes.get(job.get("slo_class"), {})
+
+        return float(job.get(key, slo_class.get(key, default)))
+
+    def get_job_latency_slo(self, job_name: str) -> float:
+        """
+        작업의 목표 지연 시간을 반환합니다. (ms)
+        """
+        return self._get_job_slo(job_name, "latency_slo", DEFAULT_LATENCY_SLO)
+
+    def get_job_weight(self, job_name: str) -> float:
+        """
+        링크의 capacity를 나누어 쓸 때 작업의 weight를 반환합니다.
+        """
+        return self._get_job_slo(job_name, "weight", DEFAULT_JOB_WEIGHT)
+
+    def get_job_max_fps(self, job_name: str) -> float:
+        """
+        작업의 최대 전송 fps를 반환합니다. (예: 카메라의 fps)
+        """
+        return float(self._jobs[job_name].get("max_fps", DEFAULT_MAX_FPS))
     
+    def get_job_input_codec(self, job_name: str) -> Optional[str]:
+        """
+        작업의 입력 프레임 코덱을 반환합니다. (예: jpeg) 설정하지 않았다면 None이며, 프레임을 압축하지 않고 보냅니다.
+        """
+        return self._jobs[job_name].get("input_codec")
+
+    def get_job_input_quality(self, job_name: str) -> Optional[int]:
+        """
+        작업의 입력 프레임 코덱 품질을 반환합니다. 설정하지 않았다면 None이며, 코덱의 기본 품질을 사용합니다.
+        """
+        input_quality = self._jobs[job_name].get("input_quality")
+        return int(input_quality) if input_quality is not None else None
+
     def get_network_list(self) -> List[str]:
         return list(self._network.keys())
     
@@ -138,4 +298,7 @@ class NetworkConfig:
         return self._router
 
     def get_models(self, ip: str) -> List[str]:
-        return self._models[ip]
\ No newline at end of file
+        return self._models[ip]
+    
+    def get_backend(self, ip: str) -> str:
+        return self._backends.get(ip, "torch")
\ No newline at end of file
@@ -0,0 +1,300 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+import asyncio
+import struct
+
+from simulation.FifoServer import FifoServer
+
+MS_PER_SECOND = 1_000
+KB_PER_BYTE = 1024
+
+# MQTT 3.1.1 제어 패킷 종류. (고정 헤더의 상위 4비트)
+CONNECT = 1
+PUBLISH = 3
+PUBACK = 4
+PUBREC = 5
+PUBREL = 6
+PUBCOMP = 7
+SUBSCRIBE = 8
+SUBACK = 9
+UNSUBSCRIBE = 10
+UNSUBACK = 11
+PINGREQ = 12
+PINGRESP = 13
+DISCONNECT = 14
+
+CONNACK_ACCEPTED = b"\x20\x02\x00\x00"
+PINGRESP_PACKET = b"\xd0\x00"
+
+# 클라이언트마다 보내지 못하고 쌓아 둘 수 있는 메시지 수입니다. mosquitto의 max_queued_messages 기본값과 같습니다.
+MAX_QUEUED_MESSAGES = 1000
+
+class Broker:
+    """
+    에뮬레이션에서 가상 노드 하나가 사용하는 가벼운 MQTT 3.1.1 브로커입니다.
+    실제 노드마다 mosquitto를 띄우는 것처럼, 가상 노드마다 자신의 loopback 주소(127.0.1.x)에 브로커를 하나씩 띄웁니다.
+
+    프로그램들이 사용하는 기능만 지원합니다. 구독은 QoS 0으로 허용하고, QoS 1, 2로 받은 메시지도 확인 응답 후 QoS 0으로 전달하며, retain과 세션은 저장하지 않습니다.
+    클라이언트는 자신의 가상 노드의 loopback 주소로 연결하므로(VirtualNode), 연결한 주소로 메시지를 보낸 노드를 알 수 있습니다.
+    클라이언트마다 보낼 패킷을 큐에 쌓고 하나씩 쓰면서 소켓 버퍼가 비워질 때까지 기다리므로, 느린 구독자 때문에 메모리가 끝없이 늘지 않습니다.
+    구독자의 큐가 MAX_QUEUED_MESSAGES만큼 차면 mosquitto처럼 QoS 0 메시지를 버리고 보낸 노드별로 셉니다.
+    보낸 노드에서 이 노드로의 링크에 bandwidth와 delay를 주었다면, 링크의 FIFO 전송 큐에서 전송량 / bandwidth만큼 기다린 뒤 delay만큼 늦게 구독자에게 전달합니다.
+
+    Attributes:
+        _ip (str): 가상 노드의 IP 주소.
+        _host (str): 브로커가 listen하는 loopback 주소.
+        _port (int): 브로커가 listen하는 포트.
+        _identities (Dict[str, str]): loopback 주소와 가상 노드의 IP 주소.
+        _links (Dict[str, Tuple[float, float]]): 이 노드로 들어오는 링크의 출발 IP와 bandwidth(KB/ms), delay(ms).
+        _transfer_servers (Dict[str, FifoServer]): 링크의 출발 IP와 전송 큐.
+        _subscriptions (Dict[asyncio.StreamWriter, Set[str]]): 연결된 클라이언트와 구독한 topic filter.
+        _outboxes (Dict[asyncio.StreamWriter, asyncio.Queue]): 연결된 클라이언트와 보낼 패킷 큐.
+        _received (Dict[str, List[int]]): 메시지를 보낸 노드의 IP와 [메시지 수, 바이트 수].
+        _dropped (Dict[str, int]): 메시지를 보낸 노드의 IP와 구독자의 큐가 가득 차서 버린 메시지 수.
+        _server (Optional[asyncio.AbstractServer]): listen 중인 서버.
+    """
+    def __init__(self, ip: str, host: str, port: int, identities: Dict[str, str], links: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Args:
+            ip (str): 가상 노드의 IP 주소.
+            host (str): 브로커가 listen하는 loopback 주소.
+            port (int): 브로커가 listen하는 포트.
+            identities (Dict[str, str]): loopback 주소와 가상 노드의 IP 주소.
+            links (Optional[Dict[str, Tuple[float, float]]]): 이 노드로 들어오는 링크의 출발 IP와 (bandwidth(KB/ms), delay(ms)). 주지 않은 링크는 지연 없이 전달합니다.
+        """
+        links = links or {}
+        self._check_validate(links)
+
+        self._ip: str = ip
+        self._host: str = host
+        self._port: int = port
+        self._identities: Dict[str, str] = identities
+        self._links: Dict[str, Tuple[float, float]] = links
+        self._transfer_servers: Dict[str, FifoServer] = {source_ip: FifoServer() for source_ip in links}
+        self._subscriptions: Dict[asyncio.StreamWriter, Set[str]] = {}
+        self._outboxes: Dict[asyncio.StreamWriter, asyncio.Queue] = {}
+        self._received: Dict[str, List[int]] = {}
+        self._dropped: Dict[str, int] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def _check_validate(self, links: Dict[str, Tuple[float, float]]):
+        """
+        링크의 bandwidth와 delay가 올바른지 검증합니다.
+        """
+        for source_ip, (bandwidth, delay) in links.items():
+            if bandwidth <= 0:
+                raise ValueError(f"bandwidth of link from {source_ip} must be positive, but got {bandwidth}")
+
+            if delay < 0:
+                raise ValueError(f"delay of link from {source_ip} must be non-negative, but got {delay}")
+
+    def get_ip(self) -> str:
+        return self._ip
+
+    def get_received(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Returns:
+            Dict[str, Tuple[int, int]]: 메시지를 보낸 노드의 IP와 (메시지 수, 바이트 수).
+        """
+        return {source_ip: (messages, num_bytes) for source_ip, (messages, num_bytes) in self._received.items()}
+
+    def get_dropped(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: 메시지를 보낸 노드의 IP와 구독자의 큐가 가득 차서 버린 메시지 수.
+        """
+        return dict(self._dropped)
+
+    async def start(self) -> None:
+        """
+        Raises:
+            OSError: loopback 주소에 listen할 수 없을 때 발생합니다. 127.0.0.0/8 전체를 loopback으로 쓰는 것은 Linux뿐이므로,
+                macOS 등에서는 주소마다 alias(sudo ifconfig lo0 alias 127.0.1.x)를 먼저 추가해야 합니다.
+        """
+        try:
+            self._server = await asyncio.start_server(self.handle_client, self._host, self._port)
+        except OSError as error:
+            raise OSError(error.errno, f"Cannot bind the broker of {self._ip} to {self._host}:{self._port} ({error.strerror}). "
+                                       f"The emulator needs every 127.0.1.x address on the loopback interface, which only Linux provides by default; "
+                                       f"on other systems add it with 'sudo ifconfig lo0 alias {self._host}'. "
+                                       f"Also check that no other MQTT broker listens on port {self._port} of all addresses.") from error
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+
+        self._server.close()
+        for writer in list(self._subscriptions.keys()):
+            writer.close()
+
+        await self._server.wait_closed()
+        self._server = None
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        source_ip = self._identities.get(writer.get_extra_info("peername")[0])
+        outbox = asyncio.Queue(MAX_QUEUED_MESSAGES)
+        self._subscriptions[writer] = set()
+        self._outboxes[writer] = outbox
+        send_task = asyncio.ensure_future(self.send_outbox(writer, outbox))
+
+        try:
+            while True:
+                header = (await reader.readexactly(1))[0]
+                body = await reader.readexactly(await self._read_remaining_length(reader))
+                packet_type = header >> 4
+                reply = None
+
+                if packet_type == CONNECT:
+                    reply = CONNACK_ACCEPTED
+
+                elif packet_type == PUBLISH:
+                    reply = self.handle_publish(header, body, source_ip)
+
+                elif packet_type == PUBREL:
+                    reply = bytes([PUBCOMP << 4, 2]) + body[:2]
+
+                elif packet_type == SUBSCRIBE:
+                    topic_filters = self._read_topic_filters(body[2:], has_qos=True)
+                    self._subscriptions[writer].update(topic_filters)
+                    reply = bytes([SUBACK << 4]) + self._encode_remaining_length(2 + len(topic_filters)) + body[:2] + bytes(len(topic_filters))
+
+                elif packet_type == UNSUBSCRIBE:
+                    self._subscriptions[writer].difference_update(self._read_topic_filters(body[2:], has_qos=False))
+                    reply = bytes([UNSUBACK << 4, 2]) + body[:2]
+
+                elif packet_type == PINGREQ:
+                    reply = PINGRESP_PACKET
+
+                elif packet_type == DISCONNECT:
+                    break
+
+                # 응답은 버리지 않고, 큐가 가득 찼다면 빌 때까지 이 클라이언트의 다음 패킷을 읽지 않습니다.
+                if reply is not None:
+                    await outbox.put(reply)
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+        finally:
+            self._subscriptions.pop(writer, None)
+            self._outboxes.pop(writer, None)
+            send_task.cancel()
+            writer.close()
+
+    async def send_outbox(self, writer: asyncio.StreamWriter, outbox: asyncio.Queue):
+        """
+        클라이언트에게 보낼 패킷을 순서대로 쓰고, 패킷마다 소켓 버퍼가 비워질 때까지 기다립니다.
+        """
+        try:
+            while True:
+                packet = await outbox.get()
+                writer.write(packet)
+                await writer.drain()
+
+        except ConnectionError:
+            pass
+
+    def handle_publish(self, header: int, body: bytes, source_ip: Optional[str]) -> Optional[bytes]:
+        """
+        PUBLISH를 보낸 노드에서 오는 링크를 거쳐 구독자에게 전달합니다.
+
+        Returns:
+            Optional[bytes]: QoS 1, 2라면 보낸 클라이언트에게 보낼 확인 응답(PUBACK, PUBREC), QoS 0이라면 None.
+        """
+        reply = None
+        qos = (header >> 1) & 0b11
+        topic_length = struct.unpack("!H", body[:2])[0]
+        topic = body[2:2 + topic_length].decode("utf-8")
+        offset = 2 + topic_length
+
+        if qos > 0:
+            packet_id = body[offset:offset + 2]
+            offset += 2
+            reply = bytes([(PUBACK if qos == 1 else PUBREC) << 4, 2]) + packet_id
+
+        payload = body[offset:]
+
+        if source_ip is not None:
+            received = self._received.setdefault(source_ip, [0, 0])
+            received[0] += 1
+            received[1] += len(payload)
+
+        if source_ip not in self._links:
+            self.route(topic, payload, source_ip)
+            return reply
+
+        loop = asyncio.get_running_loop()
+        bandwidth, delay = self._links[source_ip] # KB/ms, ms
+        work = len(payload) / KB_PER_BYTE # KB
+
+        done_time = self._transfer_servers[source_ip].enqueue(loop.time(), work, work / bandwidth / MS_PER_SECOND)
+        loop.call_at(done_time + delay / MS_PER_SECOND, self.route, topic, payload, source_ip)
+
+        return reply
+
+    def route(self, topic: str, payload: bytes, source_ip: Optional[str]):
+        """
+        topic을 구독한 클라이언트들의 큐에 QoS 0으로 넣습니다. 큐가 가득 찬 구독자에게는 버립니다.
+        """
+        topic_bytes = topic.encode("utf-8")
+        variable_header = struct.pack("!H", len(topic_bytes)) + topic_bytes
+        packet = bytes([PUBLISH << 4]) + self._encode_remaining_length(len(variable_header) + len(payload)) + variable_header + payload
+
+        for writer, topic_filters in list(self._subscriptions.items()):
+            if any(self._is_matched(topic_filter, topic) for topic_filter in topic_filters):
+                try:
+                    self._outboxes[writer].put_nowait(packet)
+                except asyncio.QueueFull:
+                    self._dropped[source_ip] = self._dropped.get(source_ip, 0) + 1
+
+    def _is_matched(self, topic_filter: str, topic: str) -> bool:
+        """
+        topic이 topic filter(+, # 와일드카드)에 해당하는 지 여부를 반환합니다.
+        """
+        filter_levels = topic_filter.split("/")
+        topic_levels = topic.split("/")
+
+        for index, filter_level in enumerate(filter_levels):
+            if filter_level == "#":
+                return True
+
+            if index >= len(topic_levels) or (filter_level != "+" and filter_level != topic_levels[index]):
+                return False
+
+        return len(filter_levels) == len(topic_levels)
+
+    def _read_topic_filters(self, payload: bytes, has_qos: bool) -> List[str]:
+        topic_filters = []
+        offset = 0
+
+        while offset < len(payload):
+            topic_length = struct.unpack("!H", payload[offset:offset + 2])[0]
+            topic_filters.append(payload[offset + 2:offset + 2 + topic_length].decode("utf-8"))
+            offset += 2 + topic_length + (1 if has_qos else 0)
+
+        return topic_filters
+
+    async def _read_remaining_length(self, reader: asyncio.StreamReader) -> int:
+        remaining_length = 0
+        for shift in range(0, 28, 7):
+            encoded_byte = (await reader.readexactly(1))[0]
+            remaining_length += (encoded_byte & 0x7f) << shift
+
+            if encoded_byte & 0x80 == 0:
+                break
+
+        return remaining_length
+
+    def _encode_remaining_length(self, remaining_length: int) -> bytes:
+        encoded = bytearray()
+        while True:
+            encoded_byte = remaining_length % 128
+            remaining_length //= 128
+
+            if remaining_length > 0:
+                encoded_byte |= 0x80
+
+            encoded.append(encoded_byte)
+
+            if remaining_length == 0:
+                return bytes(encoded)
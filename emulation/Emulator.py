@@ -0,0 +1,284 @@
+from typing import Dict, List, Optional, Tuple
+
+import asyncio
+import glob
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from datetime import datetime
+
+from config import ControllerConfig, NetworkConfig
+from emulation.Broker import Broker
+from utils import get_latency_stats, save_latency_percentiles
+
+KB_PER_BYTE = 1024
+
+# MDC는 192.168.1.2의 Controller에 연결합니다. (program/MDC.py)
+CONTROLLER_IP = "192.168.1.2"
+LOOPBACK_PREFIX = "127.0.1."
+MQTT_PORT = 1883
+
+CONTROLLER_PATH = "program/Controller.py"
+MDC_PATH = "program/MDC.py"
+DEFAULT_SENDER_PATH = "program/VideoSender.py"
+VIRTUAL_NODE_PATH = "emulation/VirtualNode.py"
+
+PROCESS_STOP_TIMEOUT = 5 # sec
+
+class Emulator:
+    """
+    하드웨어 없이 한 호스트에서 Controller, MDC, sender를 실제 program/ 코드 그대로 프로세스로 실행하는 에뮬레이터입니다.
+
+    Controller와 네트워크의 노드마다 127.0.1.x loopback 주소를 하나씩 주고, 그 주소에 노드의 브로커(Broker)를 띄웁니다.
+    프로세스는 VirtualNode로 실행하므로 config의 IP 주소를 자신의 주소로 사용하고, 다른 노드의 IP 주소로 보내는 메시지는 그 노드의 브로커로 갑니다.
+    작업의 출발지 노드에서는 sender를, 나머지 노드에서는 MDC를 실행합니다. sender는 MDC를 상속하므로 출발지 노드의 계산도 맡습니다.
+    링크의 bandwidth와 delay는 도착 노드의 브로커가 메시지를 전달할 때 적용합니다.
+    Controller가 남긴 종단 간 지연 시간으로 작업마다의 처리량과 지연 시간 백분위수를 계산하고,
+    results/{experiment_name}_emulation_{시간}/ 아래에 프로세스 로그, 지연 시간 통계, 링크마다 받은 메시지 양을 기록합니다.
+
+    Attributes:
+        _config_path (str): config.json 경로. Controller에도 그대로 넘깁니다.
+        _network_config (NetworkConfig): 네트워크 설정.
+        _controller_config (ControllerConfig): Controller 설정. (experiment_name)
+        _controller_ip (str): Controller의 IP 주소.
+        _port (int): 브로커들이 listen하는 포트.
+        _endpoints (Dict[str, str]): 노드의 IP 주소와 브로커의 loopback 주소.
+        _links (Dict[Tuple[str, str], Tuple[float, float]]): 링크와 bandwidth(KB/ms), delay(ms).
+        _senders (Dict[str, str]): 출발지 노드의 IP 주소와 sender가 보내는 작업 이름.
+        _sender_path (str): sender 프로그램 경로.
+        _sender_args (List[str]): sender 프로그램에 넘기는 인자.
+        _brokers (List[Broker]): 노드마다의 브로커.
+        _loop (Optional[asyncio.AbstractEventLoop]): 브로커들을 실행하는 이벤트 루프.
+        _processes (Dict[str, subprocess.Popen]): 프로세스 이름과 프로세스.
+        _log_path (str): 프로세스 로그 디렉터리.
+        _latency_log_path (str): 지연 시간 통계 디렉터리.
+        _link_log_path (str): 링크 로그 디렉터리.
+    """
+    def __init__(self,
+                 config_path: str,
+                 links: Optional[Dict[Tuple[str, str], Tuple[float, float]]] = None,
+                 sender_path: str = DEFAULT_SENDER_PATH,
+                 sender_args: Optional[List[str]] = None,
+                 controller_ip: str = CONTROLLER_IP,
+                 port: int = MQTT_PORT):
+        """
+        Args:
+            config_path (str): config.json 경로.
+            links (Optional[Dict[Tuple[str, str], Tuple[float, float]]]): 링크와 (bandwidth(KB/ms), delay(ms)). 주지 않은 링크는 지연 없이 전달합니다.
+            sender_path (str): 출발지 노드에서 실행할 sender 프로그램 경로.
+            sender_args (Optional[List[str]]): sender 프로그램에 --job-name과 함께 넘기는 인자. (예: ["--video", "video/test.mp4"])
+            controller_ip (str): Controller의 IP 주소.
+            port (int): 브로커들이 listen하는 포트.
+        """
+        self._config_path: str = config_path
+
+        with open(config_path, 'r') as file:
+            config = json.load(file)
+
+        self._network_config = NetworkConfig(config["Network"])
+        self._controller_config = ControllerConfig(config["Controller"])
+        self._controller_ip: str = controller_ip
+        self._port: int = port
+
+        ips = [controller_ip] + self._network_config.get_network_list()
+        self._endpoints: Dict[str, str] = {ip: f"{LOOPBACK_PREFIX}{index + 1}" for index, ip in enumerate(ips)}
+
+        self.init_links(links or {})
+        self.init_senders()
+
+        self._sender_path: str = sender_path
+        self._sender_args: List[str] = sender_args or []
+
+        self._brokers: List[Broker] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._processes: Dict[str, subprocess.Popen] = {}
+
+        self._log_path: str = None
+        self._latency_log_path: str = None
+        self._link_log_path: str = None
+
+    def init_links(self, links: Dict[Tuple[str, str], Tuple[float, float]]):
+        network_links = [(source_ip, destination_ip)
+                         for source_ip in self._network_config.get_network_list()
+                         for destination_ip in self._network_config.get_network_neighbors(source_ip)]
+
+        for link in links:
+            if link not in network_links:
+                raise ValueError(f"Unknown link: {link}. link must be in {network_links}.")
+
+        self._links: Dict[Tuple[str, str], Tuple[float, float]] = links
+
+    def init_senders(self):
+        """
+        출발지 노드마다 sender가 보낼 작업을 정합니다. sender는 작업 하나만 보내므로, 한 노드가 여러 작업의 출발지일 수 없습니다.
+        """
+        self._senders: Dict[str, str] = {}
+
+        for job_name in self._network_config.get_job_names():
+            source_ip = self._network_config.get_job_source(job_name)
+
+            if source_ip in self._senders:
+                raise ValueError(f"{source_ip} is the source of both {self._senders[source_ip]} and {job_name}, but a sender sends only one job.")
+
+            self._senders[source_ip] = job_name
+
+    def init_path(self):
+        folder_name = self._controller_config.experiment_name + "_emulation_" + datetime.now().strftime('%m-%d_%H%M%S')
+        self._log_path = f"./results/{folder_name}/log"
+        os.makedirs(self._log_path, exist_ok=True)
+
+        self._latency_log_path = f"./results/{folder_name}/latency"
+        os.makedirs(self._latency_log_path, exist_ok=True)
+
+        self._link_log_path = f"./results/{folder_name}/link"
+        os.makedirs(self._link_log_path, exist_ok=True)
+
+    def init_brokers(self):
+        identities = {endpoint: ip for ip, endpoint in self._endpoints.items()}
+
+        for ip, endpoint in self._endpoints.items():
+            links = {source_ip: link for (source_ip, destination_ip), link in self._links.items() if destination_ip == ip}
+            self._brokers.append(Broker(ip, endpoint, self._port, identities, links))
+
+        self._loop = asyncio.new_event_loop()
+        broker_thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        broker_thread.start()
+
+        for broker in self._brokers:
+            asyncio.run_coroutine_threadsafe(broker.start(), self._loop).result()
+
+    def stop_brokers(self):
+        for broker in self._brokers:
+            asyncio.run_coroutine_threadsafe(broker.stop(), self._loop).result()
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def start_process(self, name: str, ip: str, program_path: str, program_args: List[str]) -> subprocess.Popen:
+        """
+        프로그램을 가상 노드 ip로 실행하고, 출력은 로그 파일에 남깁니다.
+        """
+        command = [sys.executable, "-u", VIRTUAL_NODE_PATH,
+                   "--ip", ip,
+                   "--endpoints", json.dumps(self._endpoints),
+                   "--port", str(self._port),
+                   program_path] + program_args
+
+        log_file = open(f"{self._log_path}/{name}.log", 'w')
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=log_file, stderr=subprocess.STDOUT)
+        log_file.close()
+
+        self._processes[name] = process
+        return process
+
+    def start_processes(self):
+        self.start_process("controller", self._controller_ip, CONTROLLER_PATH, ["--config", self._config_path])
+
+        for ip in self._network_config.get_network_list():
+            if ip not in self._senders:
+                self.start_process(f"mdc_{ip}", ip, MDC_PATH, [])
+                continue
+
+            sender = self.start_process(f"sender_{ip}", ip, self._sender_path, ["--job-name", self._senders[ip]] + self._sender_args)
+
+            # sender는 config를 받은 뒤 키 입력을 기다리므로 미리 넣어 둡니다.
+            sender.stdin.write(b"\n")
+            sender.stdin.flush()
+
+    def stop_processes(self):
+        for process in self._processes.values():
+            process.terminate()
+
+        for name, process in self._processes.items():
+            try:
+                process.wait(PROCESS_STOP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                print(f"{name} did not stop in {PROCESS_STOP_TIMEOUT} sec, killing it.")
+                process.kill()
+                process.wait()
+
+    def run(self, duration: float) -> Dict[str, Dict[str, float]]:
+        """
+        브로커와 프로세스들을 띄우고 duration 동안 실행한 뒤 모두 종료합니다.
+
+        Args:
+            duration (float): 프로세스들을 실행하는 시간. (sec) 모델을 불러오는 시간도 포함합니다.
+
+        Returns:
+            Dict[str, Dict[str, float]]: 작업마다의 지연 시간 통계와 처리량(throughput, jobs/sec). (save_latency_percentiles와 같은 형식)
+        """
+        self.init_path()
+        self.init_brokers()
+
+        start_time = time.time()
+        try:
+            self.start_processes()
+            time.sleep(duration)
+        finally:
+            self.stop_processes()
+            self.stop_brokers()
+
+        self.save_link_stats(duration)
+
+        percentiles = self.get_latency_percentiles(start_time, duration)
+        if percentiles:
+            save_latency_percentiles(f"{self._latency_log_path}/percentiles.csv", percentiles)
+
+        return percentiles
+
+    def save_link_stats(self, duration: float):
+        """
+        브로커마다 받은 메시지 수, 양(KB), 처리량(KB/s)과 구독자의 큐가 가득 차서 버린 메시지 수를 보낸 노드별로 저장합니다.
+        """
+        rows = []
+        for broker in self._brokers:
+            dropped = broker.get_dropped()
+            for source_ip, (messages, num_bytes) in broker.get_received().items():
+                rows.append({
+                    "source": source_ip,
+                    "destination": broker.get_ip(),
+                    "messages": messages,
+                    "KB": round(num_bytes / KB_PER_BYTE, 2),
+                    "throughput (KB/s)": round(num_bytes / KB_PER_BYTE / duration, 2),
+                    "dropped": dropped.get(source_ip, 0),
+                })
+
+        pd.DataFrame(rows, columns=["source", "destination", "messages", "KB", "throughput (KB/s)", "dropped"]).to_csv(f"{self._link_log_path}/received.csv", index=False)
+
+    def get_controller_result_path(self, start_time: float) -> Optional[str]:
+        """
+        이번 실행에서 Controller가 만든 결과 디렉터리를 반환합니다.
+        """
+        result_paths = [result_path for result_path in glob.glob(f"./results/{self._controller_config.experiment_name}_*")
+                        if os.path.getmtime(result_path) >= start_time and os.path.isdir(f"{result_path}/path")]
+
+        return max(result_paths, key=os.path.getmtime) if result_paths else None
+
+    def get_latency_percentiles(self, start_time: float, duration: float) -> Dict[str, Dict[str, float]]:
+        """
+        Controller가 남긴 종단 간 지연 시간으로 작업마다 지연 시간의 백분위수, SLO를 지킨 비율, 처리량을 반환합니다.
+        """
+        result_path = self.get_controller_result_path(start_time)
+        if result_path is None:
+            return {}
+
+        percentiles = {}
+        for job_name in self._network_config.get_job_names():
+            latency_log_file_path = f"{result_path}/latency/{job_name}.csv"
+            if not os.path.exists(latency_log_file_path):
+                continue
+
+            latencies = pd.read_csv(latency_log_file_path)["latency (ms)"].to_numpy()
+            if len(latencies) == 0:
+                continue
+
+            stats = get_latency_stats(latencies, self._network_config.get_job_latency_slo(job_name))
+            stats["throughput"] = len(latencies) / duration
+            percentiles[job_name] = stats
+
+        return percentiles
@@ -0,0 +1,88 @@
+"""
+프로그램(program/*.py)을 가상 노드로 실행합니다. Emulator가 노드마다 이 스크립트로 프로그램을 실행합니다.
+
+    python emulation/VirtualNode.py --ip 192.168.1.6 --endpoints '{"192.168.1.2": "127.0.1.1", "192.168.1.6": "127.0.1.2"}' program/MDC.py
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from typing import Dict
+
+import argparse
+import json
+import runpy
+import socket
+
+from utils import ADDRESS_ENVIRONMENT_VARIABLE
+
+LOCAL_HOSTS = ["127.0.0.1", "localhost"]
+MQTT_PORT = 1883
+
+class VirtualNode:
+    """
+    한 호스트에서 프로그램을 가상 IP 주소의 노드로 실행합니다.
+
+    get_ip_address는 MDC_ADDRESS 환경 변수의 가상 IP 주소를 반환하고,
+    프로그램이 가상 노드의 IP 주소(또는 127.0.0.1)로 여는 연결은 그 노드의 loopback 주소에 있는 브로커로 바꿉니다.
+    연결은 항상 자신의 loopback 주소에서 보내므로, 브로커는 메시지를 보낸 노드를 알고 링크마다 bandwidth와 delay를 줄 수 있습니다.
+    프로그램의 코드는 바꾸지 않고, 연결을 여는 socket.create_connection만 감쌉니다. (paho-mqtt는 이 함수로 브로커에 연결합니다.)
+
+    Attributes:
+        _ip (str): 가상 노드의 IP 주소.
+        _endpoints (Dict[str, str]): 가상 노드의 IP 주소와 그 노드의 브로커가 listen하는 loopback 주소.
+        _port (int): 브로커가 listen하는 포트.
+    """
+    def __init__(self, ip: str, endpoints: Dict[str, str], port: int = MQTT_PORT):
+        self._check_validate(ip, endpoints)
+
+        self._ip: str = ip
+        self._endpoints: Dict[str, str] = endpoints
+        self._port: int = port
+
+    def _check_validate(self, ip: str, endpoints: Dict[str, str]):
+        """
+        가상 노드의 IP 주소에 loopback 주소가 있는 지 검증합니다.
+        """
+        if ip not in endpoints:
+            raise ValueError(f"Unknown ip: {ip}. ip must be in {list(endpoints.keys())}.")
+
+    def install(self) -> None:
+        os.environ[ADDRESS_ENVIRONMENT_VARIABLE] = self._ip
+
+        create_connection = socket.create_connection
+
+        def create_virtual_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None, **kwargs):
+            host, port = address[0], address[1]
+
+            if host in LOCAL_HOSTS:
+                host = self._ip
+
+            if host not in self._endpoints:
+                return create_connection(address, timeout, source_address, **kwargs)
+
+            return create_connection((self._endpoints[host], self._port), timeout, (self._endpoints[self._ip], 0), **kwargs)
+
+        socket.create_connection = create_virtual_connection
+
+    def run(self, program_path: str, program_args: list) -> None:
+        """
+        프로그램을 직접 실행한 것처럼 __main__으로 실행합니다.
+        """
+        self.install()
+
+        sys.argv = [program_path] + program_args
+        sys.path[0] = os.path.dirname(os.path.abspath(program_path))
+        runpy.run_path(program_path, run_name="__main__")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ip", required=True, help="가상 노드의 IP 주소.")
+    parser.add_argument("--endpoints", type=json.loads, required=True, help="가상 노드의 IP 주소와 브로커의 loopback 주소.")
+    parser.add_argument("--port", type=int, default=MQTT_PORT)
+    parser.add_argument("program", help="실행할 프로그램. (예: program/MDC.py)")
+    parser.add_argument("program_args", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    virtual_node = VirtualNode(args.ip, args.endpoints, args.port)
+    virtual_node.run(args.program, args.program_args)
@@ -0,0 +1,3 @@
+from emulation.Broker import Broker
+from emulation.VirtualNode import VirtualNode
+from emulation.Emulator import Emulator
@@ -0,0 +1,330 @@
+from typing import Optional, Tuple
+
+import mmap
+import time
+
+import numpy as np
+import posix_ipc
+
+DEFAULT_NUM_SLOTS = 8
+NS_PER_SECOND = 1_000_000_000
+
+# 읽는 동안 생산자가 슬롯을 계속 덮어쓰면 잠시 쉬었다가 다시 읽고, 이 횟수를 넘기면 포기합니다.
+READ_RETRY_INTERVAL = 0.001 # sec
+MAX_READ_RETRIES = 100
+
+# 생산자가 이 시간 동안 lock을 얻지 못하면 이전 생산자가 lock을 잡은 채로 죽었다고 보고 풉니다.
+LOCK_RECOVERY_TIMEOUT = 1.0 # sec
+
+# 공유 메모리 앞부분의 헤더(uint64)입니다. magic이 0이라면 아직 초기화하지 않았거나 생산자가 버린 링 버퍼입니다.
+MAGIC = 0x4D4443524E47 # "MDCRNG"
+HEADER_MAGIC, HEADER_NUM_SLOTS, HEADER_HEIGHT, HEADER_WIDTH, HEADER_DEPTH, HEADER_LATEST, HEADER_GENERATION = range(7)
+HEADER_FIELDS = 7
+
+# 슬롯마다의 헤더(uint64)입니다. 시퀀스 번호가 0이라면 슬롯을 쓰는 중이거나 비어 있습니다.
+SLOT_SEQUENCE, SLOT_TIMESTAMP = range(2)
+SLOT_FIELDS = 2
+
+UINT64_BYTES = 8
+
+class FrameRing:
+    """
+    POSIX 공유 메모리 위의 N개 슬롯 프레임 링 버퍼입니다.
+    생산자(Camera) 하나가 프레임을 차례로 슬롯에 쓰고, 여러 소비자(CameraSender 등)가 필요할 때만 가장 최근의 완성된 프레임을 읽습니다.
+
+    생산자는 슬롯의 시퀀스 번호를 0으로 지운 뒤 프레임과 타임스탬프를 쓰고, 마지막에 시퀀스 번호와 헤더의 latest를 기록합니다.
+    소비자는 공유 메모리에 아무것도 쓰지 않으며, 읽기 전후로 슬롯의 시퀀스 번호가 latest와 같은 지 확인하여 덮어써진(torn) 프레임을 버립니다.
+    생산자가 슬롯을 다시 쓰기까지 N - 1 프레임의 여유가 있으므로, 소비자는 그동안 복사 없이 슬롯을 직접 읽을 수 있습니다.
+
+    공유 메모리의 일반 load/store는 순서가 보장되지 않으므로(예: Jetson의 ARM), 헤더와 슬롯 헤더는 프로세스 사이의 named semaphore 안에서만 읽고 씁니다.
+    semaphore의 획득과 해제는 memory fence이므로, 시퀀스 번호를 지운 것이 프레임을 쓰기 전에, 프레임을 쓴 것이 새 시퀀스 번호보다 먼저 보입니다.
+    프레임 자체는 lock 밖에서 복사하므로 생산자와 소비자가 서로를 오래 기다리지 않습니다.
+
+    생산자(Camera)가 다시 시작해도 소비자는 계속 실행될 수 있으므로, 생산자는 lock을 지우고 새로 만들지 않고 이름으로 다시 엽니다.
+    생산자는 링 버퍼를 초기화할 때마다 헤더의 generation을 1 늘리고, 버리는 링 버퍼(unlink, 크기가 다른 이전 공유 메모리)의 magic은 0으로 지웁니다.
+    소비자는 헤더를 읽을 때마다 magic과 generation을 확인하고, 바뀌었다면 공유 메모리와 lock을 이름으로 다시 엽니다.
+
+    Attributes:
+        _name (str): 공유 메모리 이름.
+        _lock (posix_ipc.Semaphore): 헤더와 슬롯 헤더를 보호하는 프로세스 사이의 lock. (공유 메모리 이름 + "_lock")
+        _memory (posix_ipc.SharedMemory): 공유 메모리.
+        _map_file (mmap.mmap): 공유 메모리를 매핑한 파일.
+        _header (np.ndarray): 링 버퍼 헤더. [magic, num_slots, height, width, depth, latest, generation]
+        _slot_headers (np.ndarray): 슬롯마다의 [시퀀스 번호, 타임스탬프(ns)].
+        _slots (np.ndarray): 슬롯마다의 프레임. (num_slots, height, width, depth), uint8
+        _generation (int): 연 링 버퍼의 generation.
+    """
+    def __init__(self, name: str, shape: Optional[Tuple[int, int, int]] = None, num_slots: int = DEFAULT_NUM_SLOTS):
+        """
+        shape가 주어지면 생산자로서 공유 메모리를 만들고 초기화합니다. 주어지지 않으면 소비자로서 이미 있는 공유 메모리를 엽니다.
+
+        Args:
+            name (str): 공유 메모리 이름.
+            shape (Optional[Tuple[int, int, int]]): 프레임 크기 (height, width, depth).
+            num_slots (int): 슬롯 수. 생산자만 사용합니다.
+
+        Raises:
+            posix_ipc.ExistentialError: 소비자가 열려는 공유 메모리나 lock이 아직 없을 때.
+            ValueError: 슬롯 수가 2 미만이거나, 공유 메모리를 생산자가 아직 초기화하지 않았거나 프레임 링이 아닐 때.
+        """
+        self._name = name
+
+        if shape is None:
+            self._open()
+            return
+
+        if num_slots < 2:
+            raise ValueError(f"num_slots must be at least 2, but got {num_slots}.")
+
+        self._lock = posix_ipc.Semaphore(self._get_lock_name(name), posix_ipc.O_CREAT, mode=0o777, initial_value=1)
+        self._recover_lock()
+
+        size = self._get_size(num_slots, shape)
+
+        # 이전 실행에서 크기가 다른 공유 메모리가 남아 있다면, 붙어 있는 소비자가 다시 열도록 버린 뒤 새로 만듭니다.
+        # size를 주고 열면 이미 있는 공유 메모리의 크기를 바꾸므로(ftruncate), 소비자가 매핑한 공유 메모리를 줄이지 않도록 먼저 크기를 확인합니다.
+        try:
+            memory = posix_ipc.SharedMemory(name)
+
+            if memory.size != size:
+                self._abandon(memory)
+                memory.unlink()
+
+            memory.close_fd()
+        except posix_ipc.ExistentialError:
+            pass
+
+        memory = posix_ipc.SharedMemory(name, posix_ipc.O_CREAT, mode=0o777, size=size)
+
+        self._map_file = mmap.mmap(memory.fd, memory.size)
+        memory.close_fd()
+
+        self._header = np.ndarray((HEADER_FIELDS,), dtype=np.uint64, buffer=self._map_file)
+
+        with self._lock:
+            generation = int(self._header[HEADER_GENERATION]) + 1 if self._header[HEADER_MAGIC] == MAGIC else 1
+
+            self._header[:] = [0, num_slots, *shape, 0, generation]
+            self._map_slots(num_slots, shape)
+            self._slot_headers[:] = 0
+            self._header[HEADER_MAGIC] = MAGIC
+
+        self._generation = generation
+
+    def _open(self):
+        """
+        소비자로서 이미 있는 공유 메모리와 lock을 엽니다.
+
+        Raises:
+            posix_ipc.ExistentialError: 공유 메모리나 lock이 아직 없을 때.
+            ValueError: 공유 메모리가 아직 초기화되지 않았거나 프레임 링이 아닐 때.
+        """
+        memory = posix_ipc.SharedMemory(self._name)
+        map_file = mmap.mmap(memory.fd, memory.size)
+        memory.close_fd()
+
+        try:
+            lock = posix_ipc.Semaphore(self._get_lock_name(self._name))
+        except posix_ipc.ExistentialError:
+            map_file.close()
+            raise
+
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.uint64, buffer=map_file)
+
+        with lock:
+            magic = int(header[HEADER_MAGIC])
+            num_slots = int(header[HEADER_NUM_SLOTS])
+            shape = tuple(int(size) for size in header[HEADER_HEIGHT:HEADER_DEPTH + 1])
+            generation = int(header[HEADER_GENERATION])
+
+        if magic != MAGIC:
+            header = None
+            map_file.close()
+            lock.close()
+            raise ValueError(f"Shared memory {self._name} is not a frame ring.")
+
+        self._lock = lock
+        self._map_file = map_file
+        self._header = header
+        self._map_slots(num_slots, shape)
+        self._generation = generation
+
+    def _reopen(self) -> bool:
+        """
+        생산자가 링 버퍼를 다시 초기화했거나 버렸다면 공유 메모리와 lock을 다시 엽니다.
+
+        Returns:
+            bool: 다시 열었는 지 여부. 새 링 버퍼가 아직 없다면 이전 링 버퍼를 그대로 둡니다.
+        """
+        previous_lock, previous_map_file = self._lock, self._map_file
+
+        try:
+            self._open()
+        except (posix_ipc.ExistentialError, ValueError):
+            return False
+
+        previous_lock.close()
+
+        # copy=False로 반환한 프레임이 이전 공유 메모리를 가리키고 있다면, mmap은 그 배열이 사라질 때 닫힙니다.
+        try:
+            previous_map_file.close()
+        except BufferError:
+            pass
+
+        return True
+
+    def _is_stale(self) -> bool:
+        """
+        lock 안에서 호출하며, 연 링 버퍼가 버려졌거나 다시 초기화되었는 지 여부를 반환합니다.
+        """
+        return self._header[HEADER_MAGIC] != MAGIC or int(self._header[HEADER_GENERATION]) != self._generation
+
+    def _recover_lock(self):
+        """
+        이전 생산자가 lock을 잡은 채로 죽었다면 풉니다. 소비자가 붙어 있을 수 있으므로 lock을 지우고 새로 만들지 않습니다.
+        """
+        try:
+            self._lock.acquire(LOCK_RECOVERY_TIMEOUT)
+        except posix_ipc.BusyError:
+            pass
+
+        self._lock.release()
+
+    def _abandon(self, memory: posix_ipc.SharedMemory):
+        """
+        버리는 공유 메모리의 magic을 지워, 붙어 있는 소비자가 다시 열게 합니다.
+        """
+        if memory.size < HEADER_FIELDS * UINT64_BYTES:
+            return
+
+        map_file = mmap.mmap(memory.fd, HEADER_FIELDS * UINT64_BYTES)
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.uint64, buffer=map_file)
+
+        with self._lock:
+            header[HEADER_MAGIC] = 0
+
+        header = None
+        map_file.close()
+
+    def _map_slots(self, num_slots: int, shape: Tuple[int, int, int]):
+        self._slot_headers = np.ndarray((num_slots, SLOT_FIELDS), dtype=np.uint64, buffer=self._map_file, offset=HEADER_FIELDS * UINT64_BYTES)
+        self._slots = np.ndarray((num_slots, *shape), dtype=np.uint8, buffer=self._map_file, offset=(HEADER_FIELDS + num_slots * SLOT_FIELDS) * UINT64_BYTES)
+
+    @staticmethod
+    def _get_lock_name(name: str) -> str:
+        return f"{name}_lock"
+
+    @staticmethod
+    def _get_size(num_slots: int, shape: Tuple[int, int, int]) -> int:
+        return (HEADER_FIELDS + num_slots * SLOT_FIELDS) * UINT64_BYTES + num_slots * int(np.prod(shape))
+
+    def get_shape(self) -> Tuple[int, int, int]:
+        return self._slots.shape[1:]
+
+    def get_num_slots(self) -> int:
+        return self._slots.shape[0]
+
+    def get_latest_sequence(self) -> int:
+        """
+        가장 최근에 완성된 프레임의 시퀀스 번호를 반환합니다. 아직 프레임이 없다면 0입니다.
+        """
+        with self._lock:
+            is_stale = self._is_stale()
+            sequence = int(self._header[HEADER_LATEST])
+
+        if is_stale:
+            return 0 if not self._reopen() else self.get_latest_sequence()
+
+        return sequence
+
+    def write(self, frame: np.ndarray) -> int:
+        """
+        프레임을 다음 슬롯에 쓰고, 프레임의 시퀀스 번호를 반환합니다. 생산자 하나만 호출해야 합니다.
+
+        Raises:
+            ValueError: 프레임 크기가 링 버퍼의 프레임 크기와 다를 때.
+        """
+        if frame.shape != self.get_shape():
+            raise ValueError(f"Frame shape must be {self.get_shape()}, but got {frame.shape}.")
+
+        with self._lock:
+            sequence = int(self._header[HEADER_LATEST]) + 1
+            slot = sequence % self.get_num_slots()
+            self._slot_headers[slot, SLOT_SEQUENCE] = 0
+
+        np.copyto(self._slots[slot], frame)
+
+        with self._lock:
+            self._slot_headers[slot, SLOT_TIMESTAMP] = int(time.time() * NS_PER_SECOND)
+            self._slot_headers[slot, SLOT_SEQUENCE] = sequence
+            self._header[HEADER_LATEST] = sequence
+
+        return sequence
+
+    def read_latest(self, copy: bool = True) -> Optional[Tuple[int, int, np.ndarray]]:
+        """
+        가장 최근에 완성된 프레임을 읽습니다.
+        copy가 False라면 슬롯을 그대로 가리키는 읽기 전용 배열을 반환하며, 다 쓴 뒤 is_current로 그동안 덮어써지지 않았는 지 확인해야 합니다.
+
+        Returns:
+            Optional[Tuple[int, int, np.ndarray]]: 시퀀스 번호, 타임스탬프(ns), 프레임. 아직 프레임이 없거나 MAX_READ_RETRIES 동안 완성된 프레임을 읽지 못했다면 None.
+        """
+        for retry in range(MAX_READ_RETRIES):
+            if retry > 0:
+                time.sleep(READ_RETRY_INTERVAL)
+
+            with self._lock:
+                is_stale = self._is_stale()
+                sequence = int(self._header[HEADER_LATEST])
+                slot = sequence % self.get_num_slots()
+                slot_sequence = int(self._slot_headers[slot, SLOT_SEQUENCE])
+                timestamp = int(self._slot_headers[slot, SLOT_TIMESTAMP])
+
+            # 생산자가 다시 시작했다면 새 링 버퍼를 열고 처음부터 읽습니다. 아직 없다면 프레임이 없는 것과 같습니다.
+            if is_stale:
+                if not self._reopen():
+                    return None
+                continue
+
+            if sequence == 0:
+                return None
+
+            if slot_sequence != sequence:
+                continue
+
+            if copy:
+                frame = self._slots[slot].copy()
+            else:
+                frame = self._slots[slot].view()
+                frame.flags.writeable = False
+
+            # 읽는 동안 생산자가 슬롯을 다시 썼다면 새로운 latest를 읽습니다.
+            if self.is_current(sequence):
+                return sequence, timestamp, frame
+
+        return None
+
+    def is_current(self, sequence: int) -> bool:
+        """
+        시퀀스 번호의 프레임이 아직 슬롯에 그대로 남아 있는 지 여부를 반환합니다. 생산자가 링 버퍼를 다시 초기화했거나 버렸다면 False입니다.
+        """
+        with self._lock:
+            return not self._is_stale() and int(self._slot_headers[sequence % self.get_num_slots(), SLOT_SEQUENCE]) == sequence
+
+    def close(self):
+        # 공유 메모리를 가리키는 배열이 남아 있으면 mmap을 닫을 수 없습니다.
+        self._header = self._slot_headers = self._slots = None
+        self._map_file.close()
+        self._lock.close()
+
+    def unlink(self):
+        """
+        공유 메모리를 닫고 삭제합니다. 생산자만 호출합니다.
+        magic을 먼저 지우므로, 붙어 있는 소비자는 다음 생산자가 만든 링 버퍼를 다시 엽니다.
+        """
+        with self._lock:
+            self._header[HEADER_MAGIC] = 0
+
+        self.close()
+        posix_ipc.unlink_shared_memory(self._name)
+        posix_ipc.unlink_semaphore(self._get_lock_name(self._name))
@@ -0,0 +1 @@
+from ipc.FrameRing import FrameRing
\ No newline at end of file
@@ -1,76 +1,217 @@
-from typing import List, Dict
+from typing import List, Dict, Tuple, Union
 
 import torch
+import threading
+import time
 
 from config.ModelConfig import ModelConfig
-from utils.utils import load_model
-from calflops import calculate_flops
+from job import ONNXModel
+from job.ModelProfileCache import ModelProfileCache
+from utils.model_utils import load_model, export_onnx, get_postprocess, get_example_input, calculate_gflops, get_bytes
 
 KB_PER_BYTE = 1024
 
 class DNNModels:
     """
     모델 정보를 관리하는 클래스입니다.
+    노드에 배정된 모델만 백그라운드에서 병렬로 불러오고 warmup합니다.
+    배정되지 않은 모델은 서브태스크가 처음 사용할 때 불러옵니다.
+    서브모듈 구간으로 정의된 stage는 그 구간의 파티션만 불러옵니다.
 
     Attributes:
+        _model_config (ModelConfig): 모델 설정 정보.
+        _device (str): 모델을 실행하는 노드의 디바이스(cpu, cuda).
         _models (Dict[str, torch.nn.Module]): 모델 이름과 실제 모델.
+        _onnx_models (Dict[str, ONNXModel]): 모델 이름과 ONNX 모델. backend가 onnx일 때만 사용합니다.
+        _backend (str): 모델을 실행하는 백엔드(torch, onnx).
         _computing (Dict[str, float]): 모델 이름과 계산량 (GFLOPs).
-        _transfer (Dict[str, float]): 모델 이름과 전송량 (KB).
+        _transfer (Dict[str, float]): 모델 이름과 전송량 (KB). 출력을 transfer_dtype으로 전송할 때의 크기입니다.
+        _profile_cache (ModelProfileCache): 계산량과 전송량의 프로파일 캐시.
+        _load_mutexes (Dict[str, threading.Lock]): 모델 이름과 모델을 한 번만 불러오기 위한 lock.
+        _ready_events (Dict[str, threading.Event]): 모델 이름과 모델을 불러오고 warmup까지 마쳤는 지 여부.
     """
-    def __init__(self, model_config: ModelConfig, device: str):
+    def __init__(self, model_config: ModelConfig, device: str, backend: str = "torch", preload_model_names: List[str] = None):
         """
         Args:
-            model_names (List[str]): 모델 이름들.
             model_config (ModelConfig): 모델 설정 정보.
             device (str): 모델을 실행하는 노드의 디바이스(cpu, cuda).
+            backend (str): 모델을 실행하는 백엔드(torch, onnx). onnx는 onnxruntime의 CPU provider로 실행합니다.
+            preload_model_names (List[str]): 백그라운드에서 미리 불러올 모델 이름들. None이라면 모든 모델을 불러옵니다.
         """
+        self._model_config = model_config
+        self._device = device
         self._models: Dict[str, torch.nn.Module] = {}
+        self._onnx_models: Dict[str, ONNXModel] = {}
+        self._backend = backend
         self._computing: Dict[str, float] = {}
         self._transfer: Dict[str, float] = {}
+        self._profile_cache = ModelProfileCache()
 
-        self._init_models(model_config, device)
-
-    def _init_models(self, model_config: ModelConfig, device: str):
         model_names = model_config.get_model_names()
+        self._load_mutexes: Dict[str, threading.Lock] = {model_name: threading.Lock() for model_name in model_names}
+        self._ready_events: Dict[str, threading.Event] = {model_name: threading.Event() for model_name in model_names}
+
+        self._init_computing_and_transfer()
+        self._init_models(model_names if preload_model_names is None else preload_model_names)
+
+    def _init_computing_and_transfer(self):
+        """
+        프로파일 캐시에 있는 모델은 모델을 불러오지 않고 계산량과 전송량을 설정합니다.
+        캐시에 없는 모델은 모델을 불러올 때 프로파일링합니다.
+        """
+        for model_name in self._model_config.get_model_names():
+            input_size = self._model_config.get_input_size(model_name)
+            profile_name = self._model_config.get_profile_name(model_name)
+
+            # 가중치가 바뀐 프로파일은 모델을 불러온 뒤 다시 프로파일링합니다.
+            if self._profile_cache.is_stale(profile_name, input_size):
+                continue
+
+            profile = self._profile_cache.get_profile(profile_name, input_size)
+
+            self._computing[model_name] = profile["computing"] # GFLOPs
+            self._transfer[model_name] = self._get_profile_transfer(model_name) # KB
+
+    def _get_profile_transfer(self, model_name: str) -> float:
+        """
+        프로파일의 출력 크기로부터 stage의 출력을 transfer_dtype으로 전송할 때의 전송량을 계산합니다. (KB)
+        """
+        return self._profile_cache.get_transfer(self._model_config.get_profile_name(model_name),
+                                                self._model_config.get_input_size(model_name),
+                                                self._model_config.get_transfer_dtype(model_name))
+
+    def _init_models(self, model_names: List[str]):
+        """
+        모델들을 모델마다 하나의 스레드에서 병렬로 불러옵니다.
+        """
         for model_name in model_names:
-            model = load_model(model_name).to(device)
+            if model_name not in self._ready_events:
+                continue
+
+            load_model_thread = threading.Thread(target=self._load_model, args=(model_name,))
+            load_model_thread.start()
+
+    def _load_model(self, model_name: str):
+        """
+        모델을 불러오고 warmup합니다. 이미 불러왔거나 다른 스레드가 불러오는 중이라면 끝날 때까지 기다립니다.
+        """
+        with self._load_mutexes[model_name]:
+            if self._ready_events[model_name].is_set():
+                return
+
+            start_time = time.time()
+
+            model = load_model(self._model_config.get_base_model(model_name), self._model_config.get_submodules(model_name)).to(self._device)
+            input_size = self._model_config.get_input_size(model_name)
+            if model_name not in self._computing:
+                profile = self._profile_model(model_name, model, input_size)
+                self._computing[model_name] = profile["computing"] # GFLOPs
+                self._transfer[model_name] = self._get_profile_transfer(model_name) # KB
+
             self._models[model_name] = model
-        
-        self._init_computing_and_transfer(model_config, device)
 
-    def _init_computing_and_transfer(self, model_config: ModelConfig, device: str):
-        for model_name, model in self._models.items():
-            input_size = model_config.get_input_size(model_name)
+            if self._backend == "onnx":
+                self._init_onnx_model(model_name)
+
+            self._warmup(model_name)
+            self._ready_events[model_name].set()
 
-            with torch.no_grad():
-                FLOPs, _, _ = calculate_flops(model=model, 
-                                            input_shape=input_size,
-                                            output_as_string=False,
-                                            output_precision=4,
-                                            print_results=False)
+            print(f"Model {model_name} is ready. ({time.time() - start_time:.2f} sec)")
 
-                self._computing[model_name] = FLOPs * 1e-9 # GFLOPs
+    def _init_onnx_model(self, model_name: str):
+        input_size = self._model_config.get_input_size(model_name)
+        dynamic_batch = self._model_config.get_dynamic_batch(model_name)
 
-                x: torch.Tensor = torch.zeros(input_size).to(device)
+        base_model_name = self._model_config.get_base_model(model_name)
+        submodules = self._model_config.get_submodules(model_name)
+        model = self._models[model_name]
 
-                x = model(x)
+        onnx_paths = export_onnx(base_model_name, input_size, dynamic_batch, submodules=submodules)
+        postprocess = get_postprocess(base_model_name, submodules)
 
-                if isinstance(x, list):
-                    self._transfer[model_name] = sum(x_prime.numel() * x_prime.element_size() for x_prime in x) / KB_PER_BYTE # KB
-                else:
-                    self._transfer[model_name] = x.numel() * x.element_size() / KB_PER_BYTE # KB
+        # 후처리가 있다면 ONNX의 마지막 출력(예: pred)을 후처리하므로, 모델의 출력 이름(예: detections)을 사용하지 않습니다.
+        self._onnx_models[model_name] = ONNXModel(onnx_paths,
+                                                  postprocess,
+                                                  input_names=getattr(model, "input_names", None),
+                                                  output_names=getattr(model, "output_names", None) if postprocess is None else None)
+
+    def _get_example_input(self, model_name: str) -> Union[torch.Tensor, List[torch.Tensor]]:
+        """
+        모델의 예시 입력을 반환합니다. 서브모듈 구간이라면 구간 앞에서 살아 있는 텐서들입니다.
+        """
+        x = get_example_input(self._model_config.get_base_model(model_name), self._model_config.get_input_size(model_name), self._model_config.get_submodules(model_name))
+
+        return [t.to(self._device) for t in x] if isinstance(x, list) else x.to(self._device)
+
+    def _warmup(self, model_name: str):
+        model = self._onnx_models[model_name] if self._backend == "onnx" else self._models[model_name]
+        x = self._get_example_input(model_name)
+
+        with torch.no_grad():
+            model(x)
+
+    def _profile_model(self, model_name: str, model: torch.nn.Module, input_size: Tuple[int, ...]) -> Dict[str, any]:
+        """
+        모델의 계산량과 전송량, 출력 크기를 측정하여 캐시에 저장합니다.
+        """
+        x = self._get_example_input(model_name)
+        computing = calculate_gflops(model, x) # GFLOPs
+
+        with torch.no_grad():
+            x = model(x)
+
+        outputs = x if isinstance(x, list) else [x]
+
+        transfer = get_bytes(outputs) / KB_PER_BYTE # KB
+        output_shapes = [list(output.shape) for output in outputs]
+        output_dtypes = [str(output.dtype).replace("torch.", "") for output in outputs]
+
+        profile_name = self._model_config.get_profile_name(model_name)
+        self._profile_cache.set_profile(profile_name, input_size, computing, transfer, output_shapes, output_dtypes)
+
+        return self._profile_cache.get_profile(profile_name, input_size)
+
+    def is_ready(self, model_name: str) -> bool:
+        """
+        모델을 불러오고 warmup까지 마쳤는 지 여부를 반환합니다.
+        """
+        return self._ready_events[model_name].is_set()
+
+    def get_ready_model_names(self) -> List[str]:
+        return [model_name for model_name, ready_event in self._ready_events.items() if ready_event.is_set()]
+
+    def get_model(self, model_name: str) -> Union[torch.nn.Module, ONNXModel]:
+        """
+        모델을 반환합니다. 아직 불러오지 않은 모델이라면 불러온 뒤 반환합니다.
+        """
+        if not self._ready_events[model_name].is_set():
+            self._load_model(model_name)
+
+        if self._backend == "onnx":
+            return self._onnx_models[model_name]
 
-    def get_model(self, model_name: str) -> torch.nn.Module:
         return self._models[model_name]
 
     def get_computing(self, model_name: str) -> float:
         """
         모델 이름을 입력으로 받아, 모델의 계산량을 반환합니다. (GFLOPs)
         """
+        if model_name not in self._computing:
+            self._load_model(model_name)
+
         return self._computing[model_name]
 
     def get_transfer(self, model_name: str) -> float:
         """
         모델 이름을 입력으로 받아, 모델의 전송량을 반환합니다. (KB)
         """
-        return self._transfer[model_name]
\ No newline at end of file
+        if model_name not in self._transfer:
+            self._load_model(model_name)
+
+        return self._transfer[model_name]
+
+    def get_transfer_dtype(self, model_name: str) -> str:
+        """
+        모델 이름을 입력으로 받아, 모델의 출력을 전송할 때의 정밀도를 반환합니다. (예: float16)
+        """
+        return self._model_config.get_transfer_dtype(model_name)
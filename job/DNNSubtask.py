@@ -1,6 +1,10 @@
+from typing import Union
+
 import torch
 
-from job import SubtaskInfo, DNNOutput
+from job import SubtaskInfo, DNNOutput, ONNXModel
+from utils.model_utils import normalize_frame
+from utils.video_utils import decode_frame
 
 class DNNSubtask:
     """
@@ -8,16 +12,18 @@ class DNNSubtask:
 
     Attributes:
         _subtask_info (SubtaskInfo): 서브태스크 정보.
-        _dnn_model (torch.nn.Module): 실제 모델.
+        _dnn_model (Union[torch.nn.Module, ONNXModel]): 실제 모델. onnx 백엔드라면 onnxruntime으로 실행하는 ONNXModel.
         _computing_capacity (float): 모델의 계산량 (GFLOPs).
         _transfer_capacity (float): 전송량 (KB).
+        _transfer_dtype (torch.dtype): 전송할 때 실수 텐서의 정밀도.
     """
-    def __init__(self, subtask_info: SubtaskInfo, dnn_model: torch.nn.Module, computing_capacity: float, transfer_capacity: float):
+    def __init__(self, subtask_info: SubtaskInfo, dnn_model: Union[torch.nn.Module, ONNXModel], computing_capacity: float, transfer_capacity: float, transfer_dtype: str = "float32"):
         self._subtask_info = subtask_info
         self._dnn_model = dnn_model
 
         self._computing_capacity = computing_capacity
         self._transfer_capacity = transfer_capacity
+        self._transfer_dtype: torch.dtype = getattr(torch, transfer_dtype)
 
     @property
     def subtask_info(self) -> SubtaskInfo:
@@ -34,6 +40,8 @@ class DNNSubtask:
         """
         data를 입력으로 받아, 서브태스크를 실행합니다.
         서브태스크가 계산일 경우 모델을 계산하고, 전송일 경우 데이터를 복사하여 DNNOutput 객체를 생성합니다.
+        전송할 때 실수 텐서는 transfer_dtype으로 바꾸고, 계산할 때 다시 float32로 바꿉니다.
+        sender의 uint8 프레임은 그대로 전송하고, 계산할 때 모델 입력으로 정규화합니다. 압축된 프레임이라면 계산할 때 압축을 풉니다.
 
         Args:
             data (torch.Tensor): 서브태스크의 입력 데이터.
@@ -44,12 +52,17 @@ class DNNSubtask:
         if self._subtask_info.is_transmission():
             # 단순히 데이터를 복사하여 DNNOutput 객체를 생성합니다.
             if isinstance(data, list):
-                data = [d.to("cpu") for d in data]
+                data = [self._to_transfer_tensor(d) for d in data]
             else:
-                data = data.to("cpu")
+                data = self._to_transfer_tensor(data)
 
             dnn_output = DNNOutput(data, self._subtask_info)
         else:
+            if isinstance(data, list):
+                data = [self._to_model_tensor(d) for d in data]
+            else:
+                data = self._to_model_tensor(data)
+
             # 모델 계산
             with torch.no_grad():
                 output: torch.Tensor = self._dnn_model(data)
@@ -61,4 +74,23 @@ class DNNSubtask:
 
             dnn_output = DNNOutput(output, self._subtask_info)
         
-        return dnn_output
\ No newline at end of file
+        return dnn_output
+    
+    def _to_transfer_tensor(self, tensor: torch.Tensor) -> torch.Tensor:
+        if tensor.is_floating_point():
+            return tensor.to("cpu", dtype=self._transfer_dtype)
+
+        return tensor.to("cpu")
+
+    def _to_model_tensor(self, tensor: torch.Tensor) -> torch.Tensor:
+        # 모델의 중간 출력은 uint8이 아니므로, uint8 텐서는 sender의 프레임입니다. 1차원이라면 압축된 프레임입니다.
+        if tensor.dtype == torch.uint8:
+            if tensor.dim() == 1:
+                tensor = torch.from_numpy(decode_frame(tensor.cpu().numpy())).unsqueeze(0).to(tensor.device)
+
+            return normalize_frame(tensor)
+
+        if tensor.is_floating_point() and tensor.dtype != torch.float32:
+            return tensor.float()
+
+        return tensor
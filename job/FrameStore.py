@@ -0,0 +1,142 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_CAPACITY = 64 # frames
+DEFAULT_MAX_AGE = 300 # sec
+
+class FrameStore:
+    """
+    sender가 보낸 프레임을 SubtaskInfo가 돌아올 때까지 보관하는 저장소입니다.
+    Controller가 스케줄링하지 않거나 버린 작업의 프레임이 쌓이지 않도록 개수(capacity)와 보관 시간(max_age)을 제한합니다.
+
+    개수를 넘으면 가장 오래 사용하지 않은 프레임부터 버리고(eviction),
+    max_age 동안 SubtaskInfo가 돌아오지 않은 프레임은 작업이 버려졌다고 보고 버립니다(orphan).
+
+    Attributes:
+        _capacity (int): 보관할 수 있는 최대 프레임 수.
+        _max_age (float): 프레임을 보관하는 최대 시간. (sec)
+        _frames (OrderedDict[str, Tuple[np.ndarray, float]]): job_id와 프레임, 보관을 시작한 시간(sec). 오래 사용하지 않은 순서입니다.
+        _bytes (int): 보관 중인 프레임들의 크기. (Byte)
+        _eviction_count (int): 개수 제한으로 버린 프레임 수.
+        _orphan_count (int): max_age 동안 SubtaskInfo가 돌아오지 않아 버린 프레임 수.
+        _miss_count (int): SubtaskInfo가 돌아왔지만 프레임이 이미 버려진 횟수.
+        _mutex (threading.Lock): 전송 스레드와 SubtaskInfo 처리 스레드 사이의 lock.
+    """
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, max_age: float = DEFAULT_MAX_AGE):
+        """
+        Args:
+            capacity (int): 보관할 수 있는 최대 프레임 수.
+            max_age (float): 프레임을 보관하는 최대 시간. (sec)
+        """
+        self._check_validate(capacity, max_age)
+
+        self._capacity: int = capacity
+        self._max_age: float = max_age
+        self._frames: Dict[str, Tuple[np.ndarray, float]] = OrderedDict()
+        self._bytes: int = 0
+
+        self._eviction_count: int = 0
+        self._orphan_count: int = 0
+        self._miss_count: int = 0
+
+        self._mutex = threading.Lock()
+
+    def _check_validate(self, capacity: int, max_age: float):
+        """
+        최대 프레임 수와 최대 보관 시간이 올바른지 검증합니다.
+        """
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, but got {capacity}")
+
+        if max_age <= 0:
+            raise ValueError(f"max_age must be positive, but got {max_age}")
+
+    def put(self, job_id: str, frame: np.ndarray) -> None:
+        """
+        프레임을 보관합니다. 보관 시간이 지난 프레임을 먼저 버리고, 그래도 개수를 넘으면 가장 오래 사용하지 않은 프레임을 버립니다.
+        """
+        with self._mutex:
+            now = time.time()
+
+            if job_id in self._frames:
+                self._remove(job_id)
+
+            self._frames[job_id] = (frame, now)
+            self._bytes += frame.nbytes
+
+            self._remove_expired(now)
+
+            while len(self._frames) > self._capacity:
+                self._remove(next(iter(self._frames)))
+                self._eviction_count += 1
+
+    def get(self, job_id: str) -> Optional[np.ndarray]:
+        """
+        프레임을 꺼내지 않고 반환합니다. 없다면 None을 반환합니다.
+        """
+        with self._mutex:
+            if job_id not in self._frames:
+                self._miss_count += 1
+                return None
+
+            self._frames.move_to_end(job_id)
+            return self._frames[job_id][0]
+
+    def pop(self, job_id: str) -> Optional[np.ndarray]:
+        """
+        프레임을 꺼내 반환합니다. 없다면 None을 반환합니다.
+        """
+        with self._mutex:
+            if job_id not in self._frames:
+                self._miss_count += 1
+                return None
+
+            return self._remove(job_id)
+
+    def _remove(self, job_id: str) -> np.ndarray:
+        frame, _ = self._frames.pop(job_id)
+        self._bytes -= frame.nbytes
+
+        return frame
+
+    def _remove_expired(self, now: float):
+        """
+        보관 시간이 지난 프레임을 앞(오래 사용하지 않은 프레임)에서부터 버립니다.
+        get으로 뒤로 옮겨진 프레임은 앞의 프레임들이 모두 버려진 뒤에 버려집니다.
+        """
+        while self._frames:
+            job_id, (_, put_time) = next(iter(self._frames.items()))
+
+            if now - put_time < self._max_age:
+                break
+
+            self._remove(job_id)
+            self._orphan_count += 1
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def get_bytes(self) -> int:
+        """
+        보관 중인 프레임들의 크기를 반환합니다. (Byte)
+        """
+        return self._bytes
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: 보관 중인 프레임 수(frames), 크기(bytes), 버린 프레임 수(evictions, orphans), 프레임이 없던 횟수(misses).
+        """
+        with self._mutex:
+            return {
+                "frames": len(self._frames),
+                "bytes": self._bytes,
+                "evictions": self._eviction_count,
+                "orphans": self._orphan_count,
+                "misses": self._miss_count,
+            }
@@ -1,7 +1,7 @@
-from typing import Tuple
+from typing import Dict, List, Tuple
 import torch
 
-from job import *
+from job import SubtaskInfo, DNNOutput, DNNSubtask, DNNModels
 from utils import *
 from communication import *
 from virtual_queue import VirtualQueue, AheadOutputQueue
@@ -25,18 +25,22 @@ class JobManager:
 
     Attributes:
         _device (str): 모델을 실행하는 노드의 디바이스(cpu, cuda).
+        _backend (str): 모델을 실행하는 백엔드(torch, onnx).
         _network_config (NetworkConfig): 네트워크 설정.
         _model_config (ModelConfig): 모델 설정.
         _dnn_models (DNNModels): 모델 모음.
         _virtual_queue (VirtualQueue): 가상큐. 서브태스크를 저장 및 관리.
         _ahead_of_time_outputs (AheadOutputQueue): 대기큐. 미리 도착한 DNNOutput을 저장 및 관리.
     """
-    def __init__(self, network_config: NetworkConfig, model_config: ModelConfig):
-        self._device = "cuda" if torch.cuda.is_available() else "cpu"
+    def __init__(self, network_config: NetworkConfig, model_config: ModelConfig, ip: str):
+        self._backend = network_config.get_backend(ip)
+        # onnx 백엔드는 CPU provider로 실행하므로 입력을 GPU로 옮기지 않습니다.
+        self._device = "cuda" if torch.cuda.is_available() and self._backend == "torch" else "cpu"
 
         self._network_config = network_config
         self._model_config = model_config
-        self._dnn_models: DNNModels = DNNModels(model_config, self._device)
+        # 노드에 배정된 모델만 백그라운드에서 미리 불러오고, 나머지는 처음 사용할 때 불러옵니다.
+        self._dnn_models: DNNModels = DNNModels(model_config, self._device, self._backend, network_config.get_models(ip))
 
         self._virtual_queue: VirtualQueue = VirtualQueue()
         self._ahead_of_time_outputs: AheadOutputQueue = AheadOutputQueue()
@@ -88,6 +92,12 @@ class JobManager:
         """
         return self._ahead_of_time_outputs.pop_dnn_output(subtask_info)
 
+    def get_ready_model_names(self) -> List[str]:
+        """
+        불러오고 warmup까지 마친 모델 이름들을 반환합니다.
+        """
+        return self._dnn_models.get_ready_model_names()
+
     def get_backlogs(self) -> Dict[LayerNodePair, float]:
         return self._virtual_queue.get_backlogs()
         
@@ -157,19 +167,23 @@ class JobManager:
             subtask_info (SubtaskInfo): 서브태스크 정보.
         """
         model_name = subtask_info.model_name
-        model: torch.nn.Module = self._dnn_models.get_model(model_name) if model_name != "" else None
+        # 전송 서브태스크는 모델을 실행하지 않으므로 모델을 불러오지 않습니다.
+        model: torch.nn.Module = self._dnn_models.get_model(model_name) if subtask_info.is_computing() else None
         # computing 이라면 항상 모델이 존재합니다.
         computing_capacity = self._dnn_models.get_computing(model_name) if subtask_info.is_computing() else 0 # GFLOPs
         if subtask_info.is_transmission():
             transfer_capacity = self._dnn_models.get_transfer(model_name) if model_name != "" else subtask_info.input_bytes # KB
         else:
             transfer_capacity = 0
+        # 모델을 실행하기 전의 입력(model_name이 "")은 그대로 전송합니다.
+        transfer_dtype = self._dnn_models.get_transfer_dtype(model_name) if subtask_info.is_transmission() and model_name != "" else "float32"
 
         subtask = DNNSubtask(
             subtask_info = subtask_info,
             dnn_model = model,
             computing_capacity = computing_capacity,
-            transfer_capacity = transfer_capacity
+            transfer_capacity = transfer_capacity,
+            transfer_dtype = transfer_dtype
         )
 
         success_add_subtask_info = self._virtual_queue.add_subtask_info(subtask_info, subtask)
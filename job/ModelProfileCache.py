@@ -0,0 +1,183 @@
+from typing import Dict, List, Optional, Tuple
+
+import hashlib
+import json
+import os
+import threading
+
+MODEL_PROFILE_PATH = "spec/model_profile.json"
+KB_PER_BYTE = 1024
+
+# 텐서 자료형과 원소 하나의 크기입니다. (Byte)
+DTYPE_BYTES = {
+    "float64": 8,
+    "float32": 4,
+    "float16": 2,
+    "bfloat16": 2,
+    "int64": 8,
+    "int32": 4,
+    "uint8": 1,
+    "bool": 1,
+}
+FLOATING_DTYPES = ["float64", "float32", "float16", "bfloat16"]
+
+# 모델 이름과 가중치 위치입니다.
+# 파일이나 폴더라면 그 내용을 해시하고, 존재하지 않는다면(예: torchvision pretrained 가중치) 문자열 자체를 해시합니다.
+MODEL_WEIGHTS = {
+    "yolov5": "yolov5/weights",
+    "resnet-18": "torchvision/resnet18/IMAGENET1K_V1",
+    "resnet-50": "torchvision/resnet50/IMAGENET1K_V1",
+    "mobilenet_v2": "torchvision/mobilenet_v2/IMAGENET1K_V1",
+}
+
+# 나뉜 가중치를 합친 파일(yolov5.Yolov5.consolidate_weights)은 같은 가중치이므로 해시하지 않습니다.
+DERIVED_WEIGHTS_FILE_NAMES = ["yolov5.pt"]
+
+class ModelProfileCache:
+    """
+    모델의 계산량(GFLOPs), 전송량(KB), 출력 크기를 파일에 저장하고 불러오는 클래스입니다.
+    모델(프로파일) 이름과 입력 크기를 키로 사용하고, 프로파일링한 가중치의 해시는 프로파일 안에 저장합니다.
+
+    torch를 사용하지 않으므로 Controller는 이 파일만 읽고 모델을 불러오지 않으며, 가중치 파일도 열지 않습니다.
+    가중치 해시는 노드만 계산합니다. 노드는 캐시가 없거나 가중치가 바뀐(is_stale) 모델만 프로파일링하여 캐시를 덮어씁니다.
+
+    Attributes:
+        _path (str): 캐시 파일 경로.
+        _profiles (Dict[str, Dict[str, any]]): 캐시 키와 프로파일.
+        _weights_hashes (Dict[str, str]): 모델 이름과 가중치 해시.
+        _mutex (threading.Lock): 캐시 파일 쓰기 lock.
+    """
+    def __init__(self, path: str = MODEL_PROFILE_PATH):
+        self._path = path
+        self._profiles: Dict[str, Dict[str, any]] = {}
+        self._weights_hashes: Dict[str, str] = {}
+        self._mutex = threading.Lock()
+
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self._path):
+            return
+
+        with open(self._path, 'r') as file:
+            profiles = json.load(file)
+
+        # 예전 캐시는 키에 가중치 해시가 있으므로 프로파일의 모델 이름과 입력 크기로 키를 다시 만듭니다.
+        for profile in profiles.values():
+            self._profiles[self._get_key(profile["model_name"], profile["input_size"])] = profile
+
+    def save(self):
+        """
+        캐시를 파일에 저장합니다. 쓰는 도중에 다른 프로세스가 읽더라도 깨진 파일을 읽지 않도록 임시 파일을 교체합니다.
+        """
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_path = f"{self._path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as file:
+            json.dump(self._profiles, file, indent=4, sort_keys=True)
+
+        os.replace(temp_path, self._path)
+
+    def get_profile(self, model_name: str, input_size: Tuple[int, ...]) -> Optional[Dict[str, any]]:
+        """
+        Returns:
+            Optional[Dict[str, any]]: computing (GFLOPs), transfer (KB), output_shapes, output_dtypes를 담은 프로파일. 없다면 None.
+        """
+        return self._profiles.get(self._get_key(model_name, input_size))
+
+    def is_stale(self, model_name: str, input_size: Tuple[int, ...]) -> bool:
+        """
+        프로파일이 없거나, 프로파일링한 가중치가 지금의 가중치와 다른 지 여부를 반환합니다.
+        가중치를 해시하므로 모델을 불러오는 노드에서만 사용합니다.
+        """
+        profile = self.get_profile(model_name, input_size)
+
+        return profile is None or profile.get("weights_hash") != self._get_weights_hash(model_name)
+
+    def get_transfer(self, model_name: str, input_size: Tuple[int, ...], transfer_dtype: str = "float32") -> Optional[float]:
+        """
+        출력 중 실수 텐서를 transfer_dtype으로 바꾸어 전송할 때의 전송량을 반환합니다. (KB)
+        output_dtypes가 없는 예전 프로파일은 모든 출력을 float32로 간주합니다.
+
+        Returns:
+            Optional[float]: 전송량 (KB). 프로파일이 없다면 None.
+        """
+        profile = self.get_profile(model_name, input_size)
+
+        if profile is None:
+            return None
+
+        output_dtypes = profile.get("output_dtypes", ["float32"] * len(profile["output_shapes"]))
+        transfer = 0
+
+        for output_shape, output_dtype in zip(profile["output_shapes"], output_dtypes):
+            numel = 1
+            for size in output_shape:
+                numel *= size
+
+            dtype = transfer_dtype if output_dtype in FLOATING_DTYPES else output_dtype
+            transfer += numel * DTYPE_BYTES[dtype]
+
+        return transfer / KB_PER_BYTE
+
+    def set_profile(self, model_name: str, input_size: Tuple[int, ...], computing: float, transfer: float, output_shapes: List[List[int]], output_dtypes: Optional[List[str]] = None) -> None:
+        """
+        프로파일을 캐시에 추가하고 파일에 저장합니다.
+
+        Args:
+            model_name (str): 모델 이름.
+            input_size (Tuple[int, ...]): 모델의 입력 크기.
+            computing (float): 계산량 (GFLOPs).
+            transfer (float): 전송량 (KB).
+            output_shapes (List[List[int]]): 모델 출력 텐서들의 크기.
+            output_dtypes (Optional[List[str]]): 모델 출력 텐서들의 자료형. (예: float32)
+        """
+        profile = {
+            "model_name": model_name,
+            "input_size": list(input_size),
+            "weights_hash": self._get_weights_hash(model_name),
+            "computing": computing,
+            "transfer": transfer,
+            "output_shapes": output_shapes,
+        }
+
+        if output_dtypes is not None:
+            profile["output_dtypes"] = output_dtypes
+
+        with self._mutex:
+            self._profiles[self._get_key(model_name, input_size)] = profile
+            self.save()
+
+    def _get_key(self, model_name: str, input_size: Tuple[int, ...]) -> str:
+        input_size_str = "x".join(str(size) for size in input_size)
+        return "_".join([model_name, input_size_str])
+
+    def _get_weights_hash(self, model_name: str) -> str:
+        if model_name in self._weights_hashes:
+            return self._weights_hashes[model_name]
+
+        # 서브모듈 구간의 프로파일(예: yolov5[0:12])은 원래 모델의 가중치를 사용합니다.
+        weights = MODEL_WEIGHTS.get(model_name.split("[")[0], model_name)
+        sha = hashlib.sha256()
+
+        if os.path.isdir(weights):
+            weights_paths = sorted(os.path.join(root, file_name) for root, _, file_names in os.walk(weights) for file_name in file_names
+                                   if file_name not in DERIVED_WEIGHTS_FILE_NAMES)
+        elif os.path.isfile(weights):
+            weights_paths = [weights]
+        else:
+            weights_paths = []
+            sha.update(weights.encode('utf8'))
+
+        for weights_path in weights_paths:
+            sha.update(os.path.relpath(weights_path, weights).encode('utf8'))
+            with open(weights_path, 'rb') as file:
+                for chunk in iter(lambda: file.read(1 << 20), b""):
+                    sha.update(chunk)
+
+        weights_hash = sha.hexdigest()[:16]
+        self._weights_hashes[model_name] = weights_hash
+
+        return weights_hash
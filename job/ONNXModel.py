@@ -0,0 +1,94 @@
+from typing import Callable, Dict, List, Optional, Union
+
+import torch
+
+try:
+    import onnxruntime
+except ImportError:
+    # onnx 백엔드를 사용하지 않는 노드는 onnxruntime이 없어도 됩니다.
+    onnxruntime = None
+
+DEFAULT_PROVIDERS = ["CPUExecutionProvider"]
+
+class ONNXModel:
+    """
+    ONNX로 내보낸 파티션들을 onnxruntime으로 실행하는 클래스입니다.
+    torch.nn.Module처럼 호출할 수 있으므로 DNNSubtask에서 그대로 사용할 수 있습니다.
+
+    파티션 사이의 텐서는 ONNX 입출력 이름으로 연결됩니다.
+    예를 들어 yolov5의 P1이 출력한 x5, x7, x9, x12는 P2의 같은 이름의 입력으로 전달됩니다.
+    반환값은 마지막 파티션의 ONNX 출력입니다.
+    파티션 없이 후처리만 있다면 입력을 그대로 후처리합니다. (예: yolov5의 NMS stage)
+
+    Attributes:
+        _sessions (List[onnxruntime.InferenceSession]): 파티션 순서대로의 세션.
+        _postprocess (Optional[Callable]): 마지막 파티션 이후에 실행할 후처리. (예: yolov5의 NMS)
+        _input_names (List[str]): 입력 텐서 이름.
+        _output_names (List[str]): 반환할 텐서 이름.
+    """
+    def __init__(self, onnx_paths: List[str], postprocess: Optional[Callable] = None, providers: Optional[List[str]] = None, input_names: Optional[List[str]] = None, output_names: Optional[List[str]] = None):
+        """
+        Args:
+            onnx_paths (List[str]): 파티션 순서대로의 ONNX 파일 경로.
+            postprocess (Optional[Callable]): 마지막 파티션 이후에 실행할 후처리.
+            providers (Optional[List[str]]): onnxruntime 실행 provider. None이라면 CPUExecutionProvider입니다.
+            input_names (Optional[List[str]]): 입력 텐서 이름. None이라면 첫 번째 파티션의 ONNX 입력 이름입니다.
+            output_names (Optional[List[str]]): 반환할 텐서 이름. None이라면 마지막 파티션의 ONNX 출력 이름입니다.
+                입력을 그대로 넘겨주는 텐서(예: 서브모듈 구간을 건너뛰는 skip 텐서)도 반환하려면 이름을 지정해야 합니다.
+        """
+        self._check_validate(onnx_paths, postprocess)
+
+        if providers is None:
+            providers = list(DEFAULT_PROVIDERS)
+
+        self._sessions = [onnxruntime.InferenceSession(onnx_path, providers=providers) for onnx_path in onnx_paths]
+        self._postprocess = postprocess
+        self._input_names = input_names
+        self._output_names = output_names
+
+        if self._input_names is None:
+            self._input_names = [node.name for node in self._sessions[0].get_inputs()] if self._sessions else ["x"]
+
+        if self._output_names is None:
+            self._output_names = [node.name for node in self._sessions[-1].get_outputs()] if self._sessions else self._input_names
+
+    def _check_validate(self, onnx_paths: List[str], postprocess: Optional[Callable]):
+        """
+        onnxruntime이 설치되어 있고, 실행할 파티션이나 후처리가 있는지 검증합니다.
+
+        Raises:
+            ValueError: onnxruntime이 없거나 파티션과 후처리가 모두 없을 때 발생합니다.
+        """
+        if onnxruntime is None:
+            raise ValueError("onnx 백엔드를 사용하려면 onnxruntime이 필요합니다.")
+
+        if len(onnx_paths) == 0 and postprocess is None:
+            raise ValueError("ONNX 파일 경로는 빈 리스트가 될 수 없습니다.")
+
+    def __call__(self, data: Union[torch.Tensor, List[torch.Tensor]]) -> Union[torch.Tensor, List[torch.Tensor]]:
+        """
+        Args:
+            data (Union[torch.Tensor, List[torch.Tensor]]): 첫 번째 파티션의 입력. 리스트라면 입력 이름 순서를 따릅니다.
+
+        Returns:
+            Union[torch.Tensor, List[torch.Tensor]]: 마지막 파티션의 출력. 출력이 하나라면 텐서를 반환합니다.
+        """
+        data = data if isinstance(data, list) else [data]
+
+        tensors: Dict[str, torch.Tensor] = dict(zip(self._input_names, data))
+
+        for session in self._sessions:
+            feed = {node.name: tensors[node.name].detach().cpu().numpy() for node in session.get_inputs()}
+            output_names = [node.name for node in session.get_outputs()]
+            outputs = session.run(output_names, feed)
+
+            # 이전 파티션의 텐서도 다음 파티션이 이름으로 읽을 수 있도록 유지합니다. (예: P4가 읽는 P2의 x24)
+            tensors.update({name: torch.from_numpy(output) for name, output in zip(output_names, outputs)})
+
+        output = [tensors[name] for name in self._output_names]
+        output = output[0] if len(output) == 1 else output
+
+        if self._postprocess is not None:
+            output = self._postprocess(output)
+
+        return output
@@ -0,0 +1,139 @@
+from collections import deque
+from typing import Deque, Optional
+
+import threading
+import time
+
+MS_PER_SECOND = 1_000
+
+MIN_FPS = 0.5
+INITIAL_FPS = 2.0 # 예전의 고정 전송 간격(0.5 sec)과 같습니다.
+
+# AIMD 계수입니다.
+INCREASE_RATE = 0.5 # 지연 시간에 여유가 있을 때 1초마다 늘리는 fps
+DECREASE_FACTOR = 0.7 # SLO를 넘었을 때 곱하는 비율
+LATENCY_HEADROOM = 0.9 # 지연 시간이 SLO의 이 비율 이하일 때만 fps를 늘립니다.
+
+BACKLOG_EWMA_ALPHA = 0.2 # backlog 지수 이동 평균에서 새 값의 가중치
+BACKLOG_GROWTH_TOLERANCE = 0.05 # 평균 backlog가 이 비율 이상 늘어나면 큐가 쌓이는 중으로 봅니다.
+
+ACHIEVED_FPS_WINDOW = 5.0 # sec
+
+class SendRateController:
+    """
+    sender의 전송 간격을 AIMD로 조절하는 클래스입니다.
+    Controller가 보내는 최근 종단 간 지연 시간이 SLO보다 충분히 작고 경로의 backlog가 늘어나지 않는 동안 fps를 조금씩 늘리고,
+    SLO를 넘으면 fps를 곱셈으로 줄입니다. 줄인 효과는 지연 시간 한 번만큼 지나야 나타나므로 그동안(최대 SLO만큼)은 다시 줄이지 않습니다.
+    가중치가 더 큰 작업이 SLO를 넘기고 있다는 혼잡 신호를 받으면, 자신의 지연 시간과 관계없이 fps를 줄여 자원을 양보합니다.
+
+    Attributes:
+        _latency_slo (float): 목표 종단 간 지연 시간. (ms)
+        _min_fps (float): 최소 전송 fps.
+        _max_fps (float): 최대 전송 fps. (예: 카메라의 fps)
+        _fps (float): 현재 목표 전송 fps.
+        _latency (Optional[float]): 마지막으로 받은 종단 간 지연 시간. (ms)
+        _backlog (Optional[float]): 경로 backlog의 지수 이동 평균.
+        _last_update_time (float): 마지막으로 피드백을 반영한 시간. (sec)
+        _last_decrease_time (float): 마지막으로 fps를 줄인 시간. (sec)
+        _send_times (Deque[float]): 최근 ACHIEVED_FPS_WINDOW 동안 프레임을 보낸 시간들. (sec)
+        _mutex (threading.Lock): 피드백 스레드와 전송 스레드 사이의 lock.
+    """
+    def __init__(self, latency_slo: float, max_fps: float, min_fps: float = MIN_FPS, initial_fps: float = INITIAL_FPS):
+        """
+        Args:
+            latency_slo (float): 목표 종단 간 지연 시간. (ms)
+            max_fps (float): 최대 전송 fps.
+            min_fps (float): 최소 전송 fps.
+            initial_fps (float): 처음 전송 fps.
+        """
+        self._check_validate(latency_slo, max_fps, min_fps)
+
+        self._latency_slo: float = latency_slo
+        self._min_fps: float = min_fps
+        self._max_fps: float = max_fps
+        self._fps: float = min(max(initial_fps, min_fps), max_fps)
+
+        self._latency: Optional[float] = None
+        self._backlog: Optional[float] = None
+
+        self._last_update_time: float = time.time()
+        self._last_decrease_time: float = 0
+        self._send_times: Deque[float] = deque()
+        self._mutex = threading.Lock()
+
+    def _check_validate(self, latency_slo: float, max_fps: float, min_fps: float):
+        """
+        목표 지연 시간과 fps 범위가 올바른지 검증합니다.
+        """
+        if latency_slo <= 0:
+            raise ValueError(f"latency_slo must be positive, but got {latency_slo}")
+
+        if not 0 < min_fps <= max_fps:
+            raise ValueError(f"fps range must satisfy 0 < min_fps <= max_fps, but got [{min_fps}, {max_fps}]")
+
+    def update(self, backlog: float, latency: Optional[float], congested: bool = False) -> None:
+        """
+        Controller의 피드백을 반영하여 목표 fps를 조절합니다.
+
+        Args:
+            backlog (float): 마지막으로 스케줄링한 경로의 backlog를 처리하는 데 걸리는 예상 시간. (sec)
+            latency (Optional[float]): 최근 종단 간 지연 시간. (ms) 끝난 작업이 없다면 None.
+            congested (bool): 가중치가 더 큰 작업이 SLO를 넘기고 있는지 여부.
+        """
+        with self._mutex:
+            now = time.time()
+            elapsed_time = now - self._last_update_time # sec
+            self._last_update_time = now
+
+            previous_backlog = self._backlog
+            self._backlog = backlog if previous_backlog is None else (1 - BACKLOG_EWMA_ALPHA) * previous_backlog + BACKLOG_EWMA_ALPHA * backlog
+            backlog_growing = previous_backlog is not None and self._backlog > previous_backlog * (1 + BACKLOG_GROWTH_TOLERANCE)
+
+            self._latency = latency
+
+            if latency is None and not congested:
+                return
+
+            if congested or latency > self._latency_slo:
+                wait_time = self._latency_slo if latency is None else min(latency, self._latency_slo) # ms
+                if now - self._last_decrease_time >= wait_time / MS_PER_SECOND:
+                    self._fps = max(self._fps * DECREASE_FACTOR, self._min_fps)
+                    self._last_decrease_time = now
+
+            elif latency <= self._latency_slo * LATENCY_HEADROOM and not backlog_growing:
+                self._fps = min(self._fps + INCREASE_RATE * elapsed_time, self._max_fps)
+
+    def get_sleep_time(self) -> float:
+        """
+        다음 프레임을 보낼 때까지의 간격을 반환합니다. (sec)
+        """
+        with self._mutex:
+            return 1 / self._fps
+
+    def record_send(self) -> None:
+        """
+        프레임을 보냈음을 기록합니다. 실제로 달성한 fps를 계산할 때 사용합니다.
+        """
+        with self._mutex:
+            now = time.time()
+            self._send_times.append(now)
+
+            while self._send_times and now - self._send_times[0] > ACHIEVED_FPS_WINDOW:
+                self._send_times.popleft()
+
+    def get_target_fps(self) -> float:
+        return self._fps
+
+    def get_achieved_fps(self) -> float:
+        """
+        최근 ACHIEVED_FPS_WINDOW 동안 실제로 보낸 fps를 반환합니다.
+        """
+        with self._mutex:
+            now = time.time()
+            return sum(1 for send_time in self._send_times if now - send_time <= ACHIEVED_FPS_WINDOW) / ACHIEVED_FPS_WINDOW
+
+    def get_latency(self) -> Optional[float]:
+        """
+        마지막으로 받은 종단 간 지연 시간을 반환합니다. (ms)
+        """
+        return self._latency
@@ -31,6 +31,10 @@ class SubtaskInfo(JobInfo):
     @property
     def model_name(self) -> str:
         return self._model_name
+
+    @property
+    def primary_path_index(self) -> int:
+        return self._primary_path_index
         
     def get_subtask_id(self) -> str:
         return self._delimeter.join([self.job_id, self._source_layer_node.to_string(), str(self._primary_path_index)])
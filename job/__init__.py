@@ -1,11 +1,29 @@
+import importlib
+
 from job.JobInfo import JobInfo
+from job.SubtaskInfo import SubtaskInfo
+from job.CapacityManager import CapacityManager
+from job.ModelProfileCache import ModelProfileCache
+from job.SendRateController import SendRateController
+from job.FrameStore import FrameStore
 
-from job.DNNOutput import DNNOutput
-from job.DNNSubtask import DNNSubtask
-from job.DNNModels import DNNModels
+# torch가 필요한 클래스는 처음 사용할 때 import합니다.
+# 따라서 Controller처럼 JobInfo, SubtaskInfo만 사용하는 곳은 torch를 불러오지 않습니다.
+_lazy_classes = {
+    "DNNOutput": "job.DNNOutput",
+    "ONNXModel": "job.ONNXModel",
+    "DNNSubtask": "job.DNNSubtask",
+    "DNNModels": "job.DNNModels",
+    "JobManager": "job.JobManager",
+}
 
-from job.JobManager import JobManager
+__all__ = ["JobInfo", "SubtaskInfo", "CapacityManager", "ModelProfileCache", "SendRateController", "FrameStore"] + list(_lazy_classes.keys())
 
-from job.SubtaskInfo import SubtaskInfo
+def __getattr__(name):
+    if name in _lazy_classes:
+        # 서브모듈을 import하면 패키지 속성이 서브모듈로 바뀌므로 클래스로 다시 지정합니다.
+        # 따라서 위 클래스들은 "from job.X import X"가 아닌 "from job import X"로 import해야 합니다.
+        globals()[name] = getattr(importlib.import_module(_lazy_classes[name]), name)
+        return globals()[name]
 
-from job.CapacityManager import CapacityManager
+    raise AttributeError(f"module 'job' has no attribute '{name}'")
@@ -1,3 +1,5 @@
+import numpy as np
+
 #TODO: 단위 맞추기
 
 def cal_total_latency(arrival_rate, task_requirements, network_info):
@@ -50,3 +52,53 @@ def _cal_queueing_latency(arrival_rate, edge_computing, cloud_computing, edge_so
     latency = edge_latency + cloud_latency
     
     return latency, stability_info
+
+
+def cal_total_latencies(arrival_rates, computing_ratios, transfer_ratios, input_size, network_info):
+    """
+    모든 분할 지점과 여러 arrival rate의 total latency와 안정성을 한 번에 계산합니다.
+    분할 지점 s에서 edge는 앞의 s개 레이어를, cloud는 나머지를 실행하며, 각 계산량은 computing_ratios의 누적합(prefix sum)으로 구합니다.
+    cal_total_latency(arrival_rate, _make_requirement(..., s, ...), network_info)와 같은 값을 반환합니다.
+
+    Args:
+        arrival_rates: arrival rate들. 크기 R.
+        computing_ratios: 레이어마다의 계산량 비율. 크기 S이며, 분할 지점은 0부터 S-1까지입니다.
+        transfer_ratios: 분할 지점마다 edge가 cloud로 보내는 데이터의 입력 대비 비율. 크기 S 이상.
+        input_size: 입력 크기.
+        network_info: (computing_capacities, transmission_rates).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (R, S) 크기의 total latency와, edge와 cloud의 stability가 모두 1 이하인지 나타내는 mask.
+    """
+    computing_capacities, transmission_rates = network_info
+
+    arrival_rates = np.asarray(arrival_rates, dtype=float).reshape(-1, 1)                # (R, 1)
+    computing_ratios = np.asarray(computing_ratios, dtype=float)
+    partition_count = len(computing_ratios)
+    prefix_ratios = np.concatenate(([0.0], np.cumsum(computing_ratios)))[:partition_count] # (S,)
+    transfer_ratios = np.asarray(transfer_ratios, dtype=float)[:partition_count]         # (S,)
+
+    edge_computing = arrival_rates * prefix_ratios                                        # (R, S)
+    cloud_computing = arrival_rates * (np.sum(computing_ratios) - prefix_ratios)          # (R, S)
+
+    computing_latency = edge_computing / computing_capacities['edge'] + cloud_computing / computing_capacities['cloud']
+    transmission_latency = input_size * arrival_rates / transmission_rates['end'] + input_size * arrival_rates * transfer_ratios / transmission_rates['edge']
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 계산량이 없는 큐는 _cal_queueing_latency처럼 stability를 inf, 대기 시간을 0으로 둡니다.
+        has_edge = edge_computing != 0
+        has_cloud = cloud_computing != 0
+        edge_service_rate = np.where(has_edge, computing_capacities['edge'] / edge_computing, 0)
+        cloud_service_rate = np.where(has_cloud, computing_capacities['cloud'] / cloud_computing, 0)
+        edge_stability = np.where(has_edge, arrival_rates / edge_service_rate, np.inf)
+        cloud_stability = np.where(has_cloud, arrival_rates / cloud_service_rate, np.inf)
+
+        edge_latency = np.where(has_edge, arrival_rates / (2 * edge_service_rate ** 2 * (1 - edge_stability)), 0)
+        # edge가 cloud보다 느리다면 cloud에는 큐가 쌓이지 않습니다.
+        has_cloud_queue = has_cloud & (~has_edge | (edge_service_rate > cloud_service_rate))
+        cloud_latency = np.where(has_cloud_queue, arrival_rates / (2 * cloud_service_rate ** 2 * (1 - cloud_stability)), 0)
+
+    total_latencies = arrival_rates * (computing_latency + transmission_latency + edge_latency + cloud_latency)
+    stability_mask = (edge_stability <= 1) & (cloud_stability <= 1)
+
+    return total_latencies, stability_mask
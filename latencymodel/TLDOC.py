@@ -1,3 +1,5 @@
+import numpy as np
+
 def cal_total_latency(off_tensor, time_config, network_info, data_size_list, t_wait):
     t_cal = sum(time_config['end'][:off_tensor[0]]) + sum(time_config['edge'][off_tensor[0]:off_tensor[0]+off_tensor[1]]) + sum(time_config['cloud'][off_tensor[0]+off_tensor[1]:])
     end_latency = data_size_list[off_tensor[0]] / network_info[1]['end']                        # end -> edge 
@@ -18,3 +20,40 @@ def cal_total_latency_except_end(off_tensor, time_config, network_info, data_siz
     
     total_latency = t_cal + t_comm + t_wait
     return total_latency
+
+
+def cal_total_latencies(partition_points_1, partition_points_2, time_prefix, network_info, data_size_list, t_wait):
+    """
+    여러 분할 (end가 앞의 partition_point_1개, edge가 partition_point_2까지, cloud가 나머지 레이어를 실행)의 total latency를 한 번에 계산합니다.
+    time_prefix는 tier마다 레이어 실행 시간의 누적합(앞에 0을 붙인 것)이며, cal_total_latency(off_tensor, ...)와 같은 값을 반환합니다.
+    """
+    t_cal = (_prefix_sum(time_prefix['end'], 0, partition_points_1)
+             + _prefix_sum(time_prefix['edge'], partition_points_1, partition_points_2)
+             + _prefix_sum(time_prefix['cloud'], partition_points_2, None))
+    return t_cal + _cal_transfer_latencies(partition_points_1, partition_points_2, network_info, data_size_list, True) + t_wait
+
+
+def cal_total_latencies_except_end(partition_points_1, partition_points_2, time_prefix, network_info, data_size_list, t_wait):
+    """
+    cal_total_latency_except_end의 벡터 버전입니다.
+    """
+    t_cal = (_prefix_sum(time_prefix['edge'], partition_points_1, partition_points_2)
+             + _prefix_sum(time_prefix['cloud'], partition_points_2, None))
+    return t_cal + _cal_transfer_latencies(partition_points_1, partition_points_2, network_info, data_size_list, False) + t_wait
+
+
+def _prefix_sum(prefix, start, end):
+    # list[start:end]의 합입니다. 리스트 길이를 넘는 인덱스는 슬라이싱처럼 끝으로 자릅니다.
+    length = len(prefix) - 1
+    end = length if end is None else np.minimum(end, length)
+    return prefix[end] - prefix[np.minimum(start, length)]
+
+
+def _cal_transfer_latencies(partition_points_1, partition_points_2, network_info, data_size_list, include_end):
+    data_size_list = np.asarray(data_size_list, dtype=float)
+    edge_latency = data_size_list[partition_points_2] / network_info[1]['edge']        # edge -> cloud
+    if not include_end:
+        return edge_latency
+
+    end_latency = data_size_list[partition_points_1] / network_info[1]['end']          # end -> edge
+    return end_latency + edge_latency
@@ -4,9 +4,12 @@ class LayerNodePair:
     def __init__(self, source: LayerNode, destination: LayerNode):
         self._source = source
         self._destination = destination
+        # 노드의 IP는 바뀌지 않으므로, 해시와 비교에 쓰는 문자열을 한 번만 만듭니다.
+        self._string = f"{source.to_string()}->{destination.to_string()}"
+        self._is_same_node = source.is_same_node(destination)
 
     def to_string(self) -> str:
-        return f"{self._source.to_string()}->{self._destination.to_string()}"
+        return self._string
     
     @property
     def source(self) -> LayerNode:
@@ -17,10 +20,10 @@ class LayerNodePair:
         return self._destination
     
     def is_same_node(self) -> bool:
-        return self._source.is_same_node(self._destination)
+        return self._is_same_node
     
     def __hash__(self):
-        return hash(self.to_string())
+        return hash(self._string)
     
     def __str__(self):
         return self.to_string()
@@ -29,7 +32,7 @@ class LayerNodePair:
         return self.to_string()
 
     def __eq__(self, other):
-        return self.to_string() == other.to_string()
+        return self._string == other.to_string()
 
     def __ne__(self, other):
         return not(self == other)
@@ -1,32 +1,57 @@
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
 
-from layeredgraph import LayerNode, LayerNodePair
+from layeredgraph import LayerNode, LayerNodePair, ScheduleCache
 from config import NetworkConfig, ModelConfig
+from config.NetworkConfig import DEFAULT_JOB_WEIGHT
 from job import JobInfo
-from job.DNNModels import DNNModels
+from job.ModelProfileCache import ModelProfileCache
 from scheduling import *
 
 import importlib
+import threading
 import time
 import numpy as np
 import copy
 import pandas as pd
 import glob
-import torch
+
+MS_PER_SECOND = 1_000
+KB_PER_BYTE = 1024
+
+# 노드가 아직 capacity를 보고하지 않았고, 같은 종류의 링크 중 보고한 링크도 없을 때 사용하는 capacity입니다.
+DEFAULT_COMPUTING_CAPACITY = 0.1 # GFLOPs/ms
+DEFAULT_TRANSFER_CAPACITY = 10.0 # KB/ms
+
+IDLE_POWER = 1.7 # W, 측정 결과 초당 1.7w를 소모함
 
 class LayeredGraph:
-    def __init__(self, network_config: NetworkConfig, model_config: ModelConfig):
-        self._device = "cuda" if torch.cuda.is_available() else "cpu"
-        
+    def __init__(self, network_config: NetworkConfig, model_config: ModelConfig, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            clock (Callable[[], float]): 현재 시간(sec)을 반환하는 함수. 시뮬레이션에서는 시뮬레이션 시간을 사용합니다.
+        """
         self._network_config = network_config
-        self._dnn_models = DNNModels(model_config, self._device)
+        self._clock = clock
+        self._computing: Dict[str, float] = dict() # GFLOPs
+        self._transfer: Dict[str, float] = dict() # KB
+        self._input_bytes: float = 0 # KB, 프레임을 uint8로 보낼 때의 입력 크기
+        self._model_names: List[str] = model_config.get_model_names() # 실행 순서대로의 stage
         self._layered_graph = dict()
         self._layered_graph_backlog: Dict[LayerNodePair, float] = dict()
+        # 링크마다 작업 이름별 backlog입니다. 노드가 보고했지만 어느 작업의 것인지 모르는 backlog는 None에 더합니다.
+        self._job_backlogs: Dict[LayerNodePair, Dict[Optional[str], float]] = dict()
+        self._changed_links: Set[LayerNodePair] = set() # 마지막 스케줄링 뒤 backlog나 capacity가 바뀐 링크들
         self._layer_nodes = []
         self._layer_node_pairs: List[LayerNodePair] = []
         self._scheduling_algorithm = None
-        self._previous_update_time = time.time()
+        self._previous_update_time = clock()
         self._capacity = dict()
+        # 계산 링크(True)와 전송 링크(False)마다 보고된 capacity의 평균입니다. 보고하지 않은 링크가 사용합니다.
+        self._reported_capacities: Dict[bool, float] = dict()
+        self._schedule_cache = ScheduleCache(network_config.schedule_cache_step, network_config.schedule_cache_ttl, clock)
+        # 스케줄링 스레드(schedule_slot)와 노드 정보(set_graph), 가상 backlog 갱신(update_graph) 스레드가 그래프를 함께 바꾸므로 그래프 전체에 거는 lock입니다.
+        # schedule_batch가 schedule과 update_path_backlog를 다시 부르므로 재진입할 수 있어야 합니다.
+        self._mutex = threading.RLock()
 
         self._max_layer_depth = 0
         
@@ -37,42 +62,149 @@ class LayeredGraph:
         self._idle_network_performance_info = None
 
         self._configs = None
+        self.init_model_profiles(model_config)
         self.init_graph()
         self.init_algorithm()
         self.init_network_performance_info()
         
 
     def set_graph(self, links: Dict[LayerNodePair, float]) -> None:
-        self._previous_update_time = time.time()
-        for link, backlog in links.items():
-            self.set_link(link, backlog)
+        with self._mutex:
+            self._previous_update_time = self._clock()
+            for link, backlog in links.items():
+                self.set_link(link, backlog)
 
     def set_capacity(self, source_ip: str, computing_capacity: float, transfer_capacity: float) -> None:
-        for destination_ip in self._capacity[source_ip]:
-            capacity = computing_capacity if source_ip == destination_ip else transfer_capacity
-            self._capacity[source_ip][destination_ip] = capacity
+        with self._mutex:
+            previous_reported_capacities = dict(self._reported_capacities)
+
+            for destination_ip in self._capacity[source_ip]:
+                capacity = computing_capacity if source_ip == destination_ip else transfer_capacity
+                self._capacity[source_ip][destination_ip] = capacity
+
+            for is_computing in [True, False]:
+                reported_capacities = [capacity
+                                       for source_ip, capacities in self._capacity.items()
+                                       for destination_ip, capacity in capacities.items()
+                                       if (source_ip == destination_ip) == is_computing and capacity > 0]
+
+                if reported_capacities:
+                    self._reported_capacities[is_computing] = sum(reported_capacities) / len(reported_capacities)
+
+            # 보고하지 않은 링크는 보고된 capacity의 평균을 사용하므로, 평균이 바뀌면 함께 바뀝니다.
+            for link in self._layer_node_pairs:
+                if link.source.get_ip() == source_ip or \
+                   self._reported_capacities.get(link.is_same_node()) != previous_reported_capacities.get(link.is_same_node()):
+                    self._changed_links.add(link)
     
     def update_path_backlog(self, job_info: JobInfo, path: List[Tuple[LayerNode, LayerNode, str]]) -> None:
-        for source_node, destination_node, model_name in path:
-            link = LayerNodePair(source_node, destination_node)
-            if source_node.is_same_node(destination_node):
-                capacity = self._dnn_models.get_computing(model_name)
-            else:
-                if model_name == "":
-                    capacity = job_info.input_bytes
-                else:
-                    capacity = self._dnn_models.get_transfer(model_name)
-            
-            # GFLOPs or KB
-            self._layered_graph_backlog[link] += capacity
+        with self._mutex:
+            for source_node, destination_node, model_name in path:
+                link = LayerNodePair(source_node, destination_node)
+
+                # GFLOPs or KB
+                work = self.get_work(link, model_name, job_info.input_bytes)
+                job_backlogs = self._job_backlogs.setdefault(link, {})
+                job_backlogs[job_info.job_name] = job_backlogs.get(job_info.job_name, 0) + work
+                self._layered_graph_backlog[link] += work
+                self._changed_links.add(link)
+
+    def get_work(self, link: LayerNodePair, model_name: str, input_bytes: float) -> float:
+        """
+        링크에서 서브태스크가 처리해야 하는 양을 반환합니다.
+        계산 링크는 모델의 계산량(GFLOPs), 전송 링크는 모델 출력의 전송량(KB)이며, 모델을 실행하기 전(model_name이 "")이라면 입력 크기(KB)입니다.
+        """
+        if link.is_same_node():
+            return self._computing[model_name]
+
+        return input_bytes if model_name == "" else self._transfer[model_name]
+
+    def get_link_capacity(self, link: LayerNodePair) -> float:
+        """
+        링크의 capacity를 반환합니다. 계산 링크는 GFLOPs/ms, 전송 링크는 KB/ms입니다.
+        노드가 아직 보고하지 않은 링크는 같은 종류의 링크들이 보고한 capacity의 평균을, 그것도 없다면 기본값을 사용합니다.
+        """
+        capacity = self._capacity[link.source.get_ip()].get(link.destination.get_ip(), 0)
+
+        if capacity > 0:
+            return capacity
+
+        is_computing = link.is_same_node()
+
+        if is_computing in self._reported_capacities:
+            return self._reported_capacities[is_computing]
+
+        return DEFAULT_COMPUTING_CAPACITY if is_computing else DEFAULT_TRANSFER_CAPACITY
+
+    def get_link_cost(self, link: LayerNodePair, work: float = 0, job_name: Optional[str] = None) -> float:
+        """
+        링크에 쌓인 backlog와 이번 서브태스크의 work(GFLOPs 또는 KB)를 모두 처리하는 데 걸리는 예상 시간을 반환합니다. (sec)
+        계산량과 전송량을 링크의 capacity로 나누어 같은 단위(시간)로 비교할 수 있게 합니다.
+
+        job_name이 주어지면 링크의 capacity를 backlog가 있는 작업들이 weight 비율로 나누어 쓴다고(GPS) 보고, 그 작업의 work가 끝날 때까지의 시간을 반환합니다.
+        그동안 다른 작업 k는 자신의 backlog와 (작업의 backlog + work) * w_k / w_job 중 작은 만큼 처리되므로, weight가 큰 작업일수록 다른 작업의 backlog를 덜 기다립니다.
+        """
+        if job_name is None:
+            served = self._layered_graph_backlog[link] + work
+        else:
+            job_backlogs = self._job_backlogs.get(link, {})
+            weight = self._get_job_weight(job_name)
+            own = job_backlogs.get(job_name, 0) + work
+
+            served = own + sum(min(backlog, own * self._get_job_weight(other_job_name) / weight)
+                               for other_job_name, backlog in job_backlogs.items() if other_job_name != job_name)
+
+        return served / self.get_link_capacity(link) / MS_PER_SECOND
+
+    def _get_job_link_cost(self, job_name: str) -> Callable[[LayerNodePair, float], float]:
+        """
+        스케줄링 알고리즘에 넘기는, 작업의 weight를 반영한 링크 비용 함수를 반환합니다.
+        """
+        return lambda link, work: self.get_link_cost(link, work, job_name)
+
+    def _get_job_weight(self, job_name: Optional[str]) -> float:
+        if job_name is None or job_name not in self._network_config.get_job_names():
+            return DEFAULT_JOB_WEIGHT
+
+        return self._network_config.get_job_weight(job_name)
+
+    def _drain_job_backlogs(self, link: LayerNodePair, amount: float):
+        """
+        링크가 처리한 양(amount)을 backlog가 있는 작업들에게 weight 비율로 나누어 작업별 backlog를 줄입니다.
+        먼저 끝나는 작업의 몫은 남은 작업들이 다시 나누어 씁니다. (water-filling)
+        """
+        job_backlogs = self._job_backlogs.get(link)
+
+        while amount > 0 and job_backlogs:
+            weights = {job_name: self._get_job_weight(job_name) for job_name in job_backlogs}
+            total_weight = sum(weights.values())
+
+            # weight 대비 backlog가 가장 작은 작업이 가장 먼저 끝납니다.
+            first_job_name = min(job_backlogs, key=lambda job_name: job_backlogs[job_name] / weights[job_name])
+            round_amount = min(amount, job_backlogs[first_job_name] / weights[first_job_name] * total_weight)
+
+            for job_name in list(job_backlogs.keys()):
+                job_backlogs[job_name] -= round_amount * weights[job_name] / total_weight
+
+                if job_backlogs[job_name] <= 0 or (job_name == first_job_name and round_amount < amount):
+                    del job_backlogs[job_name]
+
+            amount -= round_amount
         
-    def update_graph(self):
-        current_time = time.time()
-        elapsed_time = current_time - self._previous_update_time
+    def update_graph(self, elapsed_time: Optional[float] = None):
+        """
+        지난 호출 뒤 링크들이 처리한 만큼 backlog를 줄입니다.
+        elapsed_time(sec)이 주어지면 실제로 지난 시간 대신 사용합니다. (예: 시뮬레이션)
+        """
+        with self._mutex:
+            current_time = self._clock()
+
+            if elapsed_time is None:
+                elapsed_time = current_time - self._previous_update_time
         
-        links_job_num = self._count_active_jobs()
-        self._update_backlog(elapsed_time, links_job_num)
-        self._previous_update_time = time.time()
+            links_job_num = self._count_active_jobs()
+            self._update_backlog(elapsed_time, links_job_num)
+            self._previous_update_time = current_time
 
     def _count_active_jobs(self) -> Dict[str, Dict[str, int]]:
         links_job_num = {}
@@ -97,15 +229,58 @@ class LayeredGraph:
             dest_ip = link.destination.get_ip()
             
             job_count = links_job_num[source_ip][dest_ip]
-            capacity = self._capacity[source_ip][dest_ip]
+            capacity = self.get_link_capacity(link) # GFLOPs/ms or KB/ms
 
             if job_count > 0:
-                computing_delta = elapsed_time * capacity / job_count
+                computing_delta = elapsed_time * MS_PER_SECOND * capacity / job_count
                 self._layered_graph_backlog[link] = max(0, self._layered_graph_backlog[link] - computing_delta)
+                self._drain_job_backlogs(link, computing_delta)
+                self._changed_links.add(link)
 
     def set_link(self, link: LayerNodePair, backlog: float):
+        """
+        노드가 보고한 링크의 backlog를 반영합니다.
+        노드는 작업을 구분하지 않고 보고하므로, 작업별 backlog는 기존 비율을 유지한 채로 합이 보고한 backlog가 되도록 맞춥니다.
+        """
+        previous_backlog = self._layered_graph_backlog.get(link, 0)
+
+        if previous_backlog != backlog:
+            self._changed_links.add(link)
+
+        job_backlogs = self._job_backlogs.setdefault(link, {})
+
+        if previous_backlog > 0 and job_backlogs:
+            for job_name in job_backlogs:
+                job_backlogs[job_name] *= backlog / previous_backlog
+        else:
+            job_backlogs.clear()
+
+            if backlog > 0:
+                job_backlogs[None] = backlog
+
         self._layered_graph_backlog[link] = backlog
 
+    def init_model_profiles(self, model_config: ModelConfig):
+        """
+        프로파일 캐시에서 모델의 계산량(GFLOPs)과 전송량(KB)을 불러옵니다.
+        Controller는 모델을 불러오지 않으므로, 캐시가 없다면 torch가 설치된 곳에서 먼저 프로파일링해야 합니다.
+
+        Raises:
+            ValueError: 모델의 프로파일이 캐시에 없을 때 발생합니다.
+        """
+        profile_cache = ModelProfileCache()
+
+        for model_name in model_config.get_model_names():
+            profile = profile_cache.get_profile(model_config.get_profile_name(model_name), model_config.get_input_size(model_name))
+
+            if profile is None:
+                raise ValueError(f"Missing model profile: {model_name}. Run spec/Profile.py or start a node to create it.")
+
+            self._computing[model_name] = profile["computing"]
+            self._transfer[model_name] = profile_cache.get_transfer(model_config.get_profile_name(model_name), model_config.get_input_size(model_name), model_config.get_transfer_dtype(model_name))
+
+        self._input_bytes = float(np.prod(model_config.get_input_size(self._model_names[0]))) / KB_PER_BYTE
+
     def init_graph(self):
         for source_ip in self._network_config.get_network_list():
             source = LayerNode(source_ip, self._network_config.get_models(source_ip))
@@ -135,21 +310,174 @@ class LayeredGraph:
     def init_algorithm(self):
         module_path = self._network_config.scheduling_algorithm.replace(".py", "").replace("/", ".")
         self._algorithm_class = module_path.split(".")[-1]
-        self._scheduling_algorithm = getattr(importlib.import_module(module_path), self._algorithm_class)()
+        self._scheduling_algorithm = getattr(importlib.import_module(module_path), self._algorithm_class)(**self._network_config.scheduling_options)
+
+        if self._algorithm_class == 'TLDOC':
+            idle_power = self.load_config()
+            time_config, energy_config = self._configs
+            self._scheduling_algorithm.init_parameter(time_config, energy_config, idle_power, [1.0] + [0.0] * len(self._model_names))
         
     def schedule(self, job_info: JobInfo) -> List[Tuple[LayerNode, LayerNode, str]]:
-        source_node = LayerNode(job_info.source_ip, self._network_config.get_models(job_info.source_ip))
-        destination_node = LayerNode(job_info.terminal_ip, self._network_config.get_models(job_info.terminal_ip))
+        with self._mutex:
+            source_node = LayerNode(job_info.source_ip, self._network_config.get_models(job_info.source_ip))
+            destination_node = LayerNode(job_info.terminal_ip, self._network_config.get_models(job_info.terminal_ip))
         
-        if self._algorithm_class == 'RandomSelection':
-            self._scheduling_algorithm: RandomSelection
-            path = self._scheduling_algorithm.get_path(source_node, destination_node, self._layered_graph)
+            if self._algorithm_class == 'RandomSelection':
+                self._scheduling_algorithm: RandomSelection
+                path = self._scheduling_algorithm.get_path(source_node, destination_node, self._layered_graph, self._model_names)
+
+            elif self._algorithm_class in ['Dijkstra', 'DriftPlusPenalty']:
+                self._scheduling_algorithm: Union[Dijkstra, DriftPlusPenalty]
+                path = self._get_cached_path(job_info)
+
+                if path is None:
+                    # DriftPlusPenalty는 가상 큐 Q_l로 작업과 관계없는 링크의 전체 backlog를 사용합니다.
+                    queue_cost = (self.get_link_cost,) if self._algorithm_class == 'DriftPlusPenalty' else ()
+                    path = self._scheduling_algorithm.get_path(source_node,
+                                                               destination_node,
+                                                               self._layered_graph,
+                                                               self._model_names,
+                                                               self._get_job_link_cost(job_info.job_name),
+                                                               self._computing,
+                                                               self._transfer,
+                                                               job_info.input_bytes,
+                                                               *queue_cost)
+                    self._put_cached_path(job_info, path)
+
+            elif self._algorithm_class == 'DynamicDijkstra':
+                self._scheduling_algorithm: DynamicDijkstra
+                path = self._scheduling_algorithm.get_path(source_node,
+                                                           destination_node,
+                                                           self._layered_graph,
+                                                           self._model_names,
+                                                           self._get_job_link_cost(job_info.job_name),
+                                                           self._computing,
+                                                           self._transfer,
+                                                           job_info.input_bytes,
+                                                           self._pop_changed_links(),
+                                                           (source_node, job_info.job_name))
+
+            elif self._algorithm_class == 'JDPCRA':
+                self._scheduling_algorithm: JDPCRA
+                path = self._scheduling_algorithm.get_path(source_node,
+                                                           destination_node,
+                                                           self._layered_graph,
+                                                           self._model_names,
+                                                           *self._get_jdpcra_ratios(job_info.input_bytes),
+                                                           self._expected_arrival_rate,
+                                                           self._network_performance_info,
+                                                           job_info.input_bytes)
+
+            elif self._algorithm_class == 'TLDOC':
+                self._scheduling_algorithm: TLDOC
+                self._scheduling_algorithm.set_t_wait(self.get_t_wait())
+                self._scheduling_algorithm.set_transfer_ratios(self._get_transfer_ratios(job_info.input_bytes))
+                path = self._scheduling_algorithm.get_path(source_node,
+                                                           destination_node,
+                                                           self._layered_graph,
+                                                           self._model_names,
+                                                           self._expected_arrival_rate,
+                                                           self._network_performance_info,
+                                                           job_info.input_bytes)
         
-        else:
-            raise ValueError(f"Invalid scheduling algorithm: {self._algorithm_class}")
+            else:
+                raise ValueError(f"Invalid scheduling algorithm: {self._algorithm_class}")
         
-        return path
+            return path
     
+    def _get_jdpcra_ratios(self, input_bytes: float) -> Tuple[List[float], List[float]]:
+        """
+        JDPCRA의 stage마다의 계산량 비율과, 분할 지점마다 edge가 보내는 데이터의 입력 대비 비율을 반환합니다.
+        """
+        total_computing = sum(self._computing[model_name] for model_name in self._model_names) # GFLOPs
+        computing_ratios = [self._computing[model_name] / total_computing if total_computing > 0 else 0 for model_name in self._model_names]
+        transfer_ratios = self._get_transfer_ratios(input_bytes)[:-1]
+
+        return computing_ratios, transfer_ratios
+
+    def _get_transfer_ratios(self, input_bytes: float) -> List[float]:
+        """
+        분할 지점마다 보내는 데이터의 입력 대비 비율을 반환합니다. 0번은 입력 그대로이고, s번은 s번째 stage의 출력입니다.
+        """
+        return [1.0] + [self._transfer[model_name] / input_bytes if input_bytes > 0 else 0 for model_name in self._model_names]
+
+    def schedule_batch(self, job_infos: List[JobInfo]) -> List[List[Tuple[LayerNode, LayerNode, str]]]:
+        """
+        time slot 동안 모은 작업들을 함께 스케줄링하고, 경로의 backlog를 더합니다.
+        작업마다 현재 backlog에서의 최선의 경로를 구한 뒤, weight 대비 예상 시간이 가장 짧은 작업부터 하나씩 배치하고 backlog를 더합니다. (반복 최소 비용 배치)
+        따라서 같은 time slot의 작업들이 같은 backlog를 보고 한 경로에 몰리지 않습니다.
+        같은 작업(weight)이고 출발, 도착 노드와 입력 크기가 같은 작업들은 최선의 경로가 같으므로 한 번만 구합니다.
+
+        Args:
+            job_infos (List[JobInfo]): time slot 동안 모은 작업들.
+
+        Returns:
+            List[List[Tuple[LayerNode, LayerNode, str]]]: job_infos와 같은 순서의 경로들.
+        """
+        with self._mutex:
+            paths: List[Optional[List[Tuple[LayerNode, LayerNode, str]]]] = [None] * len(job_infos)
+            remaining_jobs: Dict[Tuple[str, str, str, float], List[int]] = {}
+
+            for index, job_info in enumerate(job_infos):
+                remaining_jobs.setdefault((job_info.job_name, job_info.source_ip, job_info.terminal_ip, job_info.input_bytes), []).append(index)
+
+            while remaining_jobs:
+                best = None
+
+                for key, indices in remaining_jobs.items():
+                    job_info = job_infos[indices[0]]
+                    path = self.schedule(job_info)
+                    expected_time = self.get_arrival_rate(path, job_info) / self._get_job_weight(job_info.job_name)
+
+                    if best is None or expected_time < best[0]:
+                        best = (expected_time, key, path)
+
+                _, key, path = best
+                index = remaining_jobs[key].pop(0)
+                if not remaining_jobs[key]:
+                    del remaining_jobs[key]
+
+                paths[index] = path
+                self.update_path_backlog(job_infos[index], path)
+
+            return paths
+
+    def _pop_changed_links(self) -> Set[LayerNodePair]:
+        """
+        마지막으로 호출한 뒤 backlog나 capacity가 바뀐 링크들을 반환하고 비웁니다.
+        """
+        changed_links = self._changed_links
+        self._changed_links = set()
+
+        return changed_links
+
+    def _get_schedule_state(self) -> Tuple[int, ...]:
+        """
+        링크마다 backlog를 처리하는 데 걸리는 예상 시간을 양자화한 그래프 상태를 반환합니다.
+        """
+        return self._schedule_cache.quantize(self.get_link_cost(link) for link in self._layer_node_pairs)
+
+    def _get_cached_path(self, job_info: JobInfo) -> Optional[List[Tuple[LayerNode, LayerNode, str]]]:
+        """
+        그래프 상태가 바뀌지 않았다면 같은 작업의 이전 경로를 반환합니다. 캐시를 사용하지 않거나 경로가 없다면 None을 반환합니다.
+        """
+        if not self._schedule_cache.is_enabled():
+            return None
+
+        return self._schedule_cache.get(job_info.job_name, job_info.source_ip, job_info.terminal_ip, self._get_schedule_state())
+
+    def _put_cached_path(self, job_info: JobInfo, path: List[Tuple[LayerNode, LayerNode, str]]) -> None:
+        if not self._schedule_cache.is_enabled():
+            return
+
+        self._schedule_cache.put(job_info.job_name, job_info.source_ip, job_info.terminal_ip, self._get_schedule_state(), path)
+
+    def get_schedule_cache_stats(self) -> Dict[str, int]:
+        """
+        스케줄링 캐시의 재사용(hits), 재탐색(misses), 무효화(invalidations) 횟수와 저장된 경로 수(paths)를 반환합니다.
+        """
+        return self._schedule_cache.get_stats()
+
     # Method that return all layered grph's links of layer_node_ip.
     # ex) layer_node_ip : 192.168.1.5
     # return : LayerNodePair(192.168.1.5-0, 192.168.1.6-0), LayerNodePair(192.168.1.5-1, 192.168.1.6-1) ...
@@ -168,16 +496,28 @@ class LayeredGraph:
     def get_layered_graph_backlog(self) -> Dict[LayerNodePair, float]:
         """
         레이어드 그래프의 각 링크의 백로그를 반환합니다. (GFLOPs or KB)
+        다른 스레드가 backlog를 바꾸는 동안 순회할 수 있도록 복사본을 반환합니다.
         """
-        return self._layered_graph_backlog
+        with self._mutex:
+            return dict(self._layered_graph_backlog)
     
-    def get_arrival_rate(self, path: List[Tuple[LayerNode, LayerNode, str]]) -> float:
-        arrival_rate = 0
-        for source, destination, _ in path:
-            link = LayerNodePair(source, destination)
-            arrival_rate += self._layered_graph_backlog[link]
+    def get_arrival_rate(self, path: List[Tuple[LayerNode, LayerNode, str]], job_info: Optional[JobInfo] = None, is_scheduled: bool = False) -> float:
+        """
+        경로의 링크들에 쌓인 backlog를 처리하는 데 걸리는 예상 시간의 합을 반환합니다. (sec)
+        job_info가 주어지면 작업의 weight로 나누어 쓰는 capacity를 기준으로 계산하고, is_scheduled가 False라면 아직 backlog에 더하지 않은 이번 작업의 처리 시간도 더합니다.
+        """
+        with self._mutex:
+            arrival_rate = 0
+            for source, destination, model_name in path:
+                link = LayerNodePair(source, destination)
+
+                if job_info is None:
+                    arrival_rate += self.get_link_cost(link)
+                else:
+                    work = 0 if is_scheduled else self.get_work(link, model_name, job_info.input_bytes)
+                    arrival_rate += self.get_link_cost(link, work, job_info.job_name)
 
-        return arrival_rate
+            return arrival_rate
 
     def update_expected_arrival_rate(self, slot_arrival_rate):
         """TODO: 이번 time slot에 들어온 job rate(slot_arrival_rate)(i.e., 강화학습이 처리한 프레임의 개수)를 기반으로 arrival rate를 계산한다.
@@ -209,7 +549,10 @@ class LayeredGraph:
     
     
     def load_config(self, config_path=None):
-        """TODO: path에 있는 파일에서 저장된 config value를 (layer별 time, energy) 불러와서 self._configs에 저장하고 power는 반환한다."""
+        """TODO: path에 있는 파일에서 저장된 config value를 (layer별 time, energy) 불러와서 self._configs에 저장하고 power는 반환한다.
+        프로파일은 바뀌지 않으므로 처음 한 번만 읽습니다."""
+        if self._configs is not None:
+            return IDLE_POWER
 
         end_config_path = glob.glob("spec/yolov5/end.csv")[0]
         edge_config_path = glob.glob("spec/yolov5/edge.csv")[0]
@@ -222,21 +565,42 @@ class LayeredGraph:
         end_to_edge_config = pd.read_csv(end_to_edge_config_path)
 
         time_config = {
-            'end': end_config.latency.to_list(),
-            'edge': edge_config.latency.to_list(),
-            'cloud': cloud_config.latency.to_list()
+            'end': self._map_layer_profile(end_config.latency.to_list()),
+            'edge': self._map_layer_profile(edge_config.latency.to_list()),
+            'cloud': self._map_layer_profile(cloud_config.latency.to_list())
         }
 
         energy_config = {
-            'end': end_config.watt_hour.to_list(),
-            'edge': edge_config.watt_hour.to_list(),
-            'cloud': cloud_config.watt_hour.to_list(),
-            'end_to_edge': end_to_edge_config.watt_hour.to_list(),
+            'end': self._map_layer_profile(end_config.watt_hour.to_list()),
+            'edge': self._map_layer_profile(edge_config.watt_hour.to_list()),
+            'cloud': self._map_layer_profile(cloud_config.watt_hour.to_list()),
+            'end_to_edge': self._map_transfer_profile(end_to_edge_config.watt_hour.to_list()),
         }
 
         self._configs = (time_config, energy_config)
 
-        return 1.7 # 측정 결과 초당 1.7w를 소모함
+        return IDLE_POWER
+
+    def _map_layer_profile(self, layer_values: List[float]) -> List[float]:
+        """
+        레이어마다 측정한 값(실행 시간, 소모 에너지)을 stage마다의 값으로 바꿉니다. (Simulator.init_tiers와 같은 방법)
+        표의 레이어 수가 stage 수와 같다면 레이어마다 한 stage이고, 다르다면 표 전체의 합을 stage의 계산량 비율로 나눕니다.
+        """
+        if len(layer_values) == len(self._model_names):
+            return list(layer_values)
+
+        total_computing = sum(self._computing[model_name] for model_name in self._model_names) # GFLOPs
+        return [sum(layer_values) * self._computing[model_name] / total_computing if total_computing > 0 else 0 for model_name in self._model_names]
+
+    def _map_transfer_profile(self, transfer_values: List[float]) -> List[float]:
+        """
+        분할 지점마다 end가 edge로 보낼 때 측정한 값(소모 에너지)을 stage 수에 맞는 분할 지점(0 ~ stage 수 - 1)마다의 값으로 바꿉니다.
+        표의 행 수가 stage 수와 같다면 행마다 한 분할 지점이고, 다르다면 입력을 보낼 때의 값(0번 행)을 분할 지점에서 보내는 데이터의 입력 대비 비율로 나눕니다.
+        """
+        if len(transfer_values) == len(self._model_names):
+            return list(transfer_values)
+
+        return [transfer_values[0] * ratio for ratio in self._get_transfer_ratios(self._input_bytes)[:len(self._model_names)]]
     
     def get_t_wait(self):
         computing_backlog = {
@@ -257,6 +621,8 @@ class LayeredGraph:
                 node_name = "edge"
             elif link.source.get_ip() == "192.168.1.8":
                 node_name = "cloud"
+            else:
+                continue
 
             if link.is_same_node(): # computing
                 computing_backlog[node_name] += self._layered_graph_backlog[link]
@@ -0,0 +1,133 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import threading
+import time
+
+from layeredgraph.LayerNode import LayerNode
+
+DEFAULT_STEP = 0.002 # sec
+DEFAULT_TTL = 0 # sec
+
+class ScheduleCache:
+    """
+    스케줄링 결과(경로)를 재사용하는 캐시입니다.
+    프레임마다 링크의 예상 처리 시간이 거의 변하지 않는다면 경로 탐색을 다시 하지 않고 이전 경로를 반환합니다.
+
+    키는 (작업 이름, 출발 IP, 도착 IP, 양자화한 그래프 상태)입니다.
+    그래프 상태는 링크마다 backlog를 처리하는 데 걸리는 예상 시간(sec)을 step 단위로 나눈 값들이며,
+    어느 한 링크라도 다른 칸으로 넘어가면 그래프 상태가 바뀐 것이므로 캐시를 모두 비웁니다(invalidation).
+    그래프 상태가 바뀌지 않더라도 ttl이 지난 경로는 다시 탐색합니다.
+
+    조회할 때마다 모든 링크를 양자화하므로(O(L)), 경로를 재사용하지 못하면 캐시가 없을 때보다 느립니다.
+    Dijkstra로 3000 프레임을 배치해 보면, 링크 capacity가 충분하여 backlog가 step보다 작게 유지될 때는 97%를 재사용하여 CPU 시간이 2.4배 줄었지만,
+    프레임마다 backlog가 step 이상 쌓일 때는 매번 캐시를 비우므로 CPU 시간이 47% 늘었습니다. (step 2 ~ 20 ms 모두 같은 경향)
+    따라서 기본값은 캐시를 사용하지 않는 것(ttl 0)이며, 다음 순서로 켭니다.
+        1. config의 Network에 schedule_cache_ttl(예: 1.0)을 주고 Controller를 실행합니다.
+        2. backlog 로그의 schedule_cache.csv에서 hits / (hits + misses)를 봅니다. 대부분 invalidation이라면 캐시를 끕니다.
+        3. step(schedule_cache_step)을 키우면 재사용은 늘지만, 같은 경로에 부하가 몰리므로 지연 시간이 늘어나는 지 함께 확인합니다.
+
+    Attributes:
+        _step (float): 링크의 예상 처리 시간을 양자화하는 단위. (sec)
+        _ttl (float): 경로를 재사용하는 최대 시간. (sec) 0(기본값)이라면 캐시를 사용하지 않습니다.
+        _state (Optional[Tuple[int, ...]]): 현재 캐시가 가정하는 양자화한 그래프 상태.
+        _paths (Dict[Tuple[str, str, str, Tuple[int, ...]], Tuple[List[Tuple[LayerNode, LayerNode, str]], float]]): 키와 경로, 경로를 저장한 시간(sec).
+        _hit_count (int): 경로를 재사용한 횟수.
+        _miss_count (int): 경로를 다시 탐색한 횟수.
+        _invalidation_count (int): 그래프 상태가 바뀌어 캐시를 비운 횟수.
+        _mutex (threading.Lock): 스케줄링 스레드들 사이의 lock.
+        _clock (Callable[[], float]): 현재 시간(sec)을 반환하는 함수.
+    """
+    def __init__(self, step: float = DEFAULT_STEP, ttl: float = DEFAULT_TTL, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            step (float): 링크의 예상 처리 시간을 양자화하는 단위. (sec)
+            ttl (float): 경로를 재사용하는 최대 시간. (sec) 0이라면 캐시를 사용하지 않습니다.
+            clock (Callable[[], float]): 현재 시간(sec)을 반환하는 함수. 시뮬레이션에서는 시뮬레이션 시간을 사용합니다.
+        """
+        self._check_validate(step, ttl)
+
+        self._step: float = step
+        self._ttl: float = ttl
+        self._state: Optional[Tuple[int, ...]] = None
+        self._paths: Dict[Tuple[str, str, str, Tuple[int, ...]], Tuple[List[Tuple[LayerNode, LayerNode, str]], float]] = {}
+
+        self._hit_count: int = 0
+        self._miss_count: int = 0
+        self._invalidation_count: int = 0
+
+        self._mutex = threading.Lock()
+        self._clock = clock
+
+    def _check_validate(self, step: float, ttl: float):
+        """
+        양자화 단위와 ttl이 올바른지 검증합니다.
+        """
+        if step <= 0:
+            raise ValueError(f"step must be positive, but got {step}")
+
+        if ttl < 0:
+            raise ValueError(f"ttl must be non-negative, but got {ttl}")
+
+    def is_enabled(self) -> bool:
+        return self._ttl > 0
+
+    def quantize(self, link_costs: Iterable[float]) -> Tuple[int, ...]:
+        """
+        링크마다의 예상 처리 시간(sec)을 step 단위로 양자화한 그래프 상태를 반환합니다.
+        """
+        return tuple(int(link_cost // self._step) for link_cost in link_costs)
+
+    def get(self, job_name: str, source_ip: str, destination_ip: str, state: Tuple[int, ...]) -> Optional[List[Tuple[LayerNode, LayerNode, str]]]:
+        """
+        저장된 경로를 반환합니다. 그래프 상태가 바뀌었다면 캐시를 비우며, 경로가 없거나 ttl이 지났다면 None을 반환합니다.
+        """
+        with self._mutex:
+            if state != self._state:
+                if self._paths:
+                    self._invalidation_count += 1
+
+                self._paths.clear()
+                self._state = state
+
+            key = (job_name, source_ip, destination_ip, state)
+
+            if key not in self._paths or self._clock() - self._paths[key][1] >= self._ttl:
+                self._miss_count += 1
+                return None
+
+            self._hit_count += 1
+            return list(self._paths[key][0])
+
+    def put(self, job_name: str, source_ip: str, destination_ip: str, state: Tuple[int, ...], path: List[Tuple[LayerNode, LayerNode, str]]) -> None:
+        """
+        경로를 저장합니다. 탐색하는 동안 그래프 상태가 바뀌었다면 저장하지 않습니다.
+        """
+        with self._mutex:
+            if state != self._state:
+                return
+
+            self._paths[(job_name, source_ip, destination_ip, state)] = (list(path), self._clock())
+
+    def invalidate(self) -> None:
+        """
+        저장된 경로를 모두 버립니다.
+        """
+        with self._mutex:
+            if self._paths:
+                self._invalidation_count += 1
+
+            self._paths.clear()
+            self._state = None
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: 재사용한 횟수(hits), 다시 탐색한 횟수(misses), 캐시를 비운 횟수(invalidations), 저장된 경로 수(paths).
+        """
+        with self._mutex:
+            return {
+                "hits": self._hit_count,
+                "misses": self._miss_count,
+                "invalidations": self._invalidation_count,
+                "paths": len(self._paths),
+            }
@@ -1,3 +1,4 @@
 from layeredgraph.LayerNode import LayerNode
 from layeredgraph.LayerNodePair import LayerNodePair
+from layeredgraph.ScheduleCache import ScheduleCache
 from layeredgraph.LayeredGraph import LayeredGraph
\ No newline at end of file
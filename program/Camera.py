@@ -1,35 +1,39 @@
-import numpy as np
-import cv2
-import posix_ipc
-import mmap
+import sys, os
+
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
 from jetcam.csi_camera import CSICamera
-from jetcam.utils import bgr8_to_jpeg
+
+from ipc import FrameRing
 
 TARGET_WIDTH = 320
 TARGET_HEIGHT = 320
 TARGET_DEPTH = 3
 
+SHARED_MEMORY_NAME = "jetson"
+NUM_SLOTS = 8
+
 class Camera:
+    """
+    CSI 카메라의 프레임을 공유 메모리 링 버퍼에 씁니다. CameraSender 등 여러 소비자가 같은 링 버퍼를 읽습니다.
+
+    Attributes:
+        _frame_ring (FrameRing): 프레임을 쓰는 공유 메모리 링 버퍼.
+        _camera (CSICamera): 모델 입력 크기로 프레임을 내보내는 카메라.
+    """
     def __init__(self):
-        sample_array = np.zeros((TARGET_HEIGHT, TARGET_WIDTH, TARGET_DEPTH), dtype=np.uint8)
-        self.shared_memory_name = "jetson"
-        self.memory = posix_ipc.SharedMemory(self.shared_memory_name, posix_ipc.O_CREAT, size=sample_array.nbytes)
-        self.map_file = mmap.mmap(self.memory.fd, self.memory.size)
-        # Immediately close the file descriptor since we don't need it anymore
-        self._camera = CSICamera(width=224, height=224)
+        self._frame_ring = FrameRing(SHARED_MEMORY_NAME, (TARGET_HEIGHT, TARGET_WIDTH, TARGET_DEPTH), NUM_SLOTS)
+        self._camera = CSICamera(width=TARGET_WIDTH, height=TARGET_HEIGHT)
 
     def run_camera(self):
         self._camera.running = True
         self._camera.observe(self.update_image, names='value')
 
     def update_image(self, change):
-        image = change['new']
-        shared_a = np.ndarray(image.shape, dtype=image.dtype, buffer=self.map_file)
-        np.copyto(shared_a, image)
+        self._frame_ring.write(change['new'])
 
     def unlink_shared_memory(self):
-        self.map_file.close()
-        self.memory.unlink()
+        self._frame_ring.unlink()
 
 if __name__ == '__main__':
     camera = Camera()
@@ -7,17 +7,26 @@ from communication import *
 from config import ControllerConfig, NetworkConfig, ModelConfig
 from layeredgraph import LayeredGraph, LayerNode
 from job import JobInfo, SubtaskInfo
-from utils import save_latency, save_virtual_backlog, save_path, get_ip_address
+from utils import save_latency, get_latency_stats, save_latency_percentiles, save_virtual_backlog, save_schedule_cache_stats, save_path, get_ip_address
 
 import time
 import pickle, json
+import argparse
 import paho.mqtt.publish as publish
 import threading
+import MQTTclient
+import numpy as np
 
+from collections import deque
 from datetime import datetime
-from typing import Dict
+from typing import Deque, Dict, List, Optional, Tuple
 
 MS_PER_SECOND = 1_000
+LATENCY_EWMA_ALPHA = 0.3 # 종단 간 지연 시간 지수 이동 평균에서 새 값의 가중치
+LATENCY_SAMPLE_WINDOW = 1_000 # 작업마다 지연 시간 백분위수를 계산하는 최근 작업 수
+LATENCY_REPORT_INTERVAL = 5 # sec
+MQTT_PORT = 1883
+RATE_FEEDBACK_CHECKS_PER_INTERVAL = 4
 
 class Controller(Program):
     def __init__(self, sub_configs, pub_configs):
@@ -46,20 +55,40 @@ class Controller(Program):
         self._controller_config: ControllerConfig = None
         self._model_config: ModelConfig = None
         self._layered_graph = None
-        self._arrival_rate = 0
         self._real_arrival_rate = 0
-        self._send_num = 0
-        
-        # job_id: start_time (ms)
-        self._job_list: Dict[str, int] = {}
+
+        # job_name: 마지막으로 스케줄링한 경로의 backlog와 작업을 처리하는 데 걸리는 예상 시간 (sec)
+        self._arrival_rates: Dict[str, float] = {}
+        # job_name: 마지막으로 스케줄링을 요청한 작업. 노드 정보가 바뀌면 다시 스케줄링하여 arrival rate를 갱신합니다.
+        self._last_job_infos: Dict[str, JobInfo] = {}
+        # job_name: 지난 1초 동안 스케줄링을 요청한 작업 수와 측정한 fps
+        self._send_nums: Dict[str, int] = {}
+        self._real_arrival_rates: Dict[str, float] = {}
+
+        # job_name: 종단 간 지연 시간의 지수 이동 평균과 최근 LATENCY_SAMPLE_WINDOW개의 지연 시간 (ms)
+        self._latencies: Dict[str, float] = {}
+        self._latency_samples: Dict[str, Deque[float]] = {}
+        self._latency_mutex = threading.Lock()
+
+        # source_ip: RateFeedback을 보내는 sender 브로커와의 연결
+        self._rate_subscribers: Dict[str, MQTTclient.Publisher] = {}
+        # job_name: 마지막으로 보낸 RateFeedback과 시간 (sec)
+        self._pushed_rate_feedbacks: Dict[str, RateFeedback] = {}
+        self._pushed_rate_feedback_times: Dict[str, float] = {}
+        self._rate_feedback_mutex = threading.Lock()
+
+        # scheduling_slot 동안 모은 스케줄링 요청
+        self._pending_jobs: List[JobInfo] = []
+        self._pending_jobs_mutex = threading.Lock()
+
+        # job_id: (start_time (ms), job_name)
+        self._job_list: Dict[str, Tuple[float, str]] = {}
         self._job_list_mutex = threading.Lock()
 
         self._is_first_scheduling = True
 
         self._last_job_id = None
 
-        self._job_info_dummy = None
-
         self.init_network_config()
         self.init_controller_config()
         self.init_model_config()
@@ -98,26 +127,30 @@ class Controller(Program):
         callback_thread.start()
 
     def garbage_job_collector(self):
+        """
+        collect_garbage_job_time이 지나도록 끝나지 않은 작업을 버리고, 작업마다 그 시간을 지연 시간으로 기록합니다.
+        """
         collect_garbage_job_time = self._network_config.collect_garbage_job_time # sec
-        for job_name in self._network_config.get_job_names():
-            while True:
-                time.sleep(collect_garbage_job_time) # sec
-                
-                cur_time = time.time() * MS_PER_SECOND # ms
+        while True:
+            time.sleep(collect_garbage_job_time) # sec
+            
+            cur_time = time.time() * MS_PER_SECOND # ms
+            latency = collect_garbage_job_time * MS_PER_SECOND # ms
+            
+            self._job_list_mutex.acquire()
+            try:
+                keys_to_delete = [job_id for job_id, (start_time, _) in self._job_list.items() 
+                                if cur_time - start_time >= latency] # ms
+                job_names = [self._job_list.pop(job_id)[1] for job_id in keys_to_delete]
                 
-                self._job_list_mutex.acquire()
-                try:
-                    keys_to_delete = [job_id for job_id, start_time in self._job_list.items() 
-                                    if cur_time - start_time >= collect_garbage_job_time * MS_PER_SECOND] # ms
-                    for k in keys_to_delete:
-                        latency = collect_garbage_job_time * MS_PER_SECOND # ms
-                        latency_log_file_path = f"{self._latency_log_path}/{job_name}.csv"
-                        save_latency(latency_log_file_path, latency)
-                        del self._job_list[k]
-                    
-                    print(f"Deleted {len(keys_to_delete)} jobs. {len(self._job_list)} remains.")
-                finally:
-                    self._job_list_mutex.release()
+                print(f"Deleted {len(keys_to_delete)} jobs. {len(self._job_list)} remains.")
+            finally:
+                self._job_list_mutex.release()
+
+            for job_name in job_names:
+                latency_log_file_path = f"{self._latency_log_path}/{job_name}.csv"
+                save_latency(latency_log_file_path, latency)
+                self.update_latency(job_name, latency)
 
     def init_record_virtual_backlog(self):
         record_virtual_backlog_thread = threading.Thread(target=self.record_virtual_backlog, args=())
@@ -125,10 +158,12 @@ class Controller(Program):
 
     def record_virtual_backlog(self):
         backlog_log_file_path = f"{self._backlog_log_path}/total_backlog.csv"
+        schedule_cache_log_file_path = f"{self._backlog_log_path}/schedule_cache.csv"
         while True:
             time.sleep(0.1)
             self._layered_graph.update_graph()
             save_virtual_backlog(backlog_log_file_path, self._layered_graph.get_layered_graph_backlog())
+            save_schedule_cache_stats(schedule_cache_log_file_path, self._layered_graph.get_schedule_cache_stats())
 
     def init_sync_backlog(self):
         sync_backlog_thread = threading.Thread(target=self.sync_backlog, args=())
@@ -169,9 +204,34 @@ class Controller(Program):
     def measure_arrival_rate(self):
         while True:
             time.sleep(1)
-            self._real_arrival_rate = self._send_num / 30
+            send_nums = self._send_nums
+            self._send_nums = {}
+
+            self._real_arrival_rates = {job_name: float(send_num) for job_name, send_num in send_nums.items()} # fps
+            self._real_arrival_rate = sum(send_nums.values()) / 30
             self._layered_graph.update_expected_arrival_rate(self._real_arrival_rate)
-            self._send_num = 0
+
+    def init_report_latency_percentiles(self):
+        report_latency_percentiles_thread = threading.Thread(target=self.report_latency_percentiles, args=())
+        report_latency_percentiles_thread.start()
+
+    def report_latency_percentiles(self):
+        """
+        LATENCY_REPORT_INTERVAL마다 작업별 최근 지연 시간의 백분위수와 SLO를 지킨 비율을 기록합니다.
+        """
+        latency_percentiles_log_file_path = f"{self._latency_log_path}/percentiles.csv"
+        while True:
+            time.sleep(LATENCY_REPORT_INTERVAL)
+
+            with self._latency_mutex:
+                latency_samples = {job_name: list(samples) for job_name, samples in self._latency_samples.items() if len(samples) > 0}
+
+            if len(latency_samples) == 0:
+                continue
+
+            percentiles = {job_name: get_latency_stats(samples, self._network_config.get_job_latency_slo(job_name)) for job_name, samples in latency_samples.items()}
+
+            save_latency_percentiles(latency_percentiles_log_file_path, percentiles)
 
     def handle_config(self, topic, payload, publisher):
         # get source ip address
@@ -208,52 +268,121 @@ class Controller(Program):
             node_link_info.transfer_capacity
         )
 
-        if self._job_info_dummy:
-            path = self._layered_graph.schedule(
-                self._job_info_dummy.source_ip, 
-                self._job_info_dummy
-            )
-            self._arrival_rate = self._layered_graph.get_arrival_rate(path)
+        if len(self._last_job_infos) > 0:
+            for job_name, job_info in list(self._last_job_infos.items()):
+                path = self._layered_graph.schedule(job_info)
+                self._arrival_rates[job_name] = self._layered_graph.get_arrival_rate(path, job_info)
+            self.push_rate_feedbacks()
 
     def handle_request_scheduling(self, topic, payload, publisher):
-        self._send_num += 1 # for measure real arrival rate
         job_info: JobInfo = pickle.loads(payload)
+        job_name = job_info.job_name
+        self._send_nums[job_name] = self._send_nums.get(job_name, 0) + 1 # for measure real arrival rate
 
         if self._is_first_scheduling:
             self.init_record_virtual_backlog()
             self._is_first_scheduling = False
-            self._job_info_dummy = job_info
+
+        self._last_job_infos[job_name] = job_info
 
         # register start time
-        self._job_list[job_info.job_id] = time.time() * MS_PER_SECOND # ms
+        with self._job_list_mutex:
+            self._job_list[job_info.job_id] = (time.time() * MS_PER_SECOND, job_name) # ms
+
+        # time slot이 끝나면 모은 요청들을 함께 스케줄링합니다.
+        if self._controller_config.scheduling_slot > 0:
+            with self._pending_jobs_mutex:
+                self._pending_jobs.append(job_info)
+            return
 
         path = self._layered_graph.schedule(job_info)
-        self._arrival_rate = self._layered_graph.get_arrival_rate(path)
+        self._arrival_rates[job_name] = self._layered_graph.get_arrival_rate(path, job_info)
+        self.push_rate_feedback(job_info.source_ip)
         self._layered_graph.update_path_backlog(job_info=job_info, path=path)
+        self.dispatch_paths([(job_info, path)])
+
+    def init_schedule_slot(self):
+        schedule_slot_thread = threading.Thread(target=self.schedule_slot, args=())
+        schedule_slot_thread.start()
+
+    def schedule_slot(self):
+        while True:
+            time.sleep(self._controller_config.scheduling_slot)
+
+            with self._pending_jobs_mutex:
+                job_infos = self._pending_jobs
+                self._pending_jobs = []
+
+            if len(job_infos) == 0:
+                continue
+
+            # 경로가 없어(ValueError) 스케줄링에 실패해도 스레드가 멈추면 _pending_jobs가 끝없이 쌓이므로, 이번 time slot의 작업들만 버리고 계속합니다.
+            try:
+                paths = self._layered_graph.schedule_batch(job_infos)
+
+                # schedule_batch가 backlog를 이미 갱신했으므로, 작업마다 마지막 경로의 backlog만 처리하는 시간을 사용합니다.
+                for job_info, path in zip(job_infos, paths):
+                    self._arrival_rates[job_info.job_name] = self._layered_graph.get_arrival_rate(path, job_info, is_scheduled=True)
+                self.push_rate_feedbacks()
+                self.dispatch_paths(list(zip(job_infos, paths)))
+
+            except Exception as e:
+                print(f"Failed to schedule {len(job_infos)} jobs: {e!r}. Dropped them.")
+                self.drop_jobs(job_infos)
+
+    def drop_jobs(self, job_infos: List[JobInfo]):
+        """
+        스케줄링하지 못한 작업들을 지연 시간 측정 대상에서 뺍니다.
+        """
+        with self._job_list_mutex:
+            for job_info in job_infos:
+                self._job_list.pop(job_info.job_id, None)
+
+    def dispatch_paths(self, job_paths: List[Tuple[JobInfo, List[Tuple[LayerNode, LayerNode, str]]]]):
+        """
+        경로들의 SubtaskInfo를 서브태스크를 실행할 노드마다 모아 한 번의 연결로 보냅니다.
+        """
         path_log_file_path = f"{self._path_log_path}/path.csv"
-        save_path(path_log_file_path, path)
-        
-        for i in range(len(path)):
-            source = path[i][0]
-            destination = path[i][1]
-            model_name = path[i][2]
-            subtask_info = SubtaskInfo(job_info, source, destination, model_name, i, len(path))
-            subtask_info_bytes = pickle.dumps(subtask_info)
-            # send SubtaskInfo byte to source ip
-            publish.single("job/subtask_info", subtask_info_bytes, hostname=source.get_ip())
+        messages: Dict[str, List[Dict[str, any]]] = {}
+
+        for job_info, path in job_paths:
+            save_path(path_log_file_path, path)
+
+            for i in range(len(path)):
+                source = path[i][0]
+                destination = path[i][1]
+                model_name = path[i][2]
+                subtask_info = SubtaskInfo(job_info, source, destination, model_name, i, len(path))
+                subtask_info_bytes = pickle.dumps(subtask_info)
+                messages.setdefault(source.get_ip(), []).append({"topic": "job/subtask_info", "payload": subtask_info_bytes})
+
+        # send SubtaskInfo bytes to source ip
+        # 연결할 수 없는 노드가 있어도 나머지 노드에는 보냅니다. 그 노드의 서브태스크는 collect_garbage_job_time이 지나면 버려집니다.
+        for ip, ip_messages in messages.items():
+            try:
+                publish.multiple(ip_messages, hostname=ip)
+            except Exception as e:
+                print(f"Failed to send {len(ip_messages)} subtasks to {ip}: {e!r}")
             
     def handle_response(self, topic, payload, publisher):
         subtask_info: SubtaskInfo = pickle.loads(payload)
         job_id = subtask_info.job_id
         self._job_list_mutex.acquire()
-        start_time = self._job_list[job_id]
-        del self._job_list[job_id]
+        job = self._job_list.pop(job_id, None)
         self._job_list_mutex.release()
+
+        # collect_garbage_job_time이 지나 이미 버린 작업입니다.
+        if job is None:
+            return
+
+        start_time, job_name = job
         finish_time = time.time() * MS_PER_SECOND # ms
 
         latency = finish_time - start_time
-        latency_log_file_path = f"{self._latency_log_path}/{subtask_info.job_name}.csv"
+        latency_log_file_path = f"{self._latency_log_path}/{job_name}.csv"
         save_latency(latency_log_file_path, latency)
+        self.update_latency(job_name, latency)
+        self.push_rate_feedbacks()
 
         if job_id == self._last_job_id:
             self.notify_finish()
@@ -261,6 +390,26 @@ class Controller(Program):
             time.sleep(5)
             os._exit(1)
 
+    def update_latency(self, job_name: str, latency: float):
+        """
+        작업의 종단 간 지연 시간 지수 이동 평균과 최근 지연 시간들을 갱신합니다. sender의 전송 fps 조절과 백분위수 기록에 사용합니다.
+        """
+        with self._latency_mutex:
+            previous_latency = self._latencies.get(job_name)
+            self._latencies[job_name] = latency if previous_latency is None else (1 - LATENCY_EWMA_ALPHA) * previous_latency + LATENCY_EWMA_ALPHA * latency
+            self._latency_samples.setdefault(job_name, deque(maxlen=LATENCY_SAMPLE_WINDOW)).append(latency)
+
+    def _is_congested(self, job_name: str) -> bool:
+        """
+        weight가 더 큰 작업 중 최근 지연 시간이 SLO를 넘는 작업이 있는 지 여부를 반환합니다.
+        그렇다면 작업의 sender가 전송 fps를 줄여 weight가 큰 작업에게 링크의 capacity를 양보합니다.
+        """
+        weight = self._network_config.get_job_weight(job_name)
+
+        return any(latency > self._network_config.get_job_latency_slo(other_job_name)
+                   for other_job_name, latency in list(self._latencies.items())
+                   if self._network_config.get_job_weight(other_job_name) > weight)
+
     def handle_network_performance_info(self, topic, payload, publisher):
         network_performance: NetworkPerformance = pickle.loads(payload)
 
@@ -282,14 +431,111 @@ class Controller(Program):
                 pass
 
     def handle_request_arrival_rate(self, topic, payload, publisher):
+        """
+        sender의 RateFeedback 구독 요청을 등록합니다.
+        이후 Controller는 값이 rate_feedback_threshold 이상 바뀌거나 rate_feedback_max_interval이 지날 때만 sender의 브로커에 연결을 유지한 채로 보냅니다.
+        """
         # get source ip address
         node_info: RequestConfig = pickle.loads(payload)
         ip = node_info.ip
 
-        arrival_rate_bytes = pickle.dumps(self._arrival_rate)
+        with self._rate_feedback_mutex:
+            is_subscribed = ip in self._rate_subscribers
 
-        # send arrival_rate byte to source ip (response)
-        publish.single("mdc/arrival_rate", arrival_rate_bytes, hostname=ip)
+        # 연결은 sender의 브로커가 느리거나 닿지 않으면 오래 걸리므로, 피드백을 보내는 스레드들이 기다리지 않도록 lock 밖에서 합니다.
+        if not is_subscribed:
+            try:
+                rate_subscriber = MQTTclient.Publisher(config={
+                    "ip": ip,
+                    "port": MQTT_PORT
+                })
+            except Exception as e:
+                print(f"Failed to connect to ip: {ip} for rate feedback: {e!r}")
+                return
+
+            with self._rate_feedback_mutex:
+                # 그동안 같은 sender의 다른 요청이 먼저 연결했다면 새 연결은 닫습니다.
+                duplicated_subscriber = self._rate_subscribers.get(ip)
+                if duplicated_subscriber is None:
+                    self._rate_subscribers[ip] = rate_subscriber
+                    print(f"ip: {ip} subscribed rate feedback.")
+
+            if duplicated_subscriber is not None:
+                rate_subscriber.close()
+
+        with self._rate_feedback_mutex:
+            # 다시 구독한 sender는 피드백을 잃어버렸을 수 있으므로 바로 보냅니다.
+            for job_name in self._get_source_job_names(ip):
+                self._pushed_rate_feedbacks.pop(job_name, None)
+
+        self.push_rate_feedback(ip)
+
+    def push_rate_feedbacks(self):
+        for ip in list(self._rate_subscribers.keys()):
+            self.push_rate_feedback(ip)
+
+    def push_rate_feedback(self, ip: str):
+        """
+        구독한 sender에게 IP가 출발지인 작업마다 RateFeedback을 보냅니다.
+        작업마다 마지막으로 보낸 값에서 충분히 바뀌지 않았고 최대 간격도 지나지 않았다면 보내지 않습니다.
+        연결이 끊겨 보내지 못한 sender는 구독을 지웁니다. sender는 RateFeedback을 받지 못하면 다시 구독하므로 그때 다시 연결합니다.
+        """
+        failed_subscriber = None
+
+        with self._rate_feedback_mutex:
+            if ip not in self._rate_subscribers:
+                return
+
+            for job_name in self._get_source_job_names(ip):
+                rate_feedback = RateFeedback(self._arrival_rates.get(job_name, 0), self._latencies.get(job_name), job_name, self._is_congested(job_name))
+                pushed_rate_feedback = self._pushed_rate_feedbacks.get(job_name)
+                elapsed_time = time.time() - self._pushed_rate_feedback_times.get(job_name, 0) # sec
+
+                if (pushed_rate_feedback is not None
+                    and elapsed_time < self._controller_config.rate_feedback_max_interval
+                    and not self._is_changed(pushed_rate_feedback.arrival_rate, rate_feedback.arrival_rate)
+                    and not self._is_changed(pushed_rate_feedback.latency, rate_feedback.latency)
+                    and pushed_rate_feedback.congested == rate_feedback.congested):
+                    continue
+
+                self._pushed_rate_feedbacks[job_name] = rate_feedback
+                self._pushed_rate_feedback_times[job_name] = time.time()
+
+                # send RateFeedback byte to source ip
+                if not self._rate_subscribers[ip].publish("mdc/arrival_rate", pickle.dumps(rate_feedback)):
+                    failed_subscriber = self._rate_subscribers.pop(ip)
+                    for source_job_name in self._get_source_job_names(ip):
+                        self._pushed_rate_feedbacks.pop(source_job_name, None)
+                    break
+
+        if failed_subscriber is not None:
+            print(f"ip: {ip} lost rate feedback connection. Unsubscribed.")
+            failed_subscriber.close()
+
+    def _get_source_job_names(self, ip: str) -> List[str]:
+        return [job_name for job_name in self._network_config.get_job_names() if self._network_config.get_job_source(job_name) == ip]
+
+    def _is_changed(self, previous_value: Optional[float], value: Optional[float]) -> bool:
+        """
+        값이 rate_feedback_threshold 이상 상대적으로 바뀌었는 지 여부를 반환합니다.
+        """
+        if previous_value is None or value is None:
+            return previous_value != value
+
+        return abs(value - previous_value) > self._controller_config.rate_feedback_threshold * abs(previous_value) if previous_value != 0 else value != 0
+
+    def init_rate_feedback_heartbeat(self):
+        rate_feedback_heartbeat_thread = threading.Thread(target=self.rate_feedback_heartbeat, args=())
+        rate_feedback_heartbeat_thread.start()
+
+    def rate_feedback_heartbeat(self):
+        """
+        값이 바뀌지 않더라도 rate_feedback_max_interval마다 RateFeedback을 보냅니다. sender는 이 주기로 구독이 살아 있는 지 확인합니다.
+        최대 간격이 지난 sender에게만 보내므로, 간격을 넘기지 않도록 최대 간격보다 자주 확인합니다.
+        """
+        while True:
+            time.sleep(self._controller_config.rate_feedback_max_interval / RATE_FEEDBACK_CHECKS_PER_INTERVAL)
+            self.push_rate_feedbacks()
 
     def handle_finish(self, topic, payload, publisher):
         job_info: JobInfo = pickle.loads(payload)
@@ -301,6 +547,11 @@ class Controller(Program):
         self.init_sync_backlog()
         self.init_sync_network_performance()
         self.init_measure_arrival_rate()
+        self.init_rate_feedback_heartbeat()
+        self.init_report_latency_percentiles()
+
+        if self._controller_config.scheduling_slot > 0:
+            self.init_schedule_slot()
 
 
 if __name__ == '__main__':
@@ -319,8 +570,12 @@ if __name__ == '__main__':
             ],
         }
     
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default="config/config.json")
+    args = parser.parse_args()
+
     global path
-    path = "config/config.json"
+    path = args.config
 
     pub_configs = []
     
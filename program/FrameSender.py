@@ -0,0 +1,240 @@
+import sys, os
+
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+import pickle
+import time
+from abc import ABC, abstractmethod
+from threading import Thread
+import paho.mqtt.publish as publish
+import numpy as np
+import torch
+try:
+    from time import time_ns
+except ImportError:
+    from datetime import datetime
+    # For compatibility with Python 3.6
+    def time_ns():
+        now = datetime.now()
+        return int(now.timestamp() * 1e9)
+
+from utils.utils import get_ip_address, save_send_rate
+from utils.video_utils import encode_frame
+from program import MDC
+from job import JobInfo, SubtaskInfo, DNNOutput, SendRateController, FrameStore
+from communication import RateFeedback
+
+KB_PER_BYTE = 1024
+
+SEND_RATE_LOG_INTERVAL = 5.0 # sec
+SEND_RATE_LOG_DIRECTORY = "results/send_rate"
+
+# Controller는 최대 간격(기본값: 1 sec)마다 RateFeedback을 보내므로, 이 시간 동안 받지 못하면 다시 구독합니다.
+RATE_FEEDBACK_TIMEOUT = 5.0 # sec
+
+FRAME_STORE_CAPACITY = 64 # frames
+
+class FrameSender(MDC, ABC):
+    """
+    작업 하나의 프레임을 보내는 sender들(VideoSender, CameraSender, Sender)의 공통 부분입니다.
+
+    프레임을 보낼 때마다 Controller에 스케줄링을 요청하고, 경로(SubtaskInfo)가 돌아올 때까지 프레임을 프레임 저장소에 보관합니다.
+    Controller에 RateFeedback을 구독하고, SendRateController로 다음 프레임까지의 간격을 정합니다.
+    하위 클래스는 프레임을 가져오는 get_frame(추상 메서드)과, 필요하다면 프레임 소스를 여는 open_frame_source만 구현합니다.
+    get_frame을 구현하지 않은 하위 클래스는 생성할 때 TypeError가 발생합니다.
+
+    Attributes:
+        _job_name (str): 보내는 작업 이름.
+        _job_info (JobInfo): 마지막으로 보낸 프레임의 작업 정보.
+        _frame_store (FrameStore): 경로가 돌아오지 않은 프레임 저장소.
+        _arrival_rate (float): 마지막으로 받은 RateFeedback의 예상 처리 시간. (sec)
+        _rate_feedback_time (float): 마지막으로 RateFeedback을 받거나 구독한 시간. (sec)
+        _rate_controller (SendRateController): 전송 fps 조절기.
+    """
+    def __init__(self, sub_configs, pub_configs, job_name):
+        self._address = get_ip_address(["eth0", "wlan0"])
+
+        self._job_name = job_name
+        self._job_info = None
+        self._frame_store: FrameStore = None
+        self._arrival_rate = 0
+        self._rate_feedback_time = 0 # sec
+        self._rate_controller: SendRateController = None
+
+        super().__init__(sub_configs, pub_configs)
+
+        self.topic_dispatcher["mdc/arrival_rate"] = self.handle_arrival_rate
+
+    def init_job_info(self, input_bytes: float):
+        job_name = self._job_name
+        job_type = self._network_config.get_job_type(job_name)
+        source_ip = self._address
+        terminal_destination = self._network_config.get_job_destination(job_name)
+        start_time = time_ns() # 식별자를 위해서 ns 단위로 설정
+
+        job_info = JobInfo(job_name, job_type, input_bytes, source_ip, terminal_destination, start_time)
+
+        self._job_info = job_info
+
+    def handle_subtask_info(self, topic, data, publisher): # overriding
+        subtask_info: SubtaskInfo = pickle.loads(data)
+
+        # 프레임에서 시작하는 것은 경로의 첫 서브태스크뿐입니다. 이 노드의 나머지 서브태스크는 MDC.run_dnn이 앞 서브태스크의 출력을 이어서 실행합니다.
+        if subtask_info.primary_path_index != 0:
+            super().handle_subtask_info(topic, data, publisher)
+            return
+
+        self._job_manager.add_subtask(subtask_info)
+
+        subtask_layer_node = subtask_info.source
+
+        if subtask_layer_node.get_ip() == self._address:
+            job_id = subtask_info.job_id
+            frame = self._frame_store.pop(job_id)
+
+            # 프레임 저장소에서 이미 버려진 작업은 보낼 수 없습니다.
+            if frame is None:
+                print(f"Frame of {job_id} was already evicted.")
+                return
+
+            # 프레임은 uint8 [1, H, W, C]로, 압축된 프레임은 1차원 그대로 복사 없이 감싸 보내고, 첫 번째 모델을 실행하는 노드에서 압축을 풀고 정규화합니다.
+            input_tensor = torch.from_numpy(frame)
+            input_frame = DNNOutput(input_tensor.unsqueeze(0) if frame.ndim == 3 else input_tensor, subtask_info)
+            dnn_output, computing_capacity = self._job_manager.run(input_frame)
+            destination_ip = subtask_info.destination.get_ip()
+
+            dnn_output.subtask_info.set_next_source()
+
+            dnn_output_bytes = pickle.dumps(dnn_output)
+
+            # send job to next node
+            publish.single(f"job/{subtask_info.job_type}", dnn_output_bytes, hostname=destination_ip)
+
+            self._capacity_manager.update_computing_capacity(computing_capacity)
+
+    def handle_arrival_rate(self, topic, data, publisher):
+        rate_feedback: RateFeedback = pickle.loads(data)
+        self._rate_feedback_time = time.time()
+
+        # Controller는 같은 IP의 작업마다 피드백을 보내므로, 다른 작업의 피드백은 무시합니다.
+        if rate_feedback.job_name is not None and rate_feedback.job_name != self._job_name:
+            return
+
+        self._arrival_rate = rate_feedback.arrival_rate
+
+        if self._rate_controller is not None:
+            self._rate_controller.update(rate_feedback.arrival_rate, rate_feedback.latency, rate_feedback.congested)
+
+    def init_rate_controller(self):
+        latency_slo = self._network_config.get_job_latency_slo(self._job_name) # ms
+        max_fps = self._network_config.get_job_max_fps(self._job_name)
+
+        self._rate_controller = SendRateController(latency_slo, max_fps)
+
+    def send_rate_logger(self):
+        """
+        목표 fps, 실제로 보낸 fps, 최근 종단 간 지연 시간을 주기적으로 출력하고 저장합니다. 프레임 저장소의 크기와 버린 프레임 수도 출력합니다.
+        """
+        os.makedirs(SEND_RATE_LOG_DIRECTORY, exist_ok=True)
+        send_rate_log_file_path = f"{SEND_RATE_LOG_DIRECTORY}/{self._job_name}.csv"
+
+        while True:
+            time.sleep(SEND_RATE_LOG_INTERVAL)
+
+            target_fps = self._rate_controller.get_target_fps()
+            achieved_fps = self._rate_controller.get_achieved_fps()
+            latency = self._rate_controller.get_latency() # ms
+
+            frame_store_stats = self._frame_store.get_stats()
+
+            latency_str = f"{latency:.2f} ms" if latency is not None else "-"
+            print(f"fps: {achieved_fps:.2f} (target {target_fps:.2f}), latency: {latency_str}, "
+                  f"frame store: {frame_store_stats['frames']} frames ({frame_store_stats['bytes'] / KB_PER_BYTE:.1f} KB), "
+                  f"{frame_store_stats['evictions']} evicted, {frame_store_stats['orphans']} orphaned")
+            save_send_rate(send_rate_log_file_path, target_fps, achieved_fps, latency)
+
+    def run_send_rate_logger(self):
+        send_rate_logger_thread = Thread(target=self.send_rate_logger, args=())
+        send_rate_logger_thread.start()
+
+    def open_frame_source(self):
+        """
+        프레임을 보내기 전에 프레임 소스(영상, 카메라)를 엽니다.
+        """
+        pass
+
+    @abstractmethod
+    def get_frame(self) -> np.ndarray:
+        """
+        보낼 프레임을 uint8 [H, W, C]로 반환합니다.
+        """
+
+    def start(self):
+        self.wait_until_can_send()
+
+        input("Press any key to start sending.")
+
+        self.open_frame_source()
+        self.init_rate_controller()
+        self.init_frame_store()
+        self.run_arrival_rate_subscriber()
+        self.run_send_rate_logger()
+
+        while True:
+            sleep_time = self.get_sleep_time()
+            time.sleep(sleep_time)
+
+            self.send_frame()
+            self._rate_controller.record_send()
+
+    def wait_until_can_send(self):
+        print("Waiting for config.")
+        while not (self.check_job_manager_exists() and self.check_network_config_exists()):
+            time.sleep(1.0)
+
+    def send_frame(self):
+        current_frame = self.get_frame()
+
+        # 코덱을 설정했다면 압축한 프레임을 보관하고 보냅니다.
+        input_codec = self._network_config.get_job_input_codec(self._job_name)
+        if input_codec is not None:
+            current_frame = encode_frame(current_frame, input_codec, self._network_config.get_job_input_quality(self._job_name))
+
+        # 프레임을 uint8 그대로(또는 압축하여) 전송하므로 전송 크기는 보관한 프레임의 크기입니다.
+        # 이 크기가 스케줄러의 입력 전송량(backlog)이 되므로, 압축하면 입력을 그대로 오프로딩하는 경로가 유리해집니다.
+        input_bytes = current_frame.nbytes / KB_PER_BYTE # KB
+        self.init_job_info(input_bytes)
+
+        job_info_bytes = pickle.dumps(self._job_info)
+        self._frame_store.put(self._job_info.job_id, current_frame)
+
+        self._controller_publisher.publish("job/request_scheduling", job_info_bytes)
+
+    def init_frame_store(self):
+        """
+        Controller가 collect_garbage_job_time이 지난 작업을 버리므로, 그보다 오래 보관한 프레임은 다시 쓰이지 않습니다.
+        """
+        self._frame_store = FrameStore(FRAME_STORE_CAPACITY, self._network_config.collect_garbage_job_time)
+
+    def arrival_rate_subscriber(self):
+        """
+        Controller에 RateFeedback을 한 번 구독합니다. Controller는 값이 바뀌거나 최대 간격이 지날 때만 보내므로,
+        RATE_FEEDBACK_TIMEOUT 동안 받지 못했다면 구독이 끊겼다고 보고 다시 구독합니다.
+        """
+        node_info_bytes = pickle.dumps(self._node_info)
+        while True:
+            if time.time() - self._rate_feedback_time >= RATE_FEEDBACK_TIMEOUT:
+                self._controller_publisher.publish("mdc/arrival_rate", node_info_bytes)
+                self._rate_feedback_time = time.time()
+
+            time.sleep(RATE_FEEDBACK_TIMEOUT)
+
+    def run_arrival_rate_subscriber(self):
+        arrival_rate_thread = Thread(target=self.arrival_rate_subscriber, args=())
+        arrival_rate_thread.start()
+
+    def get_sleep_time(self) -> float:
+        """
+        SendRateController가 정한 다음 프레임까지의 간격을 반환합니다. (sec)
+        """
+        return self._rate_controller.get_sleep_time()
@@ -84,7 +84,8 @@ class MDC(Program):
         self._network_config: NetworkConfig = config["network"]
         self._model_config: ModelConfig = config["model"]
 
-        self._job_manager = JobManager(self._network_config, self._model_config)
+        # 모델은 백그라운드에서 불러오므로 바로 반환합니다.
+        self._job_manager = JobManager(self._network_config, self._model_config, self._address)
 
         self.init_node_publisher()
 
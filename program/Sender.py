@@ -3,87 +3,25 @@ import sys, os
 sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
 
 import pickle
-import time
-from threading import Thread
-import paho.mqtt.publish as publish
+import argparse
 import numpy as np
-import torch
-try:
-    from time import time_ns
-except ImportError:
-    from datetime import datetime
-    # For compatibility with Python 3.6
-    def time_ns():
-        now = datetime.now()
-        return int(now.timestamp() * 1e9)
-
-from utils.utils import get_ip_address
-from program import MDC
-from program.Communicator import Communicator
-from job import JobInfo, SubtaskInfo, DNNOutput
-
-
-class Sender(MDC):
-    def __init__(self, sub_config, pub_configs, job_name):
-        self._address = get_ip_address(["eth0", "wlan0"])
-
-        self._job_name = job_name
-        self._job_info = None
-        self._frame_list = dict()
-        self._arrival_rate = 0
-
-        super().__init__(sub_config, pub_configs)
-
-        self.topic_dispatcher["mdc/arrival_rate"] = self.handle_arrival_rate
-
-    def init_job_info(self, input_size: int):
-        source_ip = self._address
-        terminal_destination = self._network_config.get_job_destination(self._job_name)
-        job_type = self._network_config.get_job_type(self._job_name)
-        job_name = self._job_name
-        start_time = time_ns()
-        input_size = input_size 
-
-        job_info = JobInfo(source_ip, terminal_destination, job_type, job_name, start_time, input_size)
-
-        self._job_info = job_info
-
-    def handle_subtask_info(self, topic, data, publisher): # overriding
-        subtask_info: SubtaskInfo = pickle.loads(data)
-
-        self._job_manager.add_subtask(subtask_info)
-
-        subtask_layer_node = subtask_info.source
-
-        if subtask_layer_node.get_ip() == self._address and subtask_layer_node.get_layer() == 0:
-            job_id = subtask_info.job_id
-            input_frame = DNNOutput(torch.tensor(self._frame_list[job_id]).float(), subtask_info)
-            del self._frame_list[job_id]
-            dnn_output, computing_capacity = self._job_manager.run(input_frame)
-            destination_ip = subtask_info.destination.get_ip()
-
-            dnn_output.subtask_info.set_next_subtask_id()
-
-            dnn_output_bytes = pickle.dumps(dnn_output)
-                
-            # send job to next node
-            # self._node_publisher[destination_ip].publish(f"job/{subtask_info.job_type}", dnn_output_bytes)
-            publish.single(f"job/{subtask_info.job_type}", dnn_output_bytes, hostname=destination_ip)
-
-            self._capacity_manager.update_computing_capacity(computing_capacity)
 
-    def handle_arrival_rate(self, topic, data, publisher):
-        arrival_rate = pickle.loads(data)
-
-        self._arrival_rate = arrival_rate
+from program import FrameSender
+from program.Communicator import Communicator
 
+class Sender(FrameSender):
+    """
+    OMNeT++ agent가 요청할 때마다 agent가 정한 크기의 프레임을 보내는 sender입니다.
+    agent가 전송 시점을 정하므로 SendRateController를 사용하지 않고, 보상으로 Controller의 RateFeedback을 돌려줍니다.
+    """
     def start(self):
         self.wait_until_can_send()
         self.init_communicator()
 
         input("Press any key to start sending.")
 
-        self.run_arrival_rate_getter()
+        self.init_frame_store()
+        self.run_arrival_rate_subscriber()
         
 
         while True:
@@ -99,44 +37,6 @@ class Sender(MDC):
             elif agent_message == "finish":
                 self.handle_finish_from_agent()
 
-    def set_job_info_time(self):
-        if not self._network_config:
-            return False
-        
-        if not self._job_info:
-            self.init_job_info()
-            return True
-
-        self._job_info.set_start_time(time_ns())
-        return True
-            
-    def set_job_info_input_size(self, frame: np.array):
-        if not self._network_config:
-            return False
-        
-        if not self._job_info:
-            self.init_job_info()
-            return True
-        
-        input_bytes = sys.getsizeof(torch.tensor(frame).storage()) / 1024 # KB
-        self._job_info.set_input_bytes(input_bytes)
-        return True
-            
-    def wait_until_can_send(self):
-        print("Waiting for network info.")
-        while not (self.check_job_manager_exists() and self.check_config_exists()):
-            time.sleep(1.0)
-            
-    def arrival_rate_getter(self):
-        node_info_bytes = pickle.dumps(self._node_info)
-        while True:
-            time.sleep(0.1)
-            self._controller_publisher.publish("mdc/arrival_rate", node_info_bytes)
-
-    def run_arrival_rate_getter(self):
-        arrival_rate_thread = Thread(target=self.arrival_rate_getter, args=())
-        arrival_rate_thread.start()
-
     def init_communicator(self):
         self._communicator = Communicator(queue_name=self._network_config.queue_name, 
                                           buffer_size=4096, 
@@ -144,27 +44,15 @@ class Sender(MDC):
                                           debug_mode=False)
 
     def handle_action(self):
-        frame = self.get_frame()
-        self.send_frame(frame)
+        self.send_frame()
         
-    def get_frame(self) -> float:
+    def get_frame(self) -> np.ndarray:
         self._communicator.send_message("ACK")
         frame_shape = eval(self._communicator.get_message())
-        frame: np.array = np.zeros(frame_shape)
+        frame: np.array = np.zeros(frame_shape, dtype=np.uint8)
 
         return frame
     
-    def send_frame(self, frame):
-        if self._job_info == None:
-            input_size = sys.getsizeof(torch.tensor(frame).storage())
-            self.init_job_info(input_size)
-
-        self.set_job_info_time()
-        job_info_bytes = pickle.dumps(self._job_info)
-        self._frame_list[self._job_info.job_id] = frame
-
-        self._controller_publisher.publish("job/request_scheduling", job_info_bytes)
-    
     def handle_reward(self):
         self._communicator.send_message(str(self._arrival_rate))
         self._communicator.get_message()
@@ -173,9 +61,6 @@ class Sender(MDC):
         job_info_bytes = pickle.dumps(self._job_info)
         self._controller_publisher.publish("mdc/finish", job_info_bytes)
 
-    
-        
-
 if __name__ == '__main__':
     sub_config = {
             "ip": "127.0.0.1", 
@@ -192,7 +77,9 @@ if __name__ == '__main__':
     
     pub_configs = []
 
-    job_name = "test job 1"
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--job-name", default="test job 1")
+    args = parser.parse_args()
 
-    sender = Sender(sub_config, pub_configs, job_name)
+    sender = Sender(sub_config, pub_configs, args.job_name)
     sender.start()
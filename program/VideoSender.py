@@ -2,142 +2,96 @@ import sys, os
 
 sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
 
-import pickle
 import time
-from threading import Thread
-import paho.mqtt.publish as publish
+import argparse
+from threading import Thread, Lock, Event
 import numpy as np
 import cv2
-import torch
-try:
-    from time import time_ns
-except ImportError:
-    from datetime import datetime
-    # For compatibility with Python 3.6
-    def time_ns():
-        now = datetime.now()
-        return int(now.timestamp() * 1e9)
-
-from utils.utils import get_ip_address
-from program import MDC
-from job import JobInfo, SubtaskInfo, DNNOutput
+
+from utils.video_utils import resize_frame
+from program import FrameSender
 
 TARGET_WIDTH = 320
 TARGET_HEIGHT = 320
 TARGET_DEPTH = 3
 
-KB_PER_BYTE = 1024
-
-
-class VideoSender(MDC):
-    def __init__(self, sub_configs, pub_configs, job_name):
-        self._address = get_ip_address(["eth0", "wlan0"])
-        self._frame = None
-
-        self._job_name = job_name
-        self._job_info = None
-        self._frame_list = dict()
-
-        super().__init__(sub_configs, pub_configs)
+VIDEO_PATH = "video/JN.mp4"
+DEFAULT_FPS = 30
 
-        self.topic_dispatcher["mdc/arrival_rate"] = self.handle_arrival_rate
+# 이 시간 동안 grab한 프레임이 없다면 영상을 읽을 수 없다고 봅니다.
+FRAME_TIMEOUT = 5.0 # sec
 
 
-    def init_job_info(self, input_bytes: float):
-        job_name = self._job_name
-        job_type = self._network_config.get_job_type(job_name)
-        source_ip = self._address
-        terminal_destination = self._network_config.get_job_destination(job_name)
-        start_time = time_ns() # 식별자를 위해서 ns 단위로 설정
+class VideoSender(FrameSender):
+    def __init__(self, sub_configs, pub_configs, job_name, video_path=VIDEO_PATH):
+        self._video_path = video_path
+        self._capture = None
+        self._capture_mutex = Lock()
+        self._frame_grabbed = Event()
 
-        job_info = JobInfo(job_name, job_type, input_bytes, source_ip, terminal_destination, start_time)
+        super().__init__(sub_configs, pub_configs, job_name)
 
-        self._job_info = job_info
+    def open_frame_source(self):
+        """
+        영상을 열고 재생을 시작합니다.
 
-    def handle_subtask_info(self, topic, data, publisher): # overriding
-        subtask_info: SubtaskInfo = pickle.loads(data)
+        Raises:
+            ValueError: 영상 파일이 없거나 열 수 없을 때 발생합니다.
+        """
+        self._capture = cv2.VideoCapture(self._video_path)
 
-        self._job_manager.add_subtask(subtask_info)
+        if not self._capture.isOpened():
+            raise ValueError(f"Cannot open video: {self._video_path}. Pass an existing video with --video.")
 
-        subtask_layer_node = subtask_info.source
+        self.run_camera_streamer()
 
-        if subtask_layer_node.get_ip() == self._address:
-            job_id = subtask_info.job_id
-            input_frame = DNNOutput(torch.tensor(self._frame_list[job_id]).float().view(1, TARGET_DEPTH, TARGET_HEIGHT, TARGET_WIDTH), subtask_info)
-            dnn_output, computing_capacity = self._job_manager.run(input_frame)
-            destination_ip = subtask_info.destination.get_ip()
+    def stream_player(self):
+        """
+        영상을 원래 fps로 재생하되 grab만 하여 프레임을 넘깁니다.
+        전송하지 않는 프레임은 retrieve(색 변환, 복사)와 resize를 하지 않으며, 전송할 프레임만 get_frame에서 꺼냅니다.
+        """
+        fps = self._capture.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
 
-            dnn_output.subtask_info.set_next_source()
+        while True:
+            with self._capture_mutex:
+                grabbed = self._capture.grab()
 
-            dnn_output_bytes = pickle.dumps(dnn_output)
-                
-            # send job to next node
-            publish.single(f"job/{subtask_info.job_type}", dnn_output_bytes, hostname=destination_ip)
+                # 영상이 끝나면 처음부터 다시 재생합니다.
+                if not grabbed:
+                    self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
 
-            self._capacity_manager.update_computing_capacity(computing_capacity)
+            if grabbed:
+                self._frame_grabbed.set()
 
-    def handle_arrival_rate(self, topic, data, publisher):
-        arrival_rate = pickle.loads(data)
+            # grab에 실패해도 기다리므로, 읽을 수 없는 영상에서 CPU를 계속 쓰지 않습니다.
+            time.sleep(1 / fps)
 
-        self._arrival_rate = arrival_rate
+    def get_frame(self) -> np.ndarray:
+        """
+        마지막으로 grab한 프레임을 꺼내 모델 입력 크기로 줄입니다. 꺼내지 못했다면 다음 grab을 기다립니다.
 
-    def stream_player(self):
-        cap = cv2.VideoCapture("video/JN.mp4")
+        Raises:
+            TimeoutError: FRAME_TIMEOUT 동안 꺼낼 수 있는 프레임이 없을 때 발생합니다.
+        """
+        deadline = time.time() + FRAME_TIMEOUT
 
         while True:
-            ret, frame = cap.read()
-            resize_frame = cv2.resize(frame, (320, 320), interpolation=cv2.INTER_CUBIC)
-            self._frame = resize_frame
-            time.sleep(1 / 30)
+            if not self._frame_grabbed.wait(max(deadline - time.time(), 0)):
+                raise TimeoutError(f"No frame from {self._video_path} for {FRAME_TIMEOUT} sec.")
 
-    def start(self):
-        self.wait_until_can_send()
+            with self._capture_mutex:
+                retrieved, frame = self._capture.retrieve()
 
-        input("Press any key to start sending.")
+                if not retrieved:
+                    self._frame_grabbed.clear()
 
-        self.run_camera_streamer()
-        self.run_arrival_rate_getter()
+            if retrieved:
+                return resize_frame(frame, TARGET_WIDTH, TARGET_HEIGHT)
 
-        while True:
-            sleep_time = self.get_sleep_time()
-            time.sleep(sleep_time)
-
-            self.send_frame()
-            
-    def wait_until_can_send(self):
-        print("Waiting for config.")
-        while not (self.check_job_manager_exists() and self.check_network_config_exists()):
-            time.sleep(1.0)
-            
     def run_camera_streamer(self):
         streamer_thread = Thread(target=self.stream_player, args=())
         streamer_thread.start()
 
-    def send_frame(self):
-        current_frame = self._frame
-
-        input_bytes = current_frame.nbytes / KB_PER_BYTE
-        self.init_job_info(input_bytes)
-
-        job_info_bytes = pickle.dumps(self._job_info)
-        self._frame_list[self._job_info.job_id] = current_frame
-
-        self._controller_publisher.publish("job/request_scheduling", job_info_bytes)
-    
-    def arrival_rate_getter(self):
-        node_info_bytes = pickle.dumps(self._node_info)
-        while True:
-            time.sleep(0.1)
-            self._controller_publisher.publish("mdc/arrival_rate", node_info_bytes)
-
-    def run_arrival_rate_getter(self):
-        arrival_rate_thread = Thread(target=self.arrival_rate_getter, args=())
-        arrival_rate_thread.start()
-
-    def get_sleep_time(self) -> float:
-        # implement any frame drop logic
-        return 0.5
-
 if __name__ == '__main__':
     sub_configs = {
             "ip": "127.0.0.1", 
@@ -147,12 +101,16 @@ if __name__ == '__main__':
                 ("job/subtask_info", 1),
                 ("mdc/config", 1),
                 ("mdc/node_info", 1),
+                ("mdc/arrival_rate", 1),
             ],
         }
     
     pub_configs = []
 
-    job_name = "test job 1"
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--job-name", default="test job 1")
+    parser.add_argument("--video", default=VIDEO_PATH)
+    args = parser.parse_args()
 
-    sender = VideoSender(sub_configs, pub_configs, job_name)
+    sender = VideoSender(sub_configs, pub_configs, args.job_name, args.video)
     sender.start()
@@ -1,2 +1,20 @@
+import importlib
+
 from program.Program import Program
-from program.MDC import MDC
\ No newline at end of file
+
+# MDC는 torch가 필요하므로 처음 사용할 때 import합니다. (Controller는 torch를 불러오지 않습니다.)
+_lazy_classes = {
+    "MDC": "program.MDC",
+    "FrameSender": "program.FrameSender",
+}
+
+__all__ = ["Program"] + list(_lazy_classes.keys())
+
+def __getattr__(name):
+    if name in _lazy_classes:
+        # 서브모듈을 import하면 패키지 속성이 서브모듈로 바뀌므로 클래스로 다시 지정합니다.
+        # 따라서 위 클래스들은 "from program.X import X"가 아닌 "from program import X"로 import해야 합니다.
+        globals()[name] = getattr(importlib.import_module(_lazy_classes[name]), name)
+        return globals()[name]
+
+    raise AttributeError(f"module 'program' has no attribute '{name}'")
@@ -1,54 +1,126 @@
 import heapq
-from typing import Dict, List
+import itertools
+from typing import Callable, Dict, List, Tuple
 
 from layeredgraph import LayerNode, LayerNodePair
 
-import random
-
 class Dijkstra:
+    """
+    (노드, 끝낸 stage 수)의 곱 그래프에서 최단 경로를 찾는 스케줄링 알고리즘입니다.
+
+    곱 그래프의 간선은 두 종류입니다.
+        계산: (v, k) -> (v, k + 1). v가 k번째 stage를 실행할 수 있을 때만 존재합니다.
+        전송: (v, k) -> (u, k). u는 v의 이웃이며, k번째 stage 전의 데이터(k = 0이면 입력)를 보냅니다.
+    간선의 가중치는 링크에 쌓인 backlog와 이번 서브태스크의 계산량(GFLOPs) 또는 전송량(KB)을 모두 처리하는 데 걸리는 예상 시간(sec)입니다.
+    (source, 0)에서 (destination, stage 수)까지의 최단 경로가 스케줄링 결과입니다.
+    """
     def __init__(self):
         pass
 
-    def get_path(self, source_node: LayerNode, destination_node: LayerNode, layered_graph, layered_graph_backlog, layer_nodes):
-        distances = {node: float('infinity') for node in layer_nodes}
-        previous_nodes = {node: None for node in layer_nodes}
-        
-        # Set distance for the source node to zero
-        distances[source_node] = 0
-        
-        pq = [(0, source_node)]
+    def get_path(self,
+                 source_node: LayerNode,
+                 destination_node: LayerNode,
+                 layered_graph: Dict[LayerNode, List[LayerNode]],
+                 model_names: List[str],
+                 link_cost: Callable[[LayerNodePair, float], float],
+                 computing: Dict[str, float],
+                 transfer: Dict[str, float],
+                 input_bytes: float) -> List[Tuple[LayerNode, LayerNode, str]]:
+        """
+        Args:
+            source_node (LayerNode): 출발 노드.
+            destination_node (LayerNode): 도착 노드.
+            layered_graph (Dict[LayerNode, List[LayerNode]]): 레이어드 그래프. 자기 자신이 이웃인 노드만 계산할 수 있습니다.
+            model_names (List[str]): 실행 순서대로의 모델(stage) 이름.
+            link_cost (Callable[[LayerNodePair, float], float]): 링크와 서브태스크의 계산량(GFLOPs) 또는 전송량(KB)을 받아,
+                링크의 backlog와 함께 처리하는 데 걸리는 예상 시간(sec)을 반환하는 함수. (LayeredGraph.get_link_cost)
+            computing (Dict[str, float]): 모델 이름과 계산량. (GFLOPs)
+            transfer (Dict[str, float]): 모델 이름과 출력의 전송량. (KB)
+            input_bytes (float): 작업의 입력 크기. (KB)
+
+        Returns:
+            List[Tuple[LayerNode, LayerNode, str]]: (source, destination, model_name) 경로.
+                계산은 실행하는 모델 이름이고, 전송은 마지막으로 실행한 모델 이름(아직 없다면 "")입니다.
+
+        Raises:
+            ValueError: destination에서 모든 stage를 끝낼 수 있는 경로가 없을 때.
+        """
+        num_stages = len(model_names)
+        start = (source_node, 0)
+        target = (destination_node, num_stages)
+
+        distances: Dict[Tuple[LayerNode, int], float] = {start: 0}
+        previous: Dict[Tuple[LayerNode, int], Tuple[Tuple[LayerNode, int], str]] = {}
+
+        # 거리가 같을 때 LayerNode를 비교하지 않도록 순서 번호를 함께 넣습니다.
+        counter = itertools.count()
+        pq = [(0, next(counter), start)]
 
         while pq:
-            current_distance, current_node = heapq.heappop(pq)
+            distance, _, state = heapq.heappop(pq)
 
-            # Stop if the destination is reached
-            if current_node == destination_node:
+            if state == target:
                 break
 
-            # For each neighbor of the current node
-            neighbors = layered_graph[current_node][:]
-            random.shuffle(neighbors)
-            for neighbor in neighbors:
-                neighbor_pair = LayerNodePair(current_node, neighbor)
-                neighbor_pair_str = neighbor_pair
+            if distance > distances[state]:
+                continue
+
+            for next_state, model_name, cost in self._get_edges(state, layered_graph, model_names, link_cost, computing, transfer, input_bytes):
+                next_distance = distance + cost
+
+                if next_distance < distances.get(next_state, float("inf")):
+                    distances[next_state] = next_distance
+                    previous[next_state] = (state, model_name)
+                    heapq.heappush(pq, (next_distance, next(counter), next_state))
 
-                if neighbor_pair_str in layered_graph_backlog:
-                    distance = layered_graph_backlog[neighbor_pair_str]
-                    new_distance = current_distance + distance
+        if target not in distances:
+            raise ValueError(f"No path from {source_node} to {destination_node} runs all stages {model_names}.")
 
-                    # If a shorter path is found
-                    if new_distance < distances[neighbor]:
-                        distances[neighbor] = new_distance
-                        previous_nodes[neighbor] = current_node
-                        heapq.heappush(pq, (new_distance, neighbor))
+        return self._make_path(previous, start, target)
 
-        # Path reconstruction from source to destination
+    def _get_edges(self,
+                   state: Tuple[LayerNode, int],
+                   layered_graph: Dict[LayerNode, List[LayerNode]],
+                   model_names: List[str],
+                   link_cost: Callable[[LayerNodePair, float], float],
+                   computing: Dict[str, float],
+                   transfer: Dict[str, float],
+                   input_bytes: float) -> List[Tuple[Tuple[LayerNode, int], str, float]]:
+        """
+        Returns:
+            List[Tuple[Tuple[LayerNode, int], str, float]]: 다음 상태, 경로에 기록할 모델 이름, 간선의 가중치. (sec)
+        """
+        node, completed = state
+        edges = []
+
+        for neighbor in layered_graph[node]:
+            link = LayerNodePair(node, neighbor)
+
+            if neighbor == node:
+                if completed == len(model_names) or model_names[completed] not in node.get_model_names():
+                    continue
+
+                model_name = model_names[completed]
+                edges.append(((node, completed + 1), model_name, link_cost(link, computing[model_name])))
+            else:
+                model_name = model_names[completed - 1] if completed > 0 else ""
+                data_size = transfer[model_name] if model_name != "" else input_bytes
+                edges.append(((neighbor, completed), model_name, link_cost(link, data_size)))
+
+        return edges
+
+    def _make_path(self,
+                   previous: Dict[Tuple[LayerNode, int], Tuple[Tuple[LayerNode, int], str]],
+                   start: Tuple[LayerNode, int],
+                   target: Tuple[LayerNode, int]) -> List[Tuple[LayerNode, LayerNode, str]]:
         path = []
-        current = destination_node
-        while current is not None and current in previous_nodes:
-            path.append(current)
-            current = previous_nodes[current]
-        path.reverse()  # Reverse the path to start from the source
-
-        # Use the path for scheduling or further processing
-        return path
\ No newline at end of file
+        state = target
+
+        while state != start:
+            previous_state, model_name = previous[state]
+            path.append((previous_state[0], state[0], model_name))
+            state = previous_state
+
+        path.reverse()
+
+        return path
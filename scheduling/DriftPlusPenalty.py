@@ -0,0 +1,92 @@
+from typing import Callable, Dict, List, Tuple
+
+from layeredgraph import LayerNode, LayerNodePair
+from scheduling.Dijkstra import Dijkstra
+
+DEFAULT_V = 0.1 # sec
+
+class DriftPlusPenalty:
+    """
+    링크의 가상 큐(backlog)를 사용하는 Lyapunov drift-plus-penalty 스케줄링 알고리즘입니다.
+
+    작업을 경로에 배치하면 링크 l의 큐 Q_l(sec)에 서비스 시간 a_l(sec)이 더해지므로, 한 time slot의 Lyapunov drift 상한은 Σ Q_l * a_l에 비례합니다.
+    여기에 penalty인 지연 시간 Σ a_l에 V를 곱해 더한 Σ (Q_l + V) * a_l을 최소화하는 경로를 고릅니다.
+    이 값은 링크마다 더해지므로, Dijkstra와 같은 곱 그래프에서 간선의 가중치를 (Q_l + V) * a_l로 두고 최단 경로를 찾으면 됩니다.
+    Q_l과 a_l은 backlog와 작업량(GFLOPs 또는 KB)을 링크의 capacity로 나눈 시간이므로, 계산 링크와 전송 링크를 같은 단위로 비교합니다.
+    Q_l은 작업과 관계없이 링크에 쌓인 전체 backlog(노드가 보고한 backlog 포함)이고, a_l만 작업의 weight를 반영한 서비스 시간입니다.
+
+    V가 작을수록 큐가 짧은 링크로 부하를 나누어 큐를 안정적으로 유지하고(backpressure), V가 클수록 큐를 덜 보고 서비스 시간이 짧은 경로를 고릅니다.
+    큐의 평균 길이는 O(1/V)보다 커지지 않으면서 지연 시간은 최적에 O(V)만큼 가까워집니다.
+
+    Attributes:
+        _v (float): penalty(지연 시간)의 가중치. (sec)
+        _dijkstra (Dijkstra): 곱 그래프에서 최단 경로를 찾는 알고리즘.
+    """
+    def __init__(self, v: float = DEFAULT_V):
+        """
+        Args:
+            v (float): penalty(지연 시간)의 가중치. (sec)
+        """
+        self._check_validate(v)
+
+        self._v: float = v
+        self._dijkstra = Dijkstra()
+
+    def _check_validate(self, v: float):
+        """
+        V가 올바른지 검증합니다.
+        """
+        if v < 0:
+            raise ValueError(f"v must be non-negative, but got {v}")
+
+    def get_v(self) -> float:
+        return self._v
+
+    def set_v(self, v: float) -> None:
+        self._check_validate(v)
+        self._v = v
+
+    def get_path(self,
+                 source_node: LayerNode,
+                 destination_node: LayerNode,
+                 layered_graph: Dict[LayerNode, List[LayerNode]],
+                 model_names: List[str],
+                 link_cost: Callable[[LayerNodePair, float], float],
+                 computing: Dict[str, float],
+                 transfer: Dict[str, float],
+                 input_bytes: float,
+                 queue_cost: Callable[[LayerNodePair], float]) -> List[Tuple[LayerNode, LayerNode, str]]:
+        """
+        Args:
+            source_node (LayerNode): 출발 노드.
+            destination_node (LayerNode): 도착 노드.
+            layered_graph (Dict[LayerNode, List[LayerNode]]): 레이어드 그래프. 자기 자신이 이웃인 노드만 계산할 수 있습니다.
+            model_names (List[str]): 실행 순서대로의 모델(stage) 이름.
+            link_cost (Callable[[LayerNodePair, float], float]): 링크와 서브태스크의 계산량(GFLOPs) 또는 전송량(KB)을 받아,
+                링크의 backlog와 함께 처리하는 데 걸리는 예상 시간(sec)을 반환하는 함수. (LayeredGraph.get_link_cost)
+            computing (Dict[str, float]): 모델 이름과 계산량. (GFLOPs)
+            transfer (Dict[str, float]): 모델 이름과 출력의 전송량. (KB)
+            input_bytes (float): 작업의 입력 크기. (KB)
+            queue_cost (Callable[[LayerNodePair], float]): 링크를 받아, 작업과 관계없이 링크의 전체 backlog를 처리하는 데 걸리는 예상 시간(sec) Q_l을 반환하는 함수.
+                (job_name 없이 부른 LayeredGraph.get_link_cost)
+
+        Returns:
+            List[Tuple[LayerNode, LayerNode, str]]: (source, destination, model_name) 경로.
+
+        Raises:
+            ValueError: destination에서 모든 stage를 끝낼 수 있는 경로가 없을 때.
+        """
+        def drift_plus_penalty(link: LayerNodePair, work: float) -> float:
+            queue = queue_cost(link) # sec
+            service_time = link_cost(link, work) - link_cost(link, 0) # sec
+
+            return (queue + self._v) * service_time
+
+        return self._dijkstra.get_path(source_node,
+                                       destination_node,
+                                       layered_graph,
+                                       model_names,
+                                       drift_plus_penalty,
+                                       computing,
+                                       transfer,
+                                       input_bytes)
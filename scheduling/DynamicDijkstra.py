@@ -0,0 +1,307 @@
+import heapq
+import itertools
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from layeredgraph import LayerNode, LayerNodePair
+
+class DynamicDijkstra:
+    """
+    Dijkstra와 같은 (노드, 끝낸 stage 수) 곱 그래프에서, 출발 노드(또는 tree_key)마다의 최단 경로 트리를 유지하는 스케줄링 알고리즘입니다.
+
+    링크의 backlog나 capacity가 바뀌면 그 링크에 해당하는 곱 그래프 간선들의 가중치만 다시 계산하고,
+    트리를 처음부터 다시 만들지 않고 바뀐 간선의 영향을 받는 부분만 고칩니다. (Ramalingam-Reps 방식)
+        가중치가 늘어난 트리 간선: 그 간선 아래의 서브트리를 영향받은 상태로 보고 거리를 지운 뒤,
+            영향받지 않은 상태에서 들어오는 간선으로 다시 거리를 정합니다.
+        가중치가 줄어든 간선: 그 간선으로 거리가 줄어드는 상태부터 거리를 줄여 나갑니다.
+    두 경우 모두 거리가 바뀐 상태들에서만 Dijkstra를 이어서 실행하므로, 경로는 parent를 따라가 경로 길이만큼의 시간에 읽을 수 있습니다.
+
+    Attributes:
+        _layered_graph (Optional[Dict[LayerNode, List[LayerNode]]]): 곱 그래프를 만든 레이어드 그래프.
+        _model_names (Optional[List[str]]): 곱 그래프를 만든 모델(stage) 이름.
+        _edges (List[Tuple[Tuple[LayerNode, int], Tuple[LayerNode, int], str, LayerNodePair, Optional[float]]]):
+            곱 그래프 간선마다의 (출발 상태, 도착 상태, 모델 이름, 링크, 계산량(GFLOPs) 또는 전송량(KB)). 입력을 보내는 간선의 양은 None이며, 작업의 입력 크기를 사용합니다.
+        _out_edges (Dict[Tuple[LayerNode, int], List[int]]): 상태에서 나가는 간선 번호들.
+        _in_edges (Dict[Tuple[LayerNode, int], List[int]]): 상태로 들어오는 간선 번호들.
+        _link_edges (Dict[LayerNodePair, List[int]]): 링크에 해당하는 간선 번호들.
+        _input_edges (List[int]): 입력을 보내는 간선 번호들.
+        _weights (Dict[Hashable, List[float]]): 트리마다, 간선 번호별 가중치. (sec)
+        _distances (Dict[Hashable, Dict[Tuple[LayerNode, int], float]]): 트리마다, 상태까지의 최단 거리. (sec)
+        _parents (Dict[Hashable, Dict[Tuple[LayerNode, int], int]]): 트리마다, 상태로 들어오는 최단 경로 트리의 간선 번호.
+        _children (Dict[Hashable, Dict[Tuple[LayerNode, int], Set[Tuple[LayerNode, int]]]]): 트리마다, 최단 경로 트리에서 상태의 자식 상태들.
+        _input_bytes (Dict[Hashable, float]): 트리마다, 트리의 가중치를 계산한 작업의 입력 크기. (KB)
+        _changed_links (Dict[Hashable, Set[LayerNodePair]]): 트리마다, 트리를 마지막으로 고친 뒤 가중치가 바뀐 링크들.
+    """
+    def __init__(self):
+        self._layered_graph: Optional[Dict[LayerNode, List[LayerNode]]] = None
+        self._model_names: Optional[List[str]] = None
+
+        self._edges: List[Tuple[Tuple[LayerNode, int], Tuple[LayerNode, int], str, LayerNodePair, Optional[float]]] = []
+        self._out_edges: Dict[Tuple[LayerNode, int], List[int]] = {}
+        self._in_edges: Dict[Tuple[LayerNode, int], List[int]] = {}
+        self._link_edges: Dict[LayerNodePair, List[int]] = {}
+        self._input_edges: List[int] = []
+
+        self._weights: Dict[Hashable, List[float]] = {}
+        self._distances: Dict[Hashable, Dict[Tuple[LayerNode, int], float]] = {}
+        self._parents: Dict[Hashable, Dict[Tuple[LayerNode, int], int]] = {}
+        self._children: Dict[Hashable, Dict[Tuple[LayerNode, int], Set[Tuple[LayerNode, int]]]] = {}
+        self._input_bytes: Dict[Hashable, float] = {}
+        self._changed_links: Dict[Hashable, Set[LayerNodePair]] = {}
+
+    def get_path(self,
+                 source_node: LayerNode,
+                 destination_node: LayerNode,
+                 layered_graph: Dict[LayerNode, List[LayerNode]],
+                 model_names: List[str],
+                 link_cost: Callable[[LayerNodePair, float], float],
+                 computing: Dict[str, float],
+                 transfer: Dict[str, float],
+                 input_bytes: float,
+                 changed_links: Iterable[LayerNodePair] = (),
+                 tree_key: Optional[Hashable] = None) -> List[Tuple[LayerNode, LayerNode, str]]:
+        """
+        Args:
+            source_node (LayerNode): 출발 노드.
+            destination_node (LayerNode): 도착 노드.
+            layered_graph (Dict[LayerNode, List[LayerNode]]): 레이어드 그래프. 자기 자신이 이웃인 노드만 계산할 수 있습니다.
+            model_names (List[str]): 실행 순서대로의 모델(stage) 이름.
+            link_cost (Callable[[LayerNodePair, float], float]): 링크와 서브태스크의 계산량(GFLOPs) 또는 전송량(KB)을 받아,
+                링크의 backlog와 함께 처리하는 데 걸리는 예상 시간(sec)을 반환하는 함수. (LayeredGraph.get_link_cost)
+            computing (Dict[str, float]): 모델 이름과 계산량. (GFLOPs)
+            transfer (Dict[str, float]): 모델 이름과 출력의 전송량. (KB)
+            input_bytes (float): 작업의 입력 크기. (KB)
+            changed_links (Iterable[LayerNodePair]): 지난 호출 뒤 backlog나 capacity가 바뀐 링크들.
+            tree_key (Optional[Hashable]): 최단 경로 트리를 구분하는 키. 작업마다 link_cost가 다르다면 (출발 노드, 작업 이름)처럼 작업을 포함해야 합니다.
+                None이라면 출발 노드를 사용합니다.
+
+        Returns:
+            List[Tuple[LayerNode, LayerNode, str]]: (source, destination, model_name) 경로.
+                계산은 실행하는 모델 이름이고, 전송은 마지막으로 실행한 모델 이름(아직 없다면 "")입니다.
+
+        Raises:
+            ValueError: destination에서 모든 stage를 끝낼 수 있는 경로가 없을 때.
+        """
+        if layered_graph is not self._layered_graph or model_names != self._model_names:
+            self._build_graph(layered_graph, model_names, computing, transfer)
+
+        changed_links = list(changed_links)
+        for pending_links in self._changed_links.values():
+            pending_links.update(changed_links)
+
+        if tree_key is None:
+            tree_key = source_node
+
+        if tree_key not in self._distances:
+            self._build_tree(tree_key, source_node, link_cost, input_bytes)
+        else:
+            self._repair_tree(tree_key, link_cost, input_bytes)
+
+        target = (destination_node, len(model_names))
+
+        if target not in self._distances[tree_key]:
+            raise ValueError(f"No path from {source_node} to {destination_node} runs all stages {model_names}.")
+
+        return self._make_path(tree_key, target)
+
+    def _build_graph(self,
+                     layered_graph: Dict[LayerNode, List[LayerNode]],
+                     model_names: List[str],
+                     computing: Dict[str, float],
+                     transfer: Dict[str, float]):
+        """
+        곱 그래프의 간선들을 만들고, 트리를 모두 버립니다.
+        """
+        self._layered_graph = layered_graph
+        self._model_names = list(model_names)
+
+        self._edges = []
+        self._out_edges = {}
+        self._in_edges = {}
+        self._link_edges = {}
+        self._input_edges = []
+
+        for node, neighbors in layered_graph.items():
+            for completed in range(len(model_names) + 1):
+                for neighbor in neighbors:
+                    link = LayerNodePair(node, neighbor)
+
+                    if neighbor == node:
+                        if completed == len(model_names) or model_names[completed] not in node.get_model_names():
+                            continue
+
+                        model_name = model_names[completed]
+                        self._add_edge((node, completed), (node, completed + 1), model_name, link, computing[model_name])
+                    else:
+                        model_name = model_names[completed - 1] if completed > 0 else ""
+                        self._add_edge((node, completed), (neighbor, completed), model_name, link, transfer[model_name] if model_name != "" else None)
+
+        self._weights = {}
+        self._distances = {}
+        self._parents = {}
+        self._children = {}
+        self._input_bytes = {}
+        self._changed_links = {}
+
+    def _add_edge(self, state: Tuple[LayerNode, int], next_state: Tuple[LayerNode, int], model_name: str, link: LayerNodePair, work: Optional[float]):
+        edge = len(self._edges)
+        self._edges.append((state, next_state, model_name, link, work))
+        self._out_edges.setdefault(state, []).append(edge)
+        self._in_edges.setdefault(next_state, []).append(edge)
+        self._link_edges.setdefault(link, []).append(edge)
+
+        if work is None:
+            self._input_edges.append(edge)
+
+    def _get_weight(self, edge: int, link_cost: Callable[[LayerNodePair, float], float], input_bytes: float) -> float:
+        _, _, _, link, work = self._edges[edge]
+        return link_cost(link, input_bytes if work is None else work)
+
+    def _build_tree(self, tree_key: Hashable, source_node: LayerNode, link_cost: Callable[[LayerNodePair, float], float], input_bytes: float):
+        """
+        source_node에서 시작하는 최단 경로 트리를 처음부터 만듭니다.
+        """
+        start = (source_node, 0)
+
+        self._weights[tree_key] = [self._get_weight(edge, link_cost, input_bytes) for edge in range(len(self._edges))]
+        self._distances[tree_key] = {start: 0}
+        self._parents[tree_key] = {}
+        self._children[tree_key] = {}
+        self._input_bytes[tree_key] = input_bytes
+        self._changed_links[tree_key] = set()
+
+        self._propagate(tree_key, [start])
+
+    def _repair_tree(self, tree_key: Hashable, link_cost: Callable[[LayerNodePair, float], float], input_bytes: float):
+        """
+        트리를 마지막으로 고친 뒤 가중치가 바뀐 간선들의 영향을 받는 부분만 고칩니다.
+        """
+        changed_edges = set()
+        for link in self._changed_links[tree_key]:
+            changed_edges.update(self._link_edges.get(link, []))
+        self._changed_links[tree_key].clear()
+
+        if input_bytes != self._input_bytes[tree_key]:
+            changed_edges.update(self._input_edges)
+            self._input_bytes[tree_key] = input_bytes
+
+        weights = self._weights[tree_key]
+        distances = self._distances[tree_key]
+        parents = self._parents[tree_key]
+
+        increased_edges = []
+        decreased_edges = []
+
+        for edge in changed_edges:
+            weight = self._get_weight(edge, link_cost, input_bytes)
+
+            if weight > weights[edge]:
+                increased_edges.append(edge)
+            elif weight < weights[edge]:
+                decreased_edges.append(edge)
+
+            weights[edge] = weight
+
+        # 가중치가 늘어난 트리 간선 아래의 서브트리는 거리가 늘어날 수 있으므로 거리를 지웁니다.
+        affected_states = set()
+        stack = [self._edges[edge][1] for edge in increased_edges if parents.get(self._edges[edge][1]) == edge]
+
+        while stack:
+            state = stack.pop()
+
+            if state in affected_states:
+                continue
+
+            affected_states.add(state)
+            stack.extend(self._children[tree_key].get(state, ()))
+
+        for state in affected_states:
+            distances.pop(state, None)
+            self._set_parent(tree_key, state, None)
+
+        updated_states = []
+
+        # 영향받은 상태는 영향받지 않은 상태에서 들어오는 간선 중 가장 짧은 것으로 거리를 다시 정합니다.
+        for state in affected_states:
+            for edge in self._in_edges.get(state, []):
+                previous_state = self._edges[edge][0]
+
+                if previous_state in affected_states or previous_state not in distances:
+                    continue
+
+                if self._relax(tree_key, edge):
+                    updated_states.append(state)
+
+        # 가중치가 줄어든 간선으로 거리가 줄어드는 상태를 찾습니다.
+        for edge in decreased_edges:
+            previous_state = self._edges[edge][0]
+
+            if previous_state in affected_states or previous_state not in distances:
+                continue
+
+            if self._relax(tree_key, edge):
+                updated_states.append(self._edges[edge][1])
+
+        self._propagate(tree_key, updated_states)
+
+    def _relax(self, tree_key: Hashable, edge: int) -> bool:
+        """
+        간선으로 도착 상태의 거리가 줄어든다면 거리와 parent를 바꾸고 True를 반환합니다.
+        """
+        state, next_state, _, _, _ = self._edges[edge]
+        distances = self._distances[tree_key]
+        next_distance = distances[state] + self._weights[tree_key][edge]
+
+        if next_distance < distances.get(next_state, float("inf")):
+            distances[next_state] = next_distance
+            self._set_parent(tree_key, next_state, edge)
+            return True
+
+        return False
+
+    def _propagate(self, tree_key: Hashable, states: List[Tuple[LayerNode, int]]):
+        """
+        거리가 바뀐 상태들에서 Dijkstra를 이어서 실행합니다.
+        """
+        distances = self._distances[tree_key]
+
+        # 거리가 같을 때 LayerNode를 비교하지 않도록 순서 번호를 함께 넣습니다.
+        counter = itertools.count()
+        pq = [(distances[state], next(counter), state) for state in set(states)]
+        heapq.heapify(pq)
+
+        while pq:
+            distance, _, state = heapq.heappop(pq)
+
+            if distance > distances[state]:
+                continue
+
+            for edge in self._out_edges.get(state, []):
+                if self._relax(tree_key, edge):
+                    next_state = self._edges[edge][1]
+                    heapq.heappush(pq, (distances[next_state], next(counter), next_state))
+
+    def _set_parent(self, tree_key: Hashable, state: Tuple[LayerNode, int], edge: Optional[int]):
+        parents = self._parents[tree_key]
+        children = self._children[tree_key]
+
+        if state in parents:
+            children[self._edges[parents[state]][0]].discard(state)
+            del parents[state]
+
+        if edge is not None:
+            parents[state] = edge
+            children.setdefault(self._edges[edge][0], set()).add(state)
+
+    def _make_path(self, tree_key: Hashable, target: Tuple[LayerNode, int]) -> List[Tuple[LayerNode, LayerNode, str]]:
+        parents = self._parents[tree_key]
+        path = []
+        state = target
+
+        while state in parents:
+            previous_state, _, model_name, _, _ = self._edges[parents[state]]
+            path.append((previous_state[0], state[0], model_name))
+            state = previous_state
+
+        path.reverse()
+
+        return path
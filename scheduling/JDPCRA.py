@@ -1,49 +1,86 @@
-import heapq
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
-from layeredgraph import LayerNode, LayerNodePair
+from layeredgraph import LayerNode
 import numpy as np
-import random, math
-from latencymodel.JDPCRA import cal_total_latency
+from latencymodel.JDPCRA import cal_total_latencies
 
 class JDPCRA:
     def __init__(self):
         pass
 
-    def get_path(self, source_node: LayerNode, destination_node: LayerNode, layered_graph, computing_ratios, transfer_ratios, arrival_rate, network_info, input_size):
+    def get_path(self, source_node: LayerNode, destination_node: LayerNode, layered_graph, model_names, computing_ratios, transfer_ratios, arrival_rate, network_info, input_size):
+        """
+        end(source)에서 edge로 입력을 보내고, edge가 앞의 partition_point개 stage를, destination(cloud)이 나머지 stage를 실행하는 경로를 반환합니다.
+
+        Args:
+            model_names (List[str]): 실행 순서대로의 모델(stage) 이름.
+            computing_ratios (List[float]): stage마다의 계산량 비율.
+            transfer_ratios (List[float]): 분할 지점마다 edge가 cloud로 보내는 데이터의 입력 대비 비율. 0번은 입력 그대로입니다.
+
+        Raises:
+            ValueError: 계산량 비율이나 전송 비율의 길이가 stage 수와 다를 때.
+        """
+        self._check_validate(model_names, computing_ratios, transfer_ratios)
+
         edge_computing_resource = network_info[0]["edge"]
-        computing_order, transfer_order = self._cal_order(computing_ratios, transfer_ratios, arrival_rate)
-        partition_point = self._init_BS(computing_ratios, computing_order, transfer_order, arrival_rate, edge_computing_resource)
-        partition_point = self._Ad_BS(computing_ratios, computing_order, arrival_rate, edge_computing_resource, partition_point)
+        prefix_ratios = self._get_prefix_ratios(computing_ratios)
+        computing_order, transfer_order = self._cal_order(prefix_ratios, transfer_ratios, arrival_rate)
+        partition_point = self._init_BS(prefix_ratios, computing_order, transfer_order, arrival_rate, edge_computing_resource)
+        partition_point = self._Ad_BS(prefix_ratios, computing_order, arrival_rate, edge_computing_resource, partition_point)
         
         partition_point = self._joint_adjust(computing_ratios, transfer_ratios, arrival_rate, network_info, partition_point, input_size)
-        path = self._make_path(source_node, destination_node, layered_graph, partition_point)
+        path = self._make_path(source_node, destination_node, layered_graph, model_names, partition_point)
         
         return path
+
+    def _check_validate(self, model_names, computing_ratios, transfer_ratios):
+        """
+        stage마다의 계산량 비율과 분할 지점(0 ~ stage 수 - 1)마다의 전송 비율이 stage 수만큼 있는지 검증합니다.
+        cal_total_latencies는 길이가 달라도 잘라서 계산하므로, 일부 stage가 빠진 분할을 고르지 않도록 먼저 확인합니다.
+        """
+        if len(computing_ratios) != len(model_names):
+            raise ValueError(f"Invalid computing_ratios: {len(computing_ratios)} values for {len(model_names)} stages.")
+
+        if len(transfer_ratios) != len(model_names):
+            raise ValueError(f"Invalid transfer_ratios: {len(transfer_ratios)} values for {len(model_names)} stages.")
+
+    def get_partition_points(self, computing_ratios, transfer_ratios, arrival_rates, network_info, input_size) -> np.ndarray:
+        """
+        여러 arrival rate마다 안정적인 분할 지점 중 total latency가 가장 작은 것을 한 번의 벡터 연산으로 찾습니다.
+
+        Returns:
+            np.ndarray: arrival rate마다의 분할 지점. 안정적인 분할 지점이 없다면 -1입니다.
+        """
+        total_latencies, stability_mask = cal_total_latencies(arrival_rates, computing_ratios, transfer_ratios, input_size, network_info)
+        total_latencies = np.where(stability_mask, total_latencies, np.inf)
+        
+        return np.where(stability_mask.any(axis=1), np.argmin(total_latencies, axis=1), -1)
+    
     
+    def _get_prefix_ratios(self, computing_ratios) -> np.ndarray:
+        """
+        분할 지점 s마다 edge가 실행하는 계산량 비율 sum(computing_ratios[:s])입니다. 크기는 len(computing_ratios) + 1입니다.
+        """
+        return np.concatenate(([0.0], np.cumsum(computing_ratios)))
     
-    def _init_BS(self, computing_ratios, computing_order, transfer_order, arrival_rate, edge_computing_resource):
+    
+    def _init_BS(self, prefix_ratios, computing_order, transfer_order, arrival_rate, edge_computing_resource):
         summed_ratios = np.add(computing_order, transfer_order)
-        partition_point = np.argmin(summed_ratios)
-        computing_ratio = sum(computing_ratios[:partition_point])
-        computing_requirement = arrival_rate * computing_ratio
+        partition_point = int(np.argmin(summed_ratios))
+        computing_requirement = arrival_rate * prefix_ratios[partition_point]
         
-        while edge_computing_resource < computing_requirement:
-            temp_partition_point = partition_point
-            if computing_order[partition_point] >= 1:
-                partition_point = computing_order.index(computing_order[partition_point]-1)
-                computing_ratio = sum(computing_ratios[:temp_partition_point])
-            
-            computing_requirement = arrival_rate * computing_ratio
+        # 더 작은 분할 지점이 없다면 edge의 자원이 부족하더라도 멈춥니다.
+        while edge_computing_resource < computing_requirement and computing_order[partition_point] >= 1:
+            partition_point = computing_order.index(computing_order[partition_point]-1)
+            computing_requirement = arrival_rate * prefix_ratios[partition_point]
         
         return partition_point
     
     
-    def _Ad_BS(self, computing_ratios, computing_order, arrival_rate, edge_computing_resource, partition_point):
+    def _Ad_BS(self, prefix_ratios, computing_order, arrival_rate, edge_computing_resource, partition_point):
         if computing_order[partition_point] >= 1:
             temp_partition_point = computing_order.index(computing_order[partition_point]-1)
-            computing_ratio = sum(computing_ratios[:temp_partition_point])
-            computing_requirement = arrival_rate * computing_ratio
+            computing_requirement = arrival_rate * prefix_ratios[temp_partition_point]
             
             if edge_computing_resource < computing_requirement:
                 partition_point = temp_partition_point
@@ -52,101 +89,63 @@ class JDPCRA:
     
     
     def _joint_adjust(self, computing_ratios, transfer_ratios, arrival_rate, network_info, partition_point, input_size):
-        task_requirements = self._make_requirement(computing_ratios, transfer_ratios, partition_point, input_size, arrival_rate)
-        min_t, stability_info = cal_total_latency(arrival_rate, task_requirements, network_info)
+        total_latencies, stability_mask = cal_total_latencies([arrival_rate], computing_ratios, transfer_ratios, input_size, network_info)
+        total_latencies, stability_mask = total_latencies[0], stability_mask[0]
         
-        for s in range(len(computing_ratios)):  # len: 5. range(5): [0, 1, 2, 3, 4]
-            temp_task_requirements = self._make_requirement(computing_ratios, transfer_ratios, s, input_size, arrival_rate)
-            temp_t, temp_stability_info = cal_total_latency(arrival_rate, temp_task_requirements, network_info)
-            if temp_stability_info[0] <= 1 and temp_stability_info[1] <= 1:
-                if temp_t < min_t:
-                    partition_point = s
-                    min_t = temp_t        
+        # 안정적이면서 현재 분할 지점보다 total latency가 작은 분할 지점 중 가장 작은 것을 고릅니다.
+        candidates = np.flatnonzero(stability_mask & (total_latencies < total_latencies[partition_point]))
+        if len(candidates) > 0:
+            partition_point = int(candidates[np.argmin(total_latencies[candidates])])
         
         return partition_point
 
 
-    def _cal_order(self, computing_ratios, transfer_ratios, arrival_rate):
-        computing_ratios_per_partition_point = []
-        for s in range(len(computing_ratios)):
-            computing_ratios_per_partition_point.append(arrival_rate * sum(computing_ratios[: s]))
+    def _cal_order(self, prefix_ratios, transfer_ratios, arrival_rate):
+        computing_ratios_per_partition_point = arrival_rate * prefix_ratios[:len(transfer_ratios)]
         
         computing_order = np.argsort(computing_ratios_per_partition_point).tolist()
         transfer_order = np.argsort(transfer_ratios).tolist()
         
         return computing_order, transfer_order
-
-    
-    def _make_requirement(self, computing_ratios, transfer_ratios, partition_point, input_size, arrival_rate):
-        computing_requirements = {
-            'end': 0,
-            'edge': arrival_rate * sum(computing_ratios[:partition_point]),
-            'cloud': arrival_rate * sum(computing_ratios[partition_point:])
-        }
-        transfer_requirements = {
-            'end': input_size * arrival_rate,
-            'edge': input_size * arrival_rate * transfer_ratios[partition_point], 
-            'cloud': 0
-        }
-        
-        return (computing_requirements, transfer_requirements)
     
     
-    def _make_path(self, source_node, destination_node, layered_graph, partition_point):
-        
-        path = []
-        path.append(source_node)
-        neighbors = layered_graph[source_node][:]
-        sorted_neighbors = sorted(neighbors, key=lambda neighbor: neighbor.get_layer())
-        
-        # end -> edge
-        for node in sorted_neighbors:
-            if not source_node.is_same_node(node):
-                path.append(node)
+    def _make_path(self, source_node: LayerNode, destination_node: LayerNode, layered_graph: Dict[LayerNode, List[LayerNode]], model_names: List[str], partition_point: int) -> List[Tuple[LayerNode, LayerNode, str]]:
+        """
+        source의 이웃 중 앞의 partition_point개 stage를 실행할 수 있고 destination으로 보낼 수 있는 첫 번째 노드(IP 순서)를 edge로 사용합니다.
+
+        Raises:
+            ValueError: 그런 edge 노드가 없거나, destination이 나머지 stage를 실행할 수 없을 때.
+        """
+        edge_models = model_names[:partition_point]
+        cloud_models = model_names[partition_point:]
+
+        if not set(cloud_models) <= set(destination_node.get_model_names()):
+            raise ValueError(f"{destination_node} cannot run stages {cloud_models}.")
+
+        edge_node = None
+        for node in sorted(layered_graph.get(source_node, [])):
+            if (not source_node.is_same_node(node)
+                and set(edge_models) <= set(node.get_model_names())
+                and (node.is_same_node(destination_node) or destination_node in layered_graph.get(node, []))):
+                edge_node = node
                 break
-        
-        edge_top_node = node
-        neighbors = layered_graph[edge_top_node][:]
-        sorted_neighbors = sorted(neighbors, key=lambda neighbor: neighbor.get_layer())
-        
-        count = 0
-        # for node in sorted_neighbors:
-        #     if count >= partition_point:
-        #         break 
-            
-        #     if edge_top_node.is_same_node(node):
-        #         print("edge node", node, end=", ")
-        #         path.append(node)
-        #         count += 1
-        while count < partition_point:
-            neighbors = layered_graph[path[-1]][:]
-            sorted_neighbors = sorted(neighbors, key=lambda neighbor: neighbor.get_layer())
-            for node in sorted_neighbors:
-                if edge_top_node.is_same_node(node):
-                    path.append(node)
-                    count += 1
-
-                    break
-        
-        edge_last_node = path[-1]
-        neighbors = layered_graph[edge_last_node][:]
-        sorted_neighbors = sorted(neighbors, key=lambda neighbor: neighbor.get_layer())
-        
-        for node in sorted_neighbors:
-            if not source_node.is_same_node(node):
-                path.append(node)
-                break 
-        
-        cloud_node = path[-1]
-        cloud_layer = cloud_node.get_layer()
-        neighbors = layered_graph[cloud_node][:]
-        sorted_neighbors = sorted(neighbors, key=lambda neighbor: neighbor.get_layer())
-        
-        while not destination_node.is_same_layer_node(path[-1]):
-            neighbors = layered_graph[path[-1]][:]
 
-            for node in neighbors:
-                if destination_node.is_same_node(node) and cloud_layer < node.get_layer():
-                    path.append(node)
+        if edge_node is None:
+            raise ValueError(f"No edge node between {source_node} and {destination_node} runs stages {edge_models}.")
+
+        # end -> edge
+        path = [(source_node, edge_node, "")]
+
+        # edge
+        for model_name in edge_models:
+            path.append((edge_node, edge_node, model_name))
+
+        # edge -> cloud
+        if not edge_node.is_same_node(destination_node):
+            path.append((edge_node, destination_node, edge_models[-1] if edge_models else ""))
+
+        # cloud
+        for model_name in cloud_models:
+            path.append((destination_node, destination_node, model_name))
         
-        return path
\ No newline at end of file
+        return path
@@ -7,7 +7,7 @@ class RandomSelection:
     def __init__(self):
         pass
 
-    def get_path(self, source_node: LayerNode, destination_node: LayerNode, layered_graph: Dict[LayerNode, List[LayerNode]]):
+    def get_path(self, source_node: LayerNode, destination_node: LayerNode, layered_graph: Dict[LayerNode, List[LayerNode]], model_names: List[str] = None):
         """
         랜덤 선택 알고리즘을 구현한 클래스입니다.
 
@@ -15,6 +15,8 @@ class RandomSelection:
             source_node (LayerNode): 출발 노드
             destination_node (LayerNode): 도착 노드
             layered_graph (Dict[LayerNode, List[LayerNode]]): 레이어드 그래프
+            model_names (List[str]): 실행 순서대로의 모델(stage) 이름. 주어지면 다음 순서의 모델만 선택합니다.
+                None이라면 노드의 모델 중 사용하지 않은 모델을 순서 없이 선택합니다.
 
         Returns:
             List[LayerNode, LayerNode, str]: 경로
@@ -31,13 +33,17 @@ class RandomSelection:
         current_node = source_node
 
         while True:
-            neighbor_list = layered_graph[current_node]
-            if current_node in neighbor_list:
-                neighbor_list.remove(current_node)
+            # 레이어드 그래프를 바꾸지 않도록 자기 자신을 뺀 이웃 목록을 새로 만듭니다.
+            neighbor_list = [neighbor for neighbor in layered_graph[current_node] if neighbor != current_node]
             
             # 사용하지 않은 모델 리스트
             not_visited_model_names = [model_name for model_name in current_node.get_model_names() if model_name not in visited_models]
 
+            # 서브모듈 구간으로 나눈 stage는 순서대로 실행해야 하므로 다음 stage만 선택할 수 있습니다.
+            if model_names is not None:
+                next_model_names = model_names[len(visited_models):len(visited_models) + 1]
+                not_visited_model_names = [model_name for model_name in not_visited_model_names if model_name in next_model_names]
+
             # 사용하지 않은 모델이 없다면 다음 노드로 이동
             # 다음 노드가 없는 마지막 노드라면 종료.
             if len(not_visited_model_names) == 0 and current_node == destination_node:
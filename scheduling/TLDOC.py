@@ -1,10 +1,8 @@
-import heapq
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
-from layeredgraph import LayerNode, LayerNodePair
+from layeredgraph import LayerNode
 import numpy as np
-import random, math
-from latencymodel.TLDOC import cal_total_latency, cal_total_latency_except_end
+from latencymodel.TLDOC import cal_total_latencies, cal_total_latencies_except_end
 
 class TLDOC:
     def __init__(self):
@@ -12,72 +10,74 @@ class TLDOC:
 
     def set_t_wait(self, t_wait):
         self._t_wait = t_wait
+
+    def set_transfer_ratios(self, transfer_ratios):
+        self._transfer_ratios = transfer_ratios
     
-    def init_parameter(self, time_config, energy_config, idle_power, transfer_ratios, scale=0.5, V=1.0, latency_allowed=25, default_rate=0.1):
+    def init_parameter(self, time_config, energy_config, idle_power, transfer_ratios, V=1.0, latency_allowed=25, default_rate=0.1):
         """ config shape 
         time_config = {'end': List[각 레이어의 실행시간], 'edge': List[각 레이어의 실행시간], 'cloud': List[각 레이어의 실행시간]}
         energy_config = {'end': List[각 레이어의 소모에너지], 'end_to_edge': List[각 레이어 output을 end -> edge로 전송할 때 소모에너지]}
+        실행시간과 소모에너지는 한 번만 누적합(앞에 0을 붙인 것)으로 바꾸어 두고, 분할마다의 합을 상수 시간에 구합니다.
+        레이어는 stage와 같으며(LayeredGraph.load_config가 프로파일을 stage에 맞춥니다), transfer_ratios는 분할 지점마다 하나씩 stage 수 + 1개입니다.
+
+        Raises:
+            ValueError: config의 길이가 stage 수와 다를 때 발생합니다.
         """
+        self._check_validate(time_config, energy_config, transfer_ratios)
+
         #! check: hyperparameters
-        self._scale = scale
         self._V = V
         self._latency_allowed = latency_allowed
         self._default_rate = default_rate
-        self._epoch = 10
         self._queue = 0
         self._time_config = time_config
         self._energy_config = energy_config 
         self._idle_power = idle_power       #가능?
         self._transfer_ratios = transfer_ratios
 
-    def get_path(self, source_node: LayerNode, destination_node: LayerNode, layered_graph, arrival_rate, network_info, input_size):
+        self._time_prefix = {tier: np.concatenate(([0.0], np.cumsum(times))) for tier, times in time_config.items()}
+        self._end_energy_prefix = np.concatenate(([0.0], np.cumsum(energy_config['end'])))
+        self._end_to_edge_energy = np.asarray(energy_config['end_to_edge'], dtype=float)
+
+    def _check_validate(self, time_config, energy_config, transfer_ratios):
+        """
+        tier마다의 실행시간, 소모에너지와 분할 지점마다의 전송 에너지가 stage 수만큼 있는지 검증합니다.
+        분할 지점은 0 ~ stage 수 - 1이므로, 길이가 다르면 일부 stage의 시간이 빠지거나 인덱스를 벗어납니다.
+        """
+        stage_count = len(transfer_ratios) - 1
+
+        for config_name, config in [("time_config", time_config), ("energy_config", energy_config)]:
+            for tier, values in config.items():
+                if len(values) != stage_count:
+                    raise ValueError(f"Invalid {config_name}['{tier}']: {len(values)} values for {stage_count} stages. Map the layer profile to the stages first.")
+
+    def get_path(self, source_node: LayerNode, destination_node: LayerNode, layered_graph, model_names, arrival_rate, network_info, input_size):
         data_size_list = [ input_size * arrival_rate * ratio for ratio in self._transfer_ratios ] #! check: index 확인 
         max_layer = len(self._transfer_ratios) - 2  # 4개
         off_tensor = self._lp_offloading(max_layer, network_info, data_size_list)
         partition_point_1, partition_point_2 = off_tensor[0], off_tensor[0]+off_tensor[1]
-        path = self._make_path(source_node, destination_node, layered_graph, partition_point_1, partition_point_2)
+        path = self._make_path(source_node, destination_node, layered_graph, model_names, partition_point_1, partition_point_2)
         return path
     
     
     def _lp_offloading(self, max_layer, network_info, data_size_list):
-        off_tensor = self._create_init_tensor(max_layer)
-        count = 0
-        for i in range(self._epoch):
-            temp_off_tensor = self._create_new_off_tensor(off_tensor, network_info)
-            temp_cost, _ = self._objective(temp_off_tensor, network_info, data_size_list)
-            cost, _ = self._objective(off_tensor, network_info, data_size_list)
-            delta = temp_cost - cost
-            if delta < 0:
-                off_tensor = temp_off_tensor
-            else:
-                count += 1
-            
-            if count >= 2:
-                break
+        """
+        0 <= partition_point_1 <= partition_point_2 <= max_layer인 모든 (end, edge, cloud) 분할의 cost를 한 번에 계산하고, cost가 가장 작은 분할을 반환합니다.
+        """
+        partition_points_1, partition_points_2 = np.triu_indices(max_layer + 1)
+        cost, actual_rate = self._objective(partition_points_1, partition_points_2, network_info, data_size_list)
+        best = int(np.argmin(cost))
         
-        _, actual_rate = self._objective(off_tensor, network_info, data_size_list)
-        self._queue = self._cal_queue(actual_rate)
+        self._queue = self._cal_queue(actual_rate[best])
+        partition_point_1, partition_point_2 = int(partition_points_1[best]), int(partition_points_2[best])
+        off_tensor = [partition_point_1, partition_point_2 - partition_point_1, max_layer - partition_point_2]
         return off_tensor
-
-
-    def _create_new_off_tensor(self, off_tensor, network_info):
-        edge_resource = network_info[0]['edge']
-        cloud_resource = network_info[0]['cloud']
-        total_resource = edge_resource + cloud_resource
-        
-        A_end = off_tensor[0]
-        delta = int(A_end * self._scale)
-        A_end -= delta
-        A_edge = off_tensor[1] + int(delta * (edge_resource / total_resource))
-        A_cloud = off_tensor[2] + int(delta * (cloud_resource / total_resource))
-        
-        new_off_tensor = [A_end, A_edge, A_cloud]
-        return new_off_tensor
     
     
-    def _objective(self, off_tensor, network_info, data_size_list):
-        actual_rate = self._get_violation_rate(off_tensor, network_info, data_size_list)
-        total_energy = self._cal_total_energy(off_tensor, network_info, data_size_list)
+    def _objective(self, partition_points_1, partition_points_2, network_info, data_size_list):
+        actual_rate = self._get_violation_rate(partition_points_1, partition_points_2, network_info, data_size_list)
+        total_energy = self._cal_total_energy(partition_points_1, partition_points_2, network_info, data_size_list)
         temp_queue = self._cal_queue(actual_rate)
         cost = self._V * temp_queue * actual_rate + total_energy
         return cost, actual_rate       
@@ -88,107 +88,67 @@ class TLDOC:
         return new_queue
     
     
-    def _create_init_tensor(self, max_layer):
-        A_end, A_edge, A_cloud = max_layer, 0, 0 
-        off_tensor = [A_end, A_edge, A_cloud]
-        return off_tensor
-    
-    
-    def _get_violation_rate(self, off_tensor, network_info, data_size_list):
-        actual_rate = 0
-        total_latency = cal_total_latency(off_tensor, self._time_config, network_info, data_size_list, self._t_wait)
-        if total_latency > self._latency_allowed:  
-            actual_rate = ((total_latency - self._latency_allowed)/self._latency_allowed)*100
+    def _get_violation_rate(self, partition_points_1, partition_points_2, network_info, data_size_list):
+        total_latency = cal_total_latencies(partition_points_1, partition_points_2, self._time_prefix, network_info, data_size_list, self._t_wait)
+        actual_rate = np.where(total_latency > self._latency_allowed, ((total_latency - self._latency_allowed)/self._latency_allowed)*100, 0)
         return actual_rate
     
     
-    def _cal_total_energy(self, off_tensor, network_info, data_size_list):
-        E_cal = sum(self._energy_config['end'][:off_tensor[0]])
-        E_comm = self._energy_config['end_to_edge'][off_tensor[0]]
-        E_idle = cal_total_latency_except_end(off_tensor, self._time_config, network_info, data_size_list, self._t_wait) * self._idle_power
+    def _cal_total_energy(self, partition_points_1, partition_points_2, network_info, data_size_list):
+        E_cal = self._end_energy_prefix[partition_points_1]
+        E_comm = self._end_to_edge_energy[partition_points_1]
+        E_idle = cal_total_latencies_except_end(partition_points_1, partition_points_2, self._time_prefix, network_info, data_size_list, self._t_wait) * self._idle_power
         
         total_energy = E_cal + E_comm + E_idle
         return total_energy
     
     
-    def _make_path(self, source_node, destination_node, layered_graph, partition_point_1, partition_point_2):
-        path = [source_node]
-        current_node = source_node
-        count = 0
-
-        # Traverse from source to end_last_node
-        while count < partition_point_1 - 1:
-            neighbors = layered_graph.get(current_node, [])[:]
-            sorted_neighbors = sorted(neighbors, key=lambda neighbor: neighbor.get_layer())
-            
-            found = False
-            for node in sorted_neighbors:
-                if current_node.is_same_node(node):
-                    path.append(node)
-                    current_node = node
-                    count += 1
-                    found = True
-                    break
-            
-            if not found:
-                break
-
-        end_last_node = current_node
+    def _make_path(self, source_node: LayerNode, destination_node: LayerNode, layered_graph: Dict[LayerNode, List[LayerNode]], model_names: List[str], partition_point_1: int, partition_point_2: int) -> List[Tuple[LayerNode, LayerNode, str]]:
+        """
+        source(end)가 앞의 partition_point_1개 stage를, edge가 partition_point_2까지의 stage를, destination(cloud)이 나머지 stage를 실행하는 경로를 반환합니다.
+        source의 이웃 중 edge의 stage를 실행할 수 있고 destination으로 보낼 수 있는 첫 번째 노드(IP 순서)를 edge로 사용합니다.
 
-        # Traverse from end_last_node to edge_top_node
-        neighbors = layered_graph.get(end_last_node, [])[:]
-        sorted_neighbors = sorted(neighbors, key=lambda neighbor: neighbor.get_layer())
-        
-        for node in sorted_neighbors:
-            if not end_last_node.is_same_node(node):
-                path.append(node)
-                current_node = node
+        Raises:
+            ValueError: 노드가 맡은 stage를 실행할 수 없거나, 그런 edge 노드가 없을 때.
+        """
+        end_models = model_names[:partition_point_1]
+        edge_models = model_names[partition_point_1:partition_point_2]
+        cloud_models = model_names[partition_point_2:]
+
+        if not set(end_models) <= set(source_node.get_model_names()):
+            raise ValueError(f"{source_node} cannot run stages {end_models}.")
+
+        if not set(cloud_models) <= set(destination_node.get_model_names()):
+            raise ValueError(f"{destination_node} cannot run stages {cloud_models}.")
+
+        edge_node = None
+        for node in sorted(layered_graph.get(source_node, [])):
+            if (not source_node.is_same_node(node)
+                and set(edge_models) <= set(node.get_model_names())
+                and (node.is_same_node(destination_node) or destination_node in layered_graph.get(node, []))):
+                edge_node = node
                 break
 
-        edge_top_node = current_node
-        count = 0  # Reset count for the second partition traversal
-
-        # Traverse from edge_top_node to edge_last_node
-        while count < partition_point_2 - 1:
-            neighbors = layered_graph.get(current_node, [])[:]
-            sorted_neighbors = sorted(neighbors, key=lambda neighbor: neighbor.get_layer())
-            
-            found = False
-            for node in sorted_neighbors:
-                if edge_top_node.is_same_node(node):
-                    path.append(node)
-                    current_node = node
-                    count += 1
-                    found = True
-                    break
-            
-            if not found:
-                break
+        if edge_node is None:
+            raise ValueError(f"No edge node between {source_node} and {destination_node} runs stages {edge_models}.")
 
-        edge_last_node = current_node
+        # end
+        path = [(source_node, source_node, model_name) for model_name in end_models]
 
-        # Traverse from edge_last_node to cloud_node
-        neighbors = layered_graph.get(edge_last_node, [])[:]
-        sorted_neighbors = sorted(neighbors, key=lambda neighbor: neighbor.get_layer())
-        
-        for node in sorted_neighbors:
-            if destination_node.is_same_node(node):
-                path.append(node)
-                current_node = node
-                break
+        # end -> edge
+        path.append((source_node, edge_node, end_models[-1] if end_models else ""))
 
-        cloud_node = current_node
-        cloud_layer = cloud_node.get_layer()
+        # edge
+        for model_name in edge_models:
+            path.append((edge_node, edge_node, model_name))
 
-        # Traverse in the cloud computing phase
-        neighbors = layered_graph.get(cloud_node, [])[:]
-        
-        while not destination_node.is_same_layer_node(path[-1]):
-            neighbors = layered_graph[path[-1]][:]
+        # edge -> cloud
+        if not edge_node.is_same_node(destination_node):
+            completed_models = model_names[:partition_point_2]
+            path.append((edge_node, destination_node, completed_models[-1] if completed_models else ""))
 
-            for node in neighbors:
-                if destination_node.is_same_node(node) and cloud_layer < node.get_layer():
-                    path.append(node)
-                    break
+        # cloud
+        for model_name in cloud_models:
+            path.append((destination_node, destination_node, model_name))
 
         return path
@@ -1,4 +1,6 @@
 from scheduling.Dijkstra import Dijkstra
+from scheduling.DynamicDijkstra import DynamicDijkstra
+from scheduling.DriftPlusPenalty import DriftPlusPenalty
 from scheduling.TLDOC import TLDOC
 from scheduling.JDPCRA import JDPCRA
 from scheduling.RandomSelection import RandomSelection
\ No newline at end of file
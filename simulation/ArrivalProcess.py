@@ -0,0 +1,52 @@
+import numpy as np
+
+ARRIVAL_KINDS = ["poisson", "periodic"]
+
+class ArrivalProcess:
+    """
+    sender가 프레임을 보내는 간격을 만드는 도착 과정입니다.
+
+    Attributes:
+        _kind (str): 도착 과정 종류. poisson은 지수 분포 간격, periodic은 일정한 간격입니다.
+        _rate (float): 평균 도착률. (fps)
+        _rng (np.random.Generator): 간격을 뽑는 난수 생성기.
+    """
+    def __init__(self, kind: str, rate: float, rng: np.random.Generator):
+        """
+        Args:
+            kind (str): 도착 과정 종류. (poisson, periodic)
+            rate (float): 평균 도착률. (fps)
+            rng (np.random.Generator): 간격을 뽑는 난수 생성기.
+        """
+        self._check_validate(kind, rate)
+
+        self._kind: str = kind
+        self._rate: float = rate
+        self._rng: np.random.Generator = rng
+
+    def _check_validate(self, kind: str, rate: float):
+        """
+        도착 과정 종류와 도착률이 올바른지 검증합니다.
+        """
+        if kind not in ARRIVAL_KINDS:
+            raise ValueError(f"Invalid arrival kind: {kind}. kind must be in {ARRIVAL_KINDS}.")
+
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, but got {rate}")
+
+    def get_interval(self) -> float:
+        """
+        다음 프레임까지의 간격을 반환합니다. (sec)
+        """
+        if self._kind == "poisson":
+            return float(self._rng.exponential(1 / self._rate))
+
+        return 1 / self._rate
+
+    @property
+    def kind(self) -> str:
+        return self._kind
+
+    @property
+    def rate(self) -> float:
+        return self._rate
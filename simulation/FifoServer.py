@@ -0,0 +1,47 @@
+from collections import deque
+from typing import Deque, Tuple
+
+class FifoServer:
+    """
+    서브태스크를 도착 순서대로 하나씩 처리하는 서버입니다. 노드의 계산 큐와 링크의 전송 큐를 나타냅니다.
+    먼저 들어온 서브태스크가 끝나야 다음 서브태스크를 시작하므로, 들어오는 순간 처리가 끝나는 시간을 정할 수 있습니다.
+
+    Attributes:
+        _busy_until (float): 지금까지 들어온 서브태스크를 모두 처리하는 시간. (sec)
+        _items (Deque[Tuple[float, float, float]]): 처리가 끝나지 않은 서브태스크의 (시작 시간, 끝나는 시간, 양). 양은 계산량(GFLOPs) 또는 전송량(KB)입니다.
+    """
+    def __init__(self):
+        self._busy_until: float = 0
+        self._items: Deque[Tuple[float, float, float]] = deque()
+
+    def enqueue(self, now: float, work: float, service_time: float) -> float:
+        """
+        서브태스크를 큐에 넣고, 처리가 끝나는 시간을 반환합니다. (sec)
+
+        Args:
+            now (float): 서브태스크가 도착한 시간. (sec)
+            work (float): 계산량(GFLOPs) 또는 전송량(KB).
+            service_time (float): 서브태스크를 처리하는 데 걸리는 시간. (sec)
+        """
+        start_time = max(now, self._busy_until)
+        finish_time = start_time + service_time
+        self._busy_until = finish_time
+        self._items.append((start_time, finish_time, work))
+
+        return finish_time
+
+    def get_backlog(self, now: float) -> float:
+        """
+        now에 아직 처리하지 못한 양을 반환합니다. 처리 중인 서브태스크는 남은 비율만큼 더합니다. (GFLOPs 또는 KB)
+        """
+        while self._items and self._items[0][1] <= now:
+            self._items.popleft()
+
+        backlog = 0
+        for start_time, finish_time, work in self._items:
+            if start_time < now:
+                backlog += work * (finish_time - now) / (finish_time - start_time)
+            else:
+                backlog += work
+
+        return backlog
@@ -0,0 +1,371 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+import heapq
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+
+from datetime import datetime
+
+from config import ControllerConfig, NetworkConfig, ModelConfig
+from job import JobInfo
+from layeredgraph import LayeredGraph, LayerNode, LayerNodePair
+from simulation.ArrivalProcess import ArrivalProcess
+from simulation.FifoServer import FifoServer
+from utils import save_latency, get_latency_stats, save_latency_percentiles, save_virtual_backlog, save_schedule_cache_stats, save_path
+
+MS_PER_SECOND = 1_000
+NS_PER_SECOND = 1_000_000_000
+KB_PER_BYTE = 1024
+
+DEFAULT_ARRIVAL_KIND = "poisson"
+DEFAULT_BANDWIDTH = 10.0 # KB/ms
+DEFAULT_DELAY = 1.0 # ms
+
+# Controller의 스레드들과 같은 주기입니다.
+RECORD_BACKLOG_INTERVAL = 0.1 # sec
+MEASURE_ARRIVAL_RATE_INTERVAL = 1 # sec
+
+LATENCY_TABLE_DIRECTORY = "spec/yolov5"
+TIERS = ["end", "edge", "cloud"]
+
+class Simulator:
+    """
+    노드, 브로커 없이 MDC 파이프라인을 한 프로세스에서 실행하는 이산 사건 시뮬레이터입니다.
+
+    sender는 작업마다 주어진 도착 과정으로 프레임을 보내고, Controller처럼 실제 LayeredGraph와 스케줄링 알고리즘으로 경로를 정합니다.
+    경로의 계산은 노드마다의 FIFO 계산 큐에서 spec/yolov5/{end,edge,cloud}.csv의 레이어 실행 시간만큼 걸리고,
+    전송은 링크마다의 FIFO 전송 큐에서 전송량 / bandwidth만큼 걸린 뒤 delay만큼 늦게 도착합니다.
+    sync_time마다 노드가 큐의 backlog와 capacity를 보고하고, Controller와 같은 지연 시간, backlog, 경로 파일을 남깁니다.
+    LayeredGraph는 시뮬레이션 시간을 시계로 사용하므로, 실제 시간보다 훨씬 빠르게 실행됩니다.
+
+    Attributes:
+        _network_config (NetworkConfig): 네트워크 설정.
+        _controller_config (ControllerConfig): Controller 설정. (sync_time, scheduling_slot, experiment_name)
+        _layered_graph (LayeredGraph): 스케줄링에 사용하는 레이어드 그래프.
+        _now (float): 현재 시뮬레이션 시간. (sec)
+        _events (List[Tuple[float, int, Callable[[], None]]]): (시간, 순서 번호, 처리 함수) 사건들의 heap.
+        _input_bytes (float): 프레임을 uint8로 보낼 때의 입력 크기. (KB)
+        _arrivals (Dict[str, ArrivalProcess]): 작업 이름과 도착 과정.
+        _tiers (Dict[str, str]): 노드 IP와 레이어 실행 시간 표의 tier. (end, edge, cloud)
+        _stage_times (Dict[str, Dict[str, float]]): tier마다 모델(stage)의 실행 시간. (sec)
+        _computing_servers (Dict[str, FifoServer]): 노드 IP와 계산 큐.
+        _links (Dict[Tuple[str, str], Tuple[float, float]]): 링크와 bandwidth(KB/ms), delay(ms).
+        _transfer_servers (Dict[Tuple[str, str], FifoServer]): 링크와 전송 큐.
+        _job_list (Dict[str, Tuple[float, str]]): 끝나지 않은 작업의 job_id와 (시작 시간(sec), 작업 이름).
+        _pending_jobs (List[JobInfo]): scheduling_slot 동안 모은 스케줄링 요청.
+        _send_num (int): 지난 MEASURE_ARRIVAL_RATE_INTERVAL 동안 보낸 프레임 수.
+        _latencies (Dict[str, List[float]]): 작업 이름과 끝난 작업들의 종단 간 지연 시간. (ms)
+        _duration (float): sender가 프레임을 보내는 시간. (sec)
+        _latency_log_path (str): 지연 시간 로그 디렉터리.
+        _backlog_log_path (str): backlog 로그 디렉터리.
+        _path_log_path (str): 경로 로그 디렉터리.
+    """
+    def __init__(self,
+                 config: Dict[str, any],
+                 arrivals: Optional[Dict[str, Tuple[str, float]]] = None,
+                 tiers: Optional[Dict[str, str]] = None,
+                 links: Optional[Dict[Tuple[str, str], Tuple[float, float]]] = None,
+                 seed: int = 0):
+        """
+        Args:
+            config (Dict[str, any]): config.json의 Network, Model, Controller 설정.
+            arrivals (Optional[Dict[str, Tuple[str, float]]]): 작업 이름과 (도착 과정 종류, fps). 주지 않은 작업은 max_fps의 poisson 도착입니다.
+            tiers (Optional[Dict[str, str]]): 노드 IP와 tier. 주지 않은 노드는 작업의 출발지라면 end, 도착지라면 cloud, 나머지는 edge입니다.
+            links (Optional[Dict[Tuple[str, str], Tuple[float, float]]]): 링크와 (bandwidth(KB/ms), delay(ms)). 주지 않은 링크는 기본값을 사용합니다.
+            seed (int): 도착 과정의 난수 시드.
+        """
+        self._network_config = NetworkConfig(config["Network"])
+        self._controller_config = ControllerConfig(config["Controller"])
+        model_config = ModelConfig(config["Model"])
+
+        self._now: float = 0
+        self._events: List[Tuple[float, int, Callable[[], None]]] = []
+        self._event_counter = itertools.count()
+
+        self._layered_graph = LayeredGraph(self._network_config, model_config, clock=lambda: self._now)
+        self._model_names: List[str] = model_config.get_model_names()
+        self._input_bytes: float = float(np.prod(model_config.get_input_size(self._model_names[0]))) / KB_PER_BYTE # KB
+
+        self.init_arrivals(arrivals or {}, seed)
+        self.init_tiers(tiers or {})
+        self.init_servers(links or {})
+
+        self._job_list: Dict[str, Tuple[float, str]] = {}
+        self._pending_jobs: List[JobInfo] = []
+        self._send_num: int = 0
+        self._latencies: Dict[str, List[float]] = {job_name: [] for job_name in self._network_config.get_job_names()}
+        self._duration: float = 0
+
+        self._latency_log_path: Optional[str] = None
+        self._backlog_log_path: Optional[str] = None
+        self._path_log_path: Optional[str] = None
+
+    def init_arrivals(self, arrivals: Dict[str, Tuple[str, float]], seed: int):
+        rng = np.random.default_rng(seed)
+        self._arrivals: Dict[str, ArrivalProcess] = {}
+
+        for job_name in arrivals:
+            if job_name not in self._network_config.get_job_names():
+                raise ValueError(f"Unknown job: {job_name}. job must be in {self._network_config.get_job_names()}.")
+
+        for job_name in self._network_config.get_job_names():
+            kind, rate = arrivals.get(job_name, (DEFAULT_ARRIVAL_KIND, self._network_config.get_job_max_fps(job_name)))
+            self._arrivals[job_name] = ArrivalProcess(kind, rate, rng)
+
+    def init_tiers(self, tiers: Dict[str, str]):
+        """
+        노드마다 tier를 정하고, tier마다 모델(stage)의 실행 시간을 레이어 실행 시간 표에서 계산합니다.
+        표의 레이어 수가 stage 수와 같다면 레이어마다 한 stage이고, 다르다면 표 전체의 실행 시간을 stage의 계산량 비율로 나눕니다.
+        """
+        sources = {self._network_config.get_job_source(job_name) for job_name in self._network_config.get_job_names()}
+        destinations = {self._network_config.get_job_destination(job_name) for job_name in self._network_config.get_job_names()}
+
+        self._tiers: Dict[str, str] = {}
+        for ip in self._network_config.get_network_list():
+            default_tier = "end" if ip in sources else "cloud" if ip in destinations else "edge"
+            self._tiers[ip] = tiers.get(ip, default_tier)
+
+            if self._tiers[ip] not in TIERS:
+                raise ValueError(f"Invalid tier: {self._tiers[ip]}. tier must be in {TIERS}.")
+
+        computing = {}
+        for model_name in self._model_names:
+            node = LayerNode("", [model_name])
+            computing[model_name] = self._layered_graph.get_work(LayerNodePair(node, node), model_name, self._input_bytes) # GFLOPs
+        total_computing = sum(computing.values())
+
+        self._stage_times: Dict[str, Dict[str, float]] = {}
+        for tier in TIERS:
+            layer_times = pd.read_csv(f"{LATENCY_TABLE_DIRECTORY}/{tier}.csv").latency.to_list() # sec
+
+            if len(layer_times) == len(self._model_names):
+                self._stage_times[tier] = dict(zip(self._model_names, layer_times))
+            else:
+                self._stage_times[tier] = {model_name: sum(layer_times) * computing[model_name] / total_computing for model_name in self._model_names}
+
+        self._computing: Dict[str, float] = computing
+
+    def init_servers(self, links: Dict[Tuple[str, str], Tuple[float, float]]):
+        self._computing_servers: Dict[str, FifoServer] = {ip: FifoServer() for ip in self._network_config.get_network_list()}
+        self._links: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._transfer_servers: Dict[Tuple[str, str], FifoServer] = {}
+
+        for source_ip in self._network_config.get_network_list():
+            for destination_ip in self._network_config.get_network_neighbors(source_ip):
+                self._links[(source_ip, destination_ip)] = links.get((source_ip, destination_ip), (DEFAULT_BANDWIDTH, DEFAULT_DELAY))
+                self._transfer_servers[(source_ip, destination_ip)] = FifoServer()
+
+        for link in links:
+            if link not in self._links:
+                raise ValueError(f"Unknown link: {link}. link must be in {list(self._links.keys())}.")
+
+    def init_path(self):
+        folder_name = self._controller_config.experiment_name + "_simulation_" + datetime.now().strftime('%m-%d_%H%M%S')
+        self._latency_log_path = f"./results/{folder_name}/latency"
+        os.makedirs(self._latency_log_path, exist_ok=True)
+
+        self._backlog_log_path = f"./results/{folder_name}/backlog"
+        os.makedirs(self._backlog_log_path, exist_ok=True)
+
+        self._path_log_path = f"./results/{folder_name}/path"
+        os.makedirs(self._path_log_path, exist_ok=True)
+
+    def push_event(self, event_time: float, handler: Callable[[], None]):
+        heapq.heappush(self._events, (event_time, next(self._event_counter), handler))
+
+    def run(self, duration: float) -> Dict[str, Dict[str, float]]:
+        """
+        sender가 duration 동안 프레임을 보내고, 보낸 작업이 모두 끝나거나 collect_garbage_job_time이 더 지날 때까지 시뮬레이션합니다.
+
+        Args:
+            duration (float): sender가 프레임을 보내는 시간. (sec)
+
+        Returns:
+            Dict[str, Dict[str, float]]: 작업마다의 지연 시간 통계. (save_latency_percentiles와 같은 형식)
+        """
+        self._duration = duration
+        end_time = duration + self._network_config.collect_garbage_job_time # sec
+        self.init_path()
+
+        for job_name, arrival in self._arrivals.items():
+            self.push_event(arrival.get_interval(), lambda job_name=job_name: self.handle_arrival(job_name))
+
+        self.push_event(0, self.sync_backlog)
+        self.push_event(RECORD_BACKLOG_INTERVAL, self.record_virtual_backlog)
+        self.push_event(MEASURE_ARRIVAL_RATE_INTERVAL, self.measure_arrival_rate)
+
+        if self._controller_config.scheduling_slot > 0:
+            self.push_event(self._controller_config.scheduling_slot, self.schedule_slot)
+
+        while self._events and self._events[0][0] <= end_time:
+            self._now, _, handler = heapq.heappop(self._events)
+            handler()
+
+        self.collect_garbage_jobs()
+
+        # 스케줄링 캐시 통계는 누적 값이므로 마지막에 한 번만 기록합니다.
+        save_schedule_cache_stats(f"{self._backlog_log_path}/schedule_cache.csv", self._layered_graph.get_schedule_cache_stats())
+
+        percentiles = self.get_latency_percentiles()
+        if percentiles:
+            save_latency_percentiles(f"{self._latency_log_path}/percentiles.csv", percentiles)
+
+        return percentiles
+
+    def is_running(self) -> bool:
+        """
+        sender가 아직 보내는 중이거나 끝나지 않은 작업이 있는 지 여부를 반환합니다. 주기적인 사건은 이 동안만 반복합니다.
+        """
+        return self._now < self._duration or len(self._job_list) > 0 or len(self._pending_jobs) > 0
+
+    def handle_arrival(self, job_name: str):
+        job_info = JobInfo(job_name,
+                           self._network_config.get_job_type(job_name),
+                           self._input_bytes,
+                           self._network_config.get_job_source(job_name),
+                           self._network_config.get_job_destination(job_name),
+                           int(self._now * NS_PER_SECOND))
+
+        self._send_num += 1
+        self._job_list[job_info.job_id] = (self._now, job_name)
+
+        if self._controller_config.scheduling_slot > 0:
+            self._pending_jobs.append(job_info)
+        else:
+            path = self._layered_graph.schedule(job_info)
+            self._layered_graph.update_path_backlog(job_info=job_info, path=path)
+            self.dispatch_paths([(job_info, path)])
+
+        next_time = self._now + self._arrivals[job_name].get_interval()
+        if next_time < self._duration:
+            self.push_event(next_time, lambda: self.handle_arrival(job_name))
+
+    def schedule_slot(self):
+        job_infos = self._pending_jobs
+        self._pending_jobs = []
+
+        if len(job_infos) > 0:
+            paths = self._layered_graph.schedule_batch(job_infos)
+            self.dispatch_paths(list(zip(job_infos, paths)))
+
+        if self.is_running():
+            self.push_event(self._now + self._controller_config.scheduling_slot, self.schedule_slot)
+
+    def dispatch_paths(self, job_paths: List[Tuple[JobInfo, List[Tuple[LayerNode, LayerNode, str]]]]):
+        path_log_file_path = f"{self._path_log_path}/path.csv"
+
+        for job_info, path in job_paths:
+            save_path(path_log_file_path, path)
+            self.run_subtask(job_info, path, 0)
+
+    def run_subtask(self, job_info: JobInfo, path: List[Tuple[LayerNode, LayerNode, str]], index: int):
+        """
+        경로의 index번째 서브태스크를 계산 큐 또는 전송 큐에 넣고, 끝나면 다음 서브태스크를 실행합니다.
+        """
+        if index == len(path):
+            self.handle_response(job_info)
+            return
+
+        source, destination, model_name = path[index]
+        link = LayerNodePair(source, destination)
+        work = self._layered_graph.get_work(link, model_name, job_info.input_bytes) # GFLOPs or KB
+
+        if link.is_same_node():
+            service_time = self._stage_times[self._tiers[source.get_ip()]][model_name] # sec
+            done_time = self._computing_servers[source.get_ip()].enqueue(self._now, work, service_time)
+        else:
+            bandwidth, delay = self._links[(source.get_ip(), destination.get_ip())] # KB/ms, ms
+            done_time = self._transfer_servers[(source.get_ip(), destination.get_ip())].enqueue(self._now, work, work / bandwidth / MS_PER_SECOND)
+            done_time += delay / MS_PER_SECOND
+
+        self.push_event(done_time, lambda: self.run_subtask(job_info, path, index + 1))
+
+    def handle_response(self, job_info: JobInfo):
+        # collect_garbage_job_time이 지나 이미 버린 작업입니다.
+        if job_info.job_id not in self._job_list:
+            return
+
+        start_time, job_name = self._job_list.pop(job_info.job_id)
+        latency = (self._now - start_time) * MS_PER_SECOND # ms
+
+        # Controller처럼 collect_garbage_job_time이 지난 작업은 그 시간을 지연 시간으로 기록합니다.
+        self.save_latency(job_name, min(latency, self._network_config.collect_garbage_job_time * MS_PER_SECOND))
+
+    def collect_garbage_jobs(self):
+        """
+        시뮬레이션이 끝날 때까지 끝나지 않은 작업을 collect_garbage_job_time을 지연 시간으로 기록하고 버립니다.
+        """
+        latency = self._network_config.collect_garbage_job_time * MS_PER_SECOND # ms
+        for _, job_name in self._job_list.values():
+            self.save_latency(job_name, latency)
+
+        self._job_list.clear()
+
+    def save_latency(self, job_name: str, latency: float):
+        save_latency(f"{self._latency_log_path}/{job_name}.csv", latency)
+        self._latencies[job_name].append(latency)
+
+    def sync_backlog(self):
+        """
+        노드마다 큐에 남은 양을 링크의 backlog로, 레이어 실행 시간과 bandwidth를 capacity로 보고합니다. (Controller.handle_node_info)
+        """
+        for node_ip in self._network_config.get_network_list():
+            links = {}
+            for link in self._layered_graph.get_links(node_ip):
+                if link.is_same_node():
+                    links[link] = self._computing_servers[node_ip].get_backlog(self._now)
+                else:
+                    links[link] = self._transfer_servers[(node_ip, link.destination.get_ip())].get_backlog(self._now)
+
+            self._layered_graph.set_graph(links)
+            self._layered_graph.set_capacity(node_ip, self.get_computing_capacity(node_ip), self.get_transfer_capacity(node_ip))
+
+        if self.is_running():
+            self.push_event(self._now + self._controller_config.sync_time, self.sync_backlog)
+
+    def get_computing_capacity(self, node_ip: str) -> float:
+        """
+        노드가 모든 stage를 실행할 때의 계산 capacity를 반환합니다. (GFLOPs/ms)
+        """
+        stage_times = self._stage_times[self._tiers[node_ip]]
+        return sum(self._computing.values()) / (sum(stage_times.values()) * MS_PER_SECOND)
+
+    def get_transfer_capacity(self, node_ip: str) -> float:
+        """
+        노드에서 나가는 링크들의 평균 bandwidth를 반환합니다. (KB/ms)
+        """
+        bandwidths = [bandwidth for (source_ip, _), (bandwidth, _) in self._links.items() if source_ip == node_ip]
+        return float(np.mean(bandwidths)) if bandwidths else DEFAULT_BANDWIDTH
+
+    def record_virtual_backlog(self):
+        self._layered_graph.update_graph(RECORD_BACKLOG_INTERVAL)
+        save_virtual_backlog(f"{self._backlog_log_path}/total_backlog.csv", self._layered_graph.get_layered_graph_backlog())
+
+        if self.is_running():
+            self.push_event(self._now + RECORD_BACKLOG_INTERVAL, self.record_virtual_backlog)
+
+    def measure_arrival_rate(self):
+        self._layered_graph.update_expected_arrival_rate(self._send_num / 30)
+        self._send_num = 0
+
+        if self.is_running():
+            self.push_event(self._now + MEASURE_ARRIVAL_RATE_INTERVAL, self.measure_arrival_rate)
+
+    def get_latency_percentiles(self) -> Dict[str, Dict[str, float]]:
+        """
+        작업마다 지연 시간의 백분위수와 SLO를 지킨 비율을 반환합니다.
+        """
+        percentiles = {}
+        for job_name, latencies in self._latencies.items():
+            if len(latencies) == 0:
+                continue
+
+            percentiles[job_name] = get_latency_stats(latencies, self._network_config.get_job_latency_slo(job_name))
+
+        return percentiles
+
+    def get_now(self) -> float:
+        return self._now
@@ -0,0 +1,3 @@
+from simulation.ArrivalProcess import ArrivalProcess
+from simulation.FifoServer import FifoServer
+from simulation.Simulator import Simulator
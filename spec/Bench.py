@@ -4,10 +4,14 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import pandas as pd
 import torch
+import cv2
 import time
 import threading
 from spec.GPUUtilManager import GPUUtilManager
-from utils import ensure_path_exists, load_model, split_model
+from utils.utils import ensure_path_exists
+from utils.model_utils import load_model, split_model, export_onnx, get_postprocess
+from utils.video_utils import resize_frame
+from job import ONNXModel
 from typing import List
 
 class Bench:
@@ -92,6 +96,84 @@ class Bench:
             elapsed_time = time.time() - start_time  # 초 단위
             data["watt_hour"][0] += watt * elapsed_time  # 와트-초
 
+    def start_backend_bench(self, model_name, input_size = (1, 3, 320, 320), dynamic_batch = False, times = 100):
+        """
+        같은 모델을 eager torch와 onnxruntime(CPU provider)으로 실행하여 latency를 비교합니다.
+        onnxruntime은 CPU에서 실행하므로 torch 또한 CPU에서 실행합니다.
+        결과는 spec/{model_name}/backend_latency.csv에 저장합니다.
+        """
+        torch_model = load_model(model_name).to("cpu")
+        onnx_model = ONNXModel(export_onnx(model_name, input_size, dynamic_batch), get_postprocess(model_name))
+
+        backends = {"torch": torch_model, "onnx": onnx_model}
+        data = {"backend": [], "latency": []}
+
+        model_input = torch.randn(input_size)
+
+        for backend, model in backends.items():
+            # warmup
+            with torch.no_grad():
+                model(model_input)
+
+            for _ in range(times):
+                start = time.time()
+
+                with torch.no_grad():
+                    model(model_input)
+
+                end = time.time()
+
+                data["backend"].append(backend)
+                data["latency"].append(end - start) # 초 단위
+
+        csv_path = f"spec/{model_name}/backend_latency.csv"
+        ensure_path_exists(os.path.dirname(csv_path))
+
+        df = pd.DataFrame(data)
+        df.to_csv(csv_path, index=False)
+        print(df.groupby("backend")["latency"].describe())
+        print(f"Data saved to {csv_path}")
+
+    def start_ingest_bench(self, video_path = "video/JN.mp4", frames = 300, send_interval = 0.5, size = (320, 320)):
+        """
+        VideoSender의 프레임 입력 방식에 따른 CPU 사용 시간을 비교합니다.
+        eager는 모든 프레임을 read하고 INTER_CUBIC으로 resize하며 (예전 방식),
+        lazy는 모든 프레임을 grab하고 전송할 프레임(send_interval마다 하나)만 retrieve, resize합니다.
+        결과는 영상 1초당 CPU 사용 시간이며 spec/ingest_cpu.csv에 저장합니다.
+        """
+        data = {"mode": [], "cpu_sec_per_video_sec": []}
+
+        for mode in ["eager", "lazy"]:
+            capture = cv2.VideoCapture(video_path)
+            fps = capture.get(cv2.CAP_PROP_FPS) or 30
+            frames_per_send = max(1, round(send_interval * fps))
+
+            start = time.process_time()
+            for index in range(frames):
+                if mode == "eager":
+                    _, frame = capture.read()
+                    cv2.resize(frame, size, interpolation=cv2.INTER_CUBIC)
+                    continue
+
+                capture.grab()
+                if index % frames_per_send == 0:
+                    _, frame = capture.retrieve()
+                    resize_frame(frame, *size)
+            cpu_time = time.process_time() - start
+
+            capture.release()
+
+            data["mode"].append(mode)
+            data["cpu_sec_per_video_sec"].append(cpu_time / (frames / fps))
+
+        csv_path = "spec/ingest_cpu.csv"
+
+        df = pd.DataFrame(data)
+        df.to_csv(csv_path, index=False)
+        print(df)
+        print(f"CPU freed by lazy ingest: {1 - data['cpu_sec_per_video_sec'][1] / data['cpu_sec_per_video_sec'][0]:.1%}")
+        print(f"Data saved to {csv_path}")
+
     def constantize_csv_data(self):
         total_idle_computing_capacity = 0
         for idx, subtask in enumerate(self._subtasks):
@@ -118,3 +200,5 @@ if __name__ == "__main__":
     bench.load_model("yolov5", [[0,1], [1,2], [2,3], [3,4]])
     bench.start_bench(100)
     bench.constantize_csv_data()
+    bench.start_backend_bench("yolov5")
+    bench.start_ingest_bench()
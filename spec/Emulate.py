@@ -0,0 +1,46 @@
+"""
+하드웨어 없이 한 호스트에서 Controller, MDC, sender를 실제 program/ 코드 그대로 프로세스로 실행하고, 작업마다의 처리량과 지연 시간 백분위수를 출력합니다.
+노드마다 127.0.1.x loopback 주소에 가벼운 MQTT 브로커를 띄우므로 mosquitto가 필요 없으며, config의 IP 주소가 노드의 가상 주소가 됩니다.
+results/{experiment_name}_emulation_{시간}/ 아래에 프로세스 로그, 지연 시간 통계, 링크마다 받은 메시지 양을 기록합니다.
+프로젝트 루트에서 실행하며, Controller처럼 spec/model_profile.json의 모델 프로파일과 모델 가중치가 필요합니다.
+127.0.0.0/8 전체를 loopback으로 쓰는 Linux에서만 그대로 실행됩니다. macOS 등에서는 노드 수만큼 sudo ifconfig lo0 alias 127.0.1.x로 주소를 먼저 추가해야 하며,
+주소에 listen할 수 없으면 프로세스를 띄우기 전에 OSError로 멈춥니다.
+
+    python spec/Emulate.py --duration 120 --video video/JN.mp4 --link 192.168.1.5 192.168.1.6 5 2
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+
+from emulation import Emulator
+from emulation.Emulator import CONTROLLER_IP, DEFAULT_SENDER_PATH, MQTT_PORT
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default="config/config.json")
+    parser.add_argument("--duration", type=float, default=120.0, help="프로세스들을 실행하는 시간. (sec) 모델을 불러오는 시간도 포함합니다.")
+    parser.add_argument("--sender", default=DEFAULT_SENDER_PATH, help="작업의 출발지 노드에서 실행할 sender 프로그램.")
+    parser.add_argument("--video", default=None, help="VideoSender가 재생할 영상. 주지 않으면 VideoSender의 기본 영상을 사용합니다.")
+    parser.add_argument("--link", nargs=4, action="append", default=[], metavar=("SOURCE_IP", "DESTINATION_IP", "KB_PER_MS", "DELAY_MS"),
+                        help="링크의 bandwidth(KB/ms)와 delay(ms). 주지 않은 링크는 지연 없이 전달합니다.")
+    parser.add_argument("--controller-ip", default=CONTROLLER_IP)
+    parser.add_argument("--port", type=int, default=MQTT_PORT)
+    args = parser.parse_args()
+
+    emulator = Emulator(args.config,
+                        links={(source_ip, destination_ip): (float(bandwidth), float(delay)) for source_ip, destination_ip, bandwidth, delay in args.link},
+                        sender_path=args.sender,
+                        sender_args=["--video", args.video] if args.video is not None else [],
+                        controller_ip=args.controller_ip,
+                        port=args.port)
+
+    percentiles = emulator.run(args.duration)
+
+    if not percentiles:
+        print("No job finished. See the process logs in results/.")
+
+    for job_name, stats in percentiles.items():
+        print(f"{job_name}: {stats['count']} jobs ({stats['throughput']:.2f} jobs/sec), p50 {stats['p50']:.1f} ms, p95 {stats['p95']:.1f} ms, p99 {stats['p99']:.1f} ms, "
+              f"SLO {stats['latency_slo']:.0f} ms attainment {stats['slo_attainment'] * 100:.1f}%")
@@ -0,0 +1,27 @@
+"""
+yolov5를 서브모듈 사이의 모든 위치에서 잘랐을 때의 계산량(GFLOPs)과 전송해야 하는 텐서의 크기(KB)를 출력하고 spec/yolov5/cuts.csv에 저장합니다.
+전송량은 이후 서브모듈이 읽는 텐서만 float32로 보낼 때와 transfer_dtype(기본값: float16)으로 보낼 때의 크기입니다.
+사용법: python spec/Partition.py [batch channel height width] [transfer_dtype]
+결과를 보고 config.json의 Model에 submodules 구간으로 stage를 정의합니다.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pandas as pd
+
+from utils.model_utils import profile_cuts
+
+if __name__ == "__main__":
+    input_size = tuple(int(size) for size in sys.argv[1:5]) if len(sys.argv) > 4 else (1, 3, 320, 320)
+    transfer_dtype = sys.argv[5] if len(sys.argv) > 5 else "float16"
+
+    cuts = profile_cuts(input_size, transfer_dtype)
+
+    for cut in cuts:
+        print(f"cut {cut['cut']:2d}: head {cut['head_GFLOPs']:.4f} GFLOPs, tail {cut['tail_GFLOPs']:.4f} GFLOPs, "
+              f"{cut['activation_KB']:.1f} KB -> {cut['shipped_KB']:.1f} KB ({transfer_dtype}, saved {cut['saved_KB']:.1f} KB) {cut['live_tensors']}")
+
+    csv_path = "spec/yolov5/cuts.csv"
+    cuts = pd.DataFrame([{**cut, "live_tensors": " ".join(cut["live_tensors"])} for cut in cuts])
+    cuts.to_csv(csv_path, index=False)
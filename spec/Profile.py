@@ -0,0 +1,29 @@
+"""
+config.json의 모델들을 프로파일링하여 spec/model_profile.json에 저장합니다.
+Controller는 모델을 불러오지 않고 이 파일만 읽으므로, Controller를 실행하기 전에 torch가 설치된 곳에서 한 번 실행합니다.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import torch
+
+from config import ModelConfig
+from job import DNNModels, ModelProfileCache
+
+if __name__ == "__main__":
+    config_path = sys.argv[1] if len(sys.argv) > 1 else "config/config.json"
+
+    with open(config_path, 'r') as file:
+        model_config = ModelConfig(json.load(file)["Model"])
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    dnn_models = DNNModels(model_config, device)
+
+    for model_name in model_config.get_model_names():
+        computing = dnn_models.get_computing(model_name)
+        transfer = dnn_models.get_transfer(model_name)
+        full_transfer = ModelProfileCache().get_transfer(model_config.get_profile_name(model_name), model_config.get_input_size(model_name))
+
+        print(f"{model_name}: {computing:.4f} GFLOPs, {transfer:.4f} KB ({dnn_models.get_transfer_dtype(model_name)}, saved {full_transfer - transfer:.4f} KB)")
@@ -0,0 +1,59 @@
+"""
+노드와 브로커 없이 MDC 파이프라인을 이산 사건 시뮬레이션으로 실행하고, 작업마다의 지연 시간 백분위수를 출력합니다.
+Controller와 같은 형식으로 results/{experiment_name}_simulation_{시간}/ 아래에 지연 시간, backlog, 경로를 기록합니다.
+프로젝트 루트에서 실행하며, Controller처럼 spec/model_profile.json의 모델 프로파일이 필요합니다.
+
+    python spec/Simulate.py --algorithm scheduling/Dijkstra.py --duration 600 \\
+        --arrival "test job 1" poisson 10 --link 192.168.1.5 192.168.1.6 5 2
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import copy
+import json
+import time
+
+from simulation import Simulator
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default="config/config.json")
+    parser.add_argument("--algorithm", default=None, help="config의 scheduling_algorithm 대신 사용할 스케줄링 알고리즘.")
+    parser.add_argument("--scheduling-options", type=json.loads, default=None,
+                        help='스케줄링 알고리즘 생성자에 넘기는 인자. (예: \'{"v": 0.1}\')')
+    parser.add_argument("--duration", type=float, default=600.0) # sec
+    parser.add_argument("--arrival", nargs=3, action="append", default=[], metavar=("JOB", "KIND", "FPS"),
+                        help="작업의 도착 과정(poisson, periodic)과 fps. 주지 않은 작업은 max_fps의 poisson 도착입니다.")
+    parser.add_argument("--tier", nargs=2, action="append", default=[], metavar=("IP", "TIER"),
+                        help="노드의 레이어 실행 시간 표(end, edge, cloud). 주지 않은 노드는 출발지라면 end, 도착지라면 cloud, 나머지는 edge입니다.")
+    parser.add_argument("--link", nargs=4, action="append", default=[], metavar=("SOURCE_IP", "DESTINATION_IP", "KB_PER_MS", "DELAY_MS"),
+                        help="링크의 bandwidth(KB/ms)와 delay(ms). 주지 않은 링크는 기본값을 사용합니다.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as file:
+        config = json.load(file)
+
+    config = copy.deepcopy(config)
+    if args.algorithm is not None:
+        config["Network"]["scheduling_algorithm"] = args.algorithm
+    if args.scheduling_options is not None:
+        config["Network"]["scheduling_options"] = args.scheduling_options
+
+    simulator = Simulator(config,
+                          arrivals={job_name: (kind, float(fps)) for job_name, kind, fps in args.arrival},
+                          tiers={ip: tier for ip, tier in args.tier},
+                          links={(source_ip, destination_ip): (float(bandwidth), float(delay)) for source_ip, destination_ip, bandwidth, delay in args.link},
+                          seed=args.seed)
+
+    start_time = time.time()
+    percentiles = simulator.run(args.duration)
+    elapsed_time = time.time() - start_time # sec
+
+    for job_name, stats in percentiles.items():
+        print(f"{job_name}: {stats['count']} jobs, p50 {stats['p50']:.1f} ms, p95 {stats['p95']:.1f} ms, p99 {stats['p99']:.1f} ms, "
+              f"SLO {stats['latency_slo']:.0f} ms attainment {stats['slo_attainment'] * 100:.1f}%")
+
+    print(f"simulated {simulator.get_now():.1f} sec in {elapsed_time:.2f} sec ({simulator.get_now() / elapsed_time:.0f}x real time)")
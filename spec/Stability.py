@@ -0,0 +1,118 @@
+"""
+스케줄링 알고리즘마다 backlog가 발산하지 않고 버틸 수 있는 최대 도착률(fps)을 찾습니다.
+노드 없이 time slot마다 작업을 LayeredGraph에 배치하고, 링크의 capacity만큼 backlog를 줄이는 것을 반복합니다. (유체 근사)
+프로젝트 루트에서 실행하며, Controller처럼 spec/model_profile.json의 모델 프로파일이 필요합니다.
+
+    python spec/Stability.py --algorithms scheduling/RandomSelection.py scheduling/DriftPlusPenalty.py \\
+        --capacity 192.168.1.6 0.5 10 --capacity 192.168.1.7 0.1 10 --capacity 192.168.1.8 0.05 10
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import copy
+import json
+import random
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from config import NetworkConfig, ModelConfig
+from job import JobInfo
+from layeredgraph import LayeredGraph
+
+KB_PER_BYTE = 1024
+
+# 뒤쪽 1/4 구간의 평균 backlog가 가운데 구간보다 이 비율과 여유(sec) 이상 크면 발산한다고 봅니다.
+BACKLOG_GROWTH_TOLERANCE = 1.5
+BACKLOG_ABSOLUTE_TOLERANCE = 0.05 # sec
+
+def get_total_backlog(layered_graph: LayeredGraph) -> float:
+    """
+    모든 링크의 backlog를 처리하는 데 걸리는 예상 시간의 합을 반환합니다. (sec)
+    """
+    return sum(layered_graph.get_link_cost(link) for link in layered_graph.get_layered_graph_backlog())
+
+def simulate(config: Dict[str, any], algorithm: str, scheduling_options: Dict[str, any], capacities: List[Tuple[str, float, float]], rate: float, duration: float, slot: float, seed: int) -> List[float]:
+    """
+    작업마다 rate(fps)의 포아송 도착을 duration(sec) 동안 스케줄링합니다.
+
+    Returns:
+        List[float]: time slot마다의 전체 backlog. (sec)
+    """
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+
+    network_config = copy.deepcopy(config["Network"])
+    network_config["scheduling_algorithm"] = algorithm
+    network_config["scheduling_options"] = scheduling_options
+    network_config = NetworkConfig(network_config)
+    model_config = ModelConfig(config["Model"])
+
+    layered_graph = LayeredGraph(network_config, model_config)
+    for ip, computing_capacity, transfer_capacity in capacities:
+        layered_graph.set_capacity(ip, computing_capacity, transfer_capacity)
+
+    # 프레임을 uint8로 보낼 때의 입력 크기입니다.
+    input_bytes = float(np.prod(model_config.get_input_size(model_config.get_model_names()[0]))) / KB_PER_BYTE # KB
+
+    backlogs = []
+    for step in range(int(duration / slot)):
+        for job_name in network_config.get_job_names():
+            for _ in range(rng.poisson(rate * slot)):
+                job_info = JobInfo(job_name,
+                                   network_config.get_job_type(job_name),
+                                   input_bytes,
+                                   network_config.get_job_source(job_name),
+                                   network_config.get_job_destination(job_name),
+                                   step)
+                path = layered_graph.schedule(job_info)
+                layered_graph.update_path_backlog(job_info, path)
+
+        layered_graph.update_graph(slot)
+        backlogs.append(get_total_backlog(layered_graph))
+
+    return backlogs
+
+def is_stable(backlogs: List[float]) -> bool:
+    quarter = len(backlogs) // 4
+    middle_backlog = np.mean(backlogs[quarter:2 * quarter])
+    last_backlog = np.mean(backlogs[3 * quarter:])
+
+    return last_backlog <= middle_backlog * BACKLOG_GROWTH_TOLERANCE + BACKLOG_ABSOLUTE_TOLERANCE
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default="config/config.json")
+    parser.add_argument("--algorithms", nargs="+", default=["scheduling/RandomSelection.py", "scheduling/DriftPlusPenalty.py"])
+    parser.add_argument("--scheduling-options", type=json.loads, default={},
+                        help='스케줄링 알고리즘 생성자에 넘기는 인자. (예: \'{"v": 0.1}\') RandomSelection처럼 인자가 없는 알고리즘에는 넘기지 않습니다.')
+    parser.add_argument("--capacity", nargs=3, action="append", default=[], metavar=("IP", "GFLOPS_PER_MS", "KB_PER_MS"),
+                        help="노드의 계산 capacity(GFLOPs/ms)와 전송 capacity(KB/ms). 주지 않은 노드는 LayeredGraph의 기본값을 사용합니다.")
+    parser.add_argument("--rates", nargs="+", type=float, default=[1, 2, 4, 6, 8, 10, 12, 15, 20, 25, 30, 35, 40])
+    parser.add_argument("--duration", type=float, default=120.0) # sec
+    parser.add_argument("--slot", type=float, default=0.01) # sec
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as file:
+        config = json.load(file)
+
+    capacities = [(ip, float(computing_capacity), float(transfer_capacity)) for ip, computing_capacity, transfer_capacity in args.capacity]
+
+    for algorithm in args.algorithms:
+        max_stable_rate = 0
+
+        for rate in sorted(args.rates):
+            scheduling_options = args.scheduling_options if algorithm.endswith("DriftPlusPenalty.py") else {}
+            backlogs = simulate(config, algorithm, scheduling_options, capacities, rate, args.duration, args.slot, args.seed)
+            stable = is_stable(backlogs)
+            print(f"{algorithm}: {rate:.1f} fps, final backlog {backlogs[-1]:.3f} sec, {'stable' if stable else 'diverging'}")
+
+            if not stable:
+                break
+
+            max_stable_rate = rate
+
+        print(f"{algorithm}: max stable rate {max_stable_rate:.1f} fps")
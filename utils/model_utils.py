@@ -0,0 +1,268 @@
+import os
+from typing import Dict, List, Tuple, Callable, Optional, Union
+
+import torch
+from torchvision.models import resnet18, mobilenet_v2
+from calflops import calculate_flops
+from yolov5.Yolov5 import P1, P2, P3, P4, P4Head, Partition, postprocess, get_postprocess_gflops, get_live_tensor_names, NUM_SUBMODULES, POSTPROCESS_INDEX
+
+ONNX_DIRECTORY = "onnx"
+KB_PER_BYTE = 1024
+PIXEL_MAX = 255
+
+def split_model(model: torch.nn.Module, split_point, flatten_index: int) -> torch.nn.Module:
+    start, end = split_point
+    layers = list(model.children())
+    if flatten_index != None:
+        layers.insert(flatten_index, torch.nn.Flatten())
+    splited_model = torch.nn.Sequential(*layers[start:end])
+    return splited_model
+
+def load_model(model_name, submodules: Optional[Tuple[int, int]] = None) -> torch.nn.Module:
+    """
+    모델을 불러옵니다. submodules가 주어지면 [start, end) 구간의 서브모듈만 실행하는 파티션을 반환합니다. (yolov5만 지원)
+    """
+    available_model_list = ["yolov5", "resnet-18", "resnet-50", "mobilenet_v2"]
+
+    assert model_name in available_model_list, f"Model must be in {available_model_list}."
+    assert submodules is None or model_name == "yolov5", "Only yolov5 can be split into submodules."
+
+    if submodules is not None:
+        return Partition(*submodules)
+
+    if model_name == "yolov5":
+        models = torch.nn.Sequential(P1(), P2(), P3(), P4())
+        return models
+    
+    elif model_name == "resnet-18":
+        model = resnet18(pretrained=True)
+        model.eval()
+        return model
+    
+    elif model_name == "resnet-50":
+        return None
+    
+    elif model_name == "mobilenet_v2":
+        model = mobilenet_v2(pretrained=True)
+        model.eval()
+        return model
+    
+def load_partitions(model_name, submodules: Optional[Tuple[int, int]] = None) -> List[Tuple[str, torch.nn.Module]]:
+    """
+    모델을 ONNX로 내보낼 수 있는 파티션 단위로 나누어 반환합니다.
+    yolov5는 P1 ~ P4로 나뉘며, P4는 NMS를 제외한 P4Head로 대체됩니다. (NMS는 get_postprocess로 따로 실행)
+    submodules가 주어지면 그 구간이 NMS를 제외한 하나의 파티션입니다. 후처리만 실행하는 구간은 파티션이 없습니다.
+    그 외의 모델은 모델 전체가 하나의 파티션입니다.
+
+    Returns:
+        List[Tuple[str, torch.nn.Module]]: 파티션 이름과 파티션.
+    """
+    if submodules is not None:
+        start, end = submodules
+        end = min(end, POSTPROCESS_INDEX)
+
+        return [(f"M{start}-{end}", Partition(start, end))] if start < end else []
+
+    if model_name == "yolov5":
+        return [("P1", P1()), ("P2", P2()), ("P3", P3()), ("P4", P4Head())]
+    
+    return [(model_name, load_model(model_name))]
+
+def get_postprocess(model_name, submodules: Optional[Tuple[int, int]] = None) -> Optional[Callable]:
+    """
+    load_partitions의 마지막 파티션 이후에 실행해야 하는 후처리 함수를 반환합니다. 없다면 None을 반환합니다.
+    """
+    if submodules is not None and submodules[1] <= POSTPROCESS_INDEX:
+        return None
+
+    if model_name == "yolov5":
+        return postprocess
+    
+    return None
+
+class _ONNXExportPartition(torch.nn.Module):
+    """
+    파티션의 출력 중 입력을 그대로 넘겨주는 출력(예: P3의 x24)을 제외하는 래퍼입니다.
+    ONNX는 입력과 출력이 같은 이름을 가질 수 없으므로, 이러한 텐서는 ONNXModel이 이름으로 이어서 전달합니다.
+    """
+    def __init__(self, partition: torch.nn.Module, output_indexes: List[int]):
+        super().__init__()
+        self.partition = partition
+        self.output_indexes = output_indexes
+
+    def forward(self, x):
+        outputs = self.partition(x)
+
+        if not isinstance(outputs, list):
+            return outputs
+
+        return [outputs[i] for i in self.output_indexes]
+
+def normalize_frame(frame: torch.Tensor) -> torch.Tensor:
+    """
+    sender가 보낸 uint8 프레임 [N, H, W, C] (BGR)을 모델 입력 [N, C, H, W] (RGB, 0 ~ 1의 float32)으로 바꿉니다.
+    프레임은 uint8로 전송하고, 첫 번째 모델을 실행하는 노드에서만 바꿉니다.
+    """
+    return frame.permute(0, 3, 1, 2).flip(1).float().div(PIXEL_MAX).contiguous()
+
+def get_example_input(model_name, input_size, submodules: Optional[Tuple[int, int]] = None) -> Union[torch.Tensor, List[torch.Tensor]]:
+    """
+    모델(또는 서브모듈 구간)의 예시 입력을 반환합니다. 구간이 처음부터 시작하지 않는다면 앞 구간을 실행하여 살아 있는 텐서들을 만듭니다.
+    """
+    x = torch.zeros(input_size)
+
+    if submodules is None or submodules[0] == 0:
+        return x
+
+    with torch.no_grad():
+        return Partition(0, submodules[0])(x)
+
+class _ArgsModule(torch.nn.Module):
+    """
+    리스트를 입력으로 받는 모델을 텐서 인자들로 호출할 수 있도록 감싸는 래퍼입니다. (calflops는 텐서 인자만 지원합니다.)
+    """
+    def __init__(self, model: torch.nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, *x):
+        return self.model(list(x) if len(x) > 1 else x[0])
+
+def calculate_gflops(model: torch.nn.Module, x: Union[torch.Tensor, List[torch.Tensor]]) -> float:
+    """
+    모델이 입력 x를 계산하는 데 필요한 계산량을 반환합니다. (GFLOPs)
+    """
+    args = x if isinstance(x, list) else [x]
+
+    gflops = 0.0
+
+    # Concat, Upsample처럼 파라미터가 없는 모델은 계산량이 거의 없습니다. (calflops는 파라미터가 없는 모델을 지원하지 않습니다.)
+    if next(model.parameters(), None) is not None:
+        with torch.no_grad():
+            FLOPs, _, _ = calculate_flops(model=_ArgsModule(model),
+                                          args=list(args),
+                                          output_as_string=False,
+                                          output_precision=4,
+                                          print_results=False)
+        gflops += FLOPs * 1e-9
+
+    # 후처리(NMS)는 모듈이 아니므로 calflops가 세지 못합니다.
+    if isinstance(model, Partition) and model.end > POSTPROCESS_INDEX:
+        with torch.no_grad():
+            pred = x if model.start == POSTPROCESS_INDEX else Partition(model.start, POSTPROCESS_INDEX)(x)
+
+        gflops += get_postprocess_gflops(pred)
+
+    return gflops
+
+def get_bytes(x: Union[torch.Tensor, List[torch.Tensor]], transfer_dtype: Optional[str] = None) -> int:
+    """
+    텐서(또는 텐서 리스트)의 크기를 반환합니다. (Byte)
+    transfer_dtype이 주어지면 실수 텐서를 그 정밀도로 바꾸었을 때의 크기를 반환합니다.
+    """
+    tensors = x if isinstance(x, (list, tuple)) else [x]
+    transfer_element_size = torch.empty(0, dtype=getattr(torch, transfer_dtype)).element_size() if transfer_dtype is not None else None
+
+    return sum(tensor.numel() * (transfer_element_size if transfer_element_size is not None and tensor.is_floating_point() else tensor.element_size()) for tensor in tensors)
+
+def profile_cuts(input_size, transfer_dtype: str = "float16") -> List[Dict[str, any]]:
+    """
+    yolov5의 서브모듈 사이의 모든 위치(0 ~ 35)에서 잘랐을 때의 정보를 반환합니다. 34번 서브모듈은 후처리(NMS)입니다.
+    전달하는 텐서는 이후 서브모듈이 읽는 텐서(live_tensors)뿐이며, transfer_dtype으로 보냈을 때 줄어드는 크기도 함께 반환합니다.
+
+    Returns:
+        List[Dict[str, any]]: 자르는 위치마다
+            cut (int): cut번째 서브모듈 앞에서 자릅니다.
+            live_tensors (List[str]): 다음 파티션으로 전달해야 하는 텐서 이름.
+            activation_KB (float): 전달해야 하는 텐서들의 크기. (KB)
+            shipped_KB (float): 전달해야 하는 텐서들을 transfer_dtype으로 보낼 때의 크기. (KB)
+            saved_KB (float): activation_KB - shipped_KB. (KB)
+            head_GFLOPs (float): [0, cut) 구간의 계산량. (GFLOPs)
+            tail_GFLOPs (float): [cut, 35) 구간의 계산량. (GFLOPs)
+    """
+    x = torch.zeros(input_size)
+    submodule_gflops = []
+    activation_KBs = [get_bytes(x) / KB_PER_BYTE]
+    shipped_KBs = [get_bytes(x, transfer_dtype) / KB_PER_BYTE]
+
+    # 서브모듈 하나씩의 파티션을 이어서 실행하면, 각 위치에서 살아 있는 텐서들이 그대로 다음 파티션의 입력이 됩니다.
+    for index in range(POSTPROCESS_INDEX + 1):
+        partition = Partition(index, index + 1)
+        submodule_gflops.append(calculate_gflops(partition, x))
+
+        with torch.no_grad():
+            x = partition(x)
+
+        activation_KBs.append(get_bytes(x) / KB_PER_BYTE)
+        shipped_KBs.append(get_bytes(x, transfer_dtype) / KB_PER_BYTE)
+
+    total_gflops = sum(submodule_gflops)
+    cuts = []
+
+    for cut in range(POSTPROCESS_INDEX + 2):
+        head_gflops = sum(submodule_gflops[:cut])
+
+        cuts.append({
+            "cut": cut,
+            "live_tensors": get_live_tensor_names(cut),
+            "activation_KB": activation_KBs[cut],
+            "shipped_KB": shipped_KBs[cut],
+            "saved_KB": activation_KBs[cut] - shipped_KBs[cut],
+            "head_GFLOPs": head_gflops,
+            "tail_GFLOPs": total_gflops - head_gflops,
+        })
+
+    return cuts
+
+def export_onnx(model_name, input_size, dynamic_batch: bool = False, directory: str = ONNX_DIRECTORY, submodules: Optional[Tuple[int, int]] = None) -> List[str]:
+    """
+    모델의 각 파티션을 ONNX 파일로 내보내고, 파일 경로 목록을 파티션 순서대로 반환합니다.
+    이미 내보낸 파일이 있다면 다시 내보내지 않습니다.
+
+    파티션의 입출력 이름은 파티션의 input_names, output_names를 따르며 (예: P1의 출력 x5, x7, x9, x12),
+    이름이 없는 파티션은 x, y를 사용합니다. 입력을 그대로 넘겨주는 출력은 ONNX 출력에서 제외됩니다.
+
+    Args:
+        model_name (str): 모델 이름.
+        input_size (Tuple[int, ...]): 모델의 입력 크기.
+        dynamic_batch (bool): True라면 batch 차원을 동적으로 내보냅니다.
+        directory (str): ONNX 파일을 저장할 폴더.
+        submodules (Optional[Tuple[int, int]]): 내보낼 서브모듈 구간 [start, end). None이라면 모델 전체를 내보냅니다.
+
+    Returns:
+        List[str]: ONNX 파일 경로 목록.
+    """
+    batch_name = "dynamic" if dynamic_batch else f"b{input_size[0]}"
+    model_directory = os.path.join(directory, model_name)
+    os.makedirs(model_directory, exist_ok=True)
+
+    onnx_paths = []
+    x = get_example_input(model_name, input_size, submodules)
+
+    for partition_name, partition in load_partitions(model_name, submodules):
+        partition.eval()
+
+        input_names = getattr(partition, "input_names", ["x"])
+        output_names = getattr(partition, "output_names", ["y"])
+        onnx_path = os.path.join(model_directory, f"{partition_name}_{batch_name}.onnx")
+
+        if not os.path.exists(onnx_path):
+            output_indexes = [i for i, name in enumerate(output_names) if name not in input_names]
+            output_names = [output_names[i] for i in output_indexes]
+            dynamic_axes = {name: {0: "batch"} for name in input_names + output_names} if dynamic_batch else None
+
+            with torch.no_grad():
+                torch.onnx.export(_ONNXExportPartition(partition, output_indexes), 
+                                  (x,), 
+                                  onnx_path, 
+                                  input_names=input_names, 
+                                  output_names=output_names, 
+                                  dynamic_axes=dynamic_axes)
+
+        onnx_paths.append(onnx_path)
+
+        # 다음 파티션의 예시 입력
+        with torch.no_grad():
+            x = partition(x)
+
+    return onnx_paths
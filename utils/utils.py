@@ -1,13 +1,20 @@
 import subprocess, socket, re, os
-from typing import Dict
+from typing import Dict, Sequence
 
 import csv
+import numpy as np
 
-import torch
-from torchvision.models import resnet18, mobilenet_v2
-from yolov5.Yolov5 import P1, P2, P3, P4
+# 에뮬레이션(emulation/VirtualNode.py)에서 프로그램을 실행할 가상 노드의 IP 주소입니다.
+ADDRESS_ENVIRONMENT_VARIABLE = "MDC_ADDRESS"
+
+# save_latency_percentiles가 기록하는 지연 시간 백분위수입니다.
+LATENCY_PERCENTILES = [50, 90, 95, 99]
 
 def get_ip_address(interface_name=["eth0"]):
+    # 가상 노드라면 인터페이스 대신 주어진 IP 주소를 사용합니다.
+    if os.environ.get(ADDRESS_ENVIRONMENT_VARIABLE):
+        return os.environ[ADDRESS_ENVIRONMENT_VARIABLE]
+
     # check os
     for interface in interface_name:
 
@@ -53,6 +60,69 @@ def save_latency(file_path: str, latency: float):
         # 데이터 행을 파일에 씁니다. 소수점 둘째자리까지 반올림
         writer.writerow([round(latency, 2)])
 
+def save_send_rate(file_path: str, target_fps: float, achieved_fps: float, latency: float):
+    # 파일이 존재하는지 확인
+    file_exists = os.path.exists(file_path)
+
+    # 파일에 데이터 쓰기
+    with open(file_path, 'a', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+
+        # 파일이 새로 만들어진 경우 열 이름을 씁니다.
+        if not file_exists:
+            writer.writerow(["target fps", "achieved fps", "latency (ms)"])
+
+        # 데이터 행을 파일에 씁니다. 소수점 둘째자리까지 반올림
+        writer.writerow([round(target_fps, 2), round(achieved_fps, 2), round(latency, 2) if latency is not None else None])
+
+def save_schedule_cache_stats(file_path: str, stats: Dict[str, int]):
+    # 파일이 존재하는지 확인
+    file_exists = os.path.exists(file_path)
+
+    # 파일에 데이터 쓰기
+    with open(file_path, 'a', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+
+        # 파일이 새로 만들어진 경우 열 이름을 씁니다.
+        if not file_exists:
+            writer.writerow(list(stats.keys()))
+
+        writer.writerow(list(stats.values()))
+
+def get_latency_stats(latencies: Sequence[float], latency_slo: float) -> Dict[str, float]:
+    """
+    한 작업의 지연 시간으로 백분위수와 SLO를 지킨 비율을 계산합니다.
+
+    Args:
+        latencies (Sequence[float]): 작업의 종단 간 지연 시간들. (ms, 비어 있으면 안 됩니다.)
+        latency_slo (float): 작업의 지연 시간 SLO. (ms)
+
+    Returns:
+        Dict[str, float]: p50, p90, p95, p99, count, latency_slo, slo_attainment. (save_latency_percentiles와 같은 형식)
+    """
+    latencies = np.asarray(latencies, dtype=float)
+    stats = {f"p{q}": float(value) for q, value in zip(LATENCY_PERCENTILES, np.percentile(latencies, LATENCY_PERCENTILES))}
+    stats["count"] = len(latencies)
+    stats["latency_slo"] = latency_slo
+    stats["slo_attainment"] = float(np.mean(latencies <= latency_slo))
+    return stats
+
+def save_latency_percentiles(file_path: str, percentiles: Dict[str, Dict[str, float]]):
+    # 파일이 존재하는지 확인
+    file_exists = os.path.exists(file_path)
+
+    # 파일에 데이터 쓰기
+    with open(file_path, 'a', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+
+        # 파일이 새로 만들어진 경우 열 이름을 씁니다.
+        if not file_exists:
+            writer.writerow(["job", "count", "p50 (ms)", "p90 (ms)", "p95 (ms)", "p99 (ms)", "latency slo (ms)", "slo attainment"])
+
+        # 작업마다 한 행씩 씁니다. 소수점 둘째자리까지 반올림
+        for job_name, stats in percentiles.items():
+            writer.writerow([job_name, stats["count"]] + [round(stats[key], 2) for key in ["p50", "p90", "p95", "p99", "latency_slo"]] + [round(stats["slo_attainment"], 4)])
+
 def save_virtual_backlog(file_path, virtual_backlog):
     # 파일이 존재하는지 확인
     file_exists = os.path.exists(file_path)
@@ -113,37 +183,6 @@ def save_path(file_path, path):
         # 각 path를 별도 컬럼으로 저장
         writer.writerow(path_list)
        
-def split_model(model: torch.nn.Module, split_point, flatten_index: int) -> torch.nn.Module:
-    start, end = split_point
-    layers = list(model.children())
-    if flatten_index != None:
-        layers.insert(flatten_index, torch.nn.Flatten())
-    splited_model = torch.nn.Sequential(*layers[start:end])
-    return splited_model
-
-def load_model(model_name) -> torch.nn.Module:
-
-    available_model_list = ["yolov5", "resnet-18", "resnet-50", "mobilenet_v2"]
-
-    assert model_name in available_model_list, f"Model must be in {available_model_list}."
-
-    if model_name == "yolov5":
-        models = torch.nn.Sequential(P1(), P2(), P3(), P4())
-        return models
-    
-    elif model_name == "resnet-18":
-        model = resnet18(pretrained=True)
-        model.eval()
-        return model
-    
-    elif model_name == "resnet-50":
-        return None
-    
-    elif model_name == "mobilenet_v2":
-        model = mobilenet_v2(pretrained=True)
-        model.eval()
-        return model
-    
 def ensure_path_exists(path, is_file=False):
     """
     지정된 경로에 폴더 또는 파일이 있는지 확인하고, 없으면 생성합니다.
@@ -0,0 +1,69 @@
+from typing import Optional
+
+import numpy as np
+import cv2
+
+# 입력 영상을 모델 입력 크기로 줄일 때의 보간법입니다.
+# INTER_CUBIC보다 계산량이 적고, 축소할 때의 화질 차이는 검출 결과에 거의 영향을 주지 않습니다.
+INTERPOLATION = cv2.INTER_LINEAR
+
+# 프레임을 보낼 때 사용할 수 있는 코덱과 확장자, 품질 옵션, 기본 품질입니다.
+# jpeg, webp의 품질은 1 ~ 100 (높을수록 화질이 좋음)이고, png는 무손실이므로 압축 수준 0 ~ 9 (높을수록 작고 느림)입니다.
+CODEC_EXTENSIONS = {
+    "jpeg": ".jpg",
+    "webp": ".webp",
+    "png": ".png",
+}
+CODEC_QUALITY_FLAGS = {
+    "jpeg": cv2.IMWRITE_JPEG_QUALITY,
+    "webp": cv2.IMWRITE_WEBP_QUALITY,
+    "png": cv2.IMWRITE_PNG_COMPRESSION,
+}
+DEFAULT_CODEC_QUALITIES = {
+    "jpeg": 90,
+    "webp": 90,
+    "png": 1,
+}
+
+def resize_frame(frame: np.ndarray, width: int, height: int) -> np.ndarray:
+    """
+    프레임을 (width, height) 크기로 줄입니다.
+    """
+    return cv2.resize(frame, (width, height), interpolation=INTERPOLATION)
+
+def encode_frame(frame: np.ndarray, codec: str, quality: Optional[int] = None) -> np.ndarray:
+    """
+    프레임을 코덱으로 압축하여 1차원 uint8 배열로 반환합니다.
+
+    Args:
+        frame (np.ndarray): [H, W, C] (BGR) uint8 프레임.
+        codec (str): 코덱 이름(jpeg, webp, png).
+        quality (Optional[int]): 코덱의 품질. None이라면 기본 품질을 사용합니다.
+
+    Raises:
+        ValueError: 지원하지 않는 코덱이거나 압축에 실패했을 때.
+    """
+    if codec not in CODEC_EXTENSIONS:
+        raise ValueError(f"Codec must be in {list(CODEC_EXTENSIONS.keys())}, but got {codec}.")
+
+    quality = DEFAULT_CODEC_QUALITIES[codec] if quality is None else quality
+    success, encoded_frame = cv2.imencode(CODEC_EXTENSIONS[codec], frame, [CODEC_QUALITY_FLAGS[codec], int(quality)])
+
+    if not success:
+        raise ValueError(f"Failed to encode frame with {codec}.")
+
+    return encoded_frame.reshape(-1)
+
+def decode_frame(encoded_frame: np.ndarray) -> np.ndarray:
+    """
+    encode_frame으로 압축한 1차원 uint8 배열을 [H, W, C] (BGR) uint8 프레임으로 되돌립니다. 코덱은 데이터로부터 알아냅니다.
+
+    Raises:
+        ValueError: 압축을 풀 수 없을 때.
+    """
+    frame = cv2.imdecode(encoded_frame, cv2.IMREAD_COLOR)
+
+    if frame is None:
+        raise ValueError("Failed to decode frame.")
+
+    return frame
@@ -1,3 +1,7 @@
+import os
+import threading
+from functools import partial
+
 import torch
 import torch.nn as nn
 import yaml
@@ -5,7 +9,8 @@ import numpy as np
 from yolov5.models.common import Conv, C3, SPPF, Concat
 from yolov5.models.yolo import Detect
 from torch.nn import Upsample
-from yolov5.utils.general import non_max_suppression
+import torchvision
+from yolov5.utils.general import xywh2xyxy
 
 device = 'cuda:0'
 
@@ -78,7 +83,8 @@ anchors:
 model_config = yaml.load(model_config_text, Loader=yaml.FullLoader)
 param_config = yaml.load(param_config_text, Loader=yaml.FullLoader)
 
-submodule_list = []
+submodule_factories = []
+submodule_sources = []
 module_map = {"Conv" : Conv, "C3" : C3, "SPPF" : SPPF, "Concat" : Concat, "nn.Upsample" : Upsample, "Detect" : Detect}
 
 no_channel_module = ["Concat", "nn.Upsample"]
@@ -87,76 +93,168 @@ depth_multiple_module = ["C3"]
 # model_multiple = {"n" : [0.33, 0.25], "s" : [0.33, 0.5], "m" : [0.67, 0.75], "l" : [1.0, 1.0], "x" : [1.33, 1.25]}
 H, W, C = 320, 320, 3
 
-a = 0
-index = 0
-
+# 서브모듈은 import 시점에 만들지 않고, 생성 함수만 만들어 둡니다.
+# 실제 서브모듈과 가중치는 파티션(P1 ~ P4)을 만들 때 get_submodule로 필요한 것만 불러옵니다.
 for part_name, parts  in model_config.items():
     for part in parts:
-        # print("P" + str(index))
-        _, depth, module_name, arg = part
+        source, depth, module_name, arg = part
 
         if module_name == "Conv":
             arg[0] = round(arg[0] * param_config["width_multiple"])
-            temp_module = Conv(C, *arg)
+            factory = partial(Conv, C, *arg)
             C = arg[0]
 
         elif module_name == "C3":
             arg[0] = round(arg[0] * param_config["width_multiple"])
-            temp_module = C3(C, arg[0], n = max(1, int(round(depth * param_config["depth_multiple"], 1))))
-            # print("n : ", max(1, int(round(depth * param_config["depth_multiple"], 1))))
+            factory = partial(C3, C, arg[0], n = max(1, int(round(depth * param_config["depth_multiple"], 1))))
             C = arg[0]
             
         elif module_name == "SPPF":
             arg[0] = round(arg[0] * param_config["width_multiple"])
-            temp_module = SPPF(C, *arg)
+            factory = partial(SPPF, C, *arg)
             C = arg[0]
 
         elif module_name == "Concat":
-            temp_module = Concat(*arg)
+            factory = partial(Concat, *arg)
             C *= 2
 
         elif module_name == "nn.Upsample":
-            temp_module = nn.Upsample(size = None, scale_factor = arg[1], mode = arg[2])
+            factory = partial(nn.Upsample, size = None, scale_factor = arg[1], mode = arg[2])
 
         elif module_name == "Detect":
-            temp_module = Detect(param_config["nc"], param_config["anchors"], (round(256 * param_config["width_multiple"]), round(512 * param_config["width_multiple"]), round(768 * param_config["width_multiple"]), round(1024 * param_config["width_multiple"])))
+            factory = partial(Detect, param_config["nc"], param_config["anchors"], (round(256 * param_config["width_multiple"]), round(512 * param_config["width_multiple"]), round(768 * param_config["width_multiple"]), round(1024 * param_config["width_multiple"])))
+
+        submodule_factories.append(factory)
+        submodule_sources.append(source)
+
+NUM_SUBMODULES = len(submodule_factories)
+# Detect 다음의 후처리(박스 디코딩, NMS)는 NUM_SUBMODULES번 서브모듈처럼 다룹니다.
+# 따라서 [NUM_SUBMODULES, NUM_SUBMODULES + 1) 구간은 후처리만 실행하는 stage입니다.
+POSTPROCESS_INDEX = NUM_SUBMODULES
+
+WEIGHTS_DIRECTORY = "yolov5/weights"
+CONSOLIDATED_WEIGHTS_PATH = os.path.join(WEIGHTS_DIRECTORY, "yolov5.pt")
+
+_submodules = {}
+_consolidated_state_dict = None
+_submodule_mutex = threading.Lock()
+
+def _torch_load(path):
+    """
+    가중치 파일을 mmap으로 불러옵니다. mmap을 지원하지 않는 torch(< 2.1)에서는 일반적으로 불러옵니다.
+    mmap으로 불러온 텐서는 파일의 페이지 캐시를 가리키므로, 같은 호스트의 프로세스들이 가중치 페이지를 공유합니다.
+    """
+    try:
+        return torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+    except TypeError:
+        return torch.load(path, map_location="cpu")
+
+def _load_submodule_state_dict(index):
+    """
+    index번째 서브모듈의 state_dict를 반환합니다.
+    통합 가중치 파일(yolov5.pt)이 있다면 그 파일에서 "M{index}." 키만 가져오고, 없다면 P{index}.pt를 불러옵니다.
+    """
+    global _consolidated_state_dict
+
+    if _consolidated_state_dict is None and os.path.exists(CONSOLIDATED_WEIGHTS_PATH):
+        _consolidated_state_dict = _torch_load(CONSOLIDATED_WEIGHTS_PATH)
+
+    if _consolidated_state_dict is None:
+        return _torch_load(os.path.join(WEIGHTS_DIRECTORY, f"P{index}.pt"))
+
+    prefix = f"M{index}."
+    return {key[len(prefix):]: value for key, value in _consolidated_state_dict.items() if key.startswith(prefix)}
+
+def get_submodule(index):
+    """
+    index번째 서브모듈을 반환합니다. 처음 요청될 때 서브모듈을 만들고 가중치를 불러옵니다.
+    mmap으로 불러온 가중치를 복사하지 않고 그대로 파라미터로 사용합니다. (torch >= 2.1의 assign)
+    """
+    with _submodule_mutex:
+        if index in _submodules:
+            return _submodules[index]
+
+        submodule = submodule_factories[index]()
+        state_dict = _load_submodule_state_dict(index)
+
+        try:
+            submodule.load_state_dict(state_dict, assign=True)
+        except TypeError:
+            submodule.load_state_dict(state_dict)
 
-        # for name, param in temp_module.state_dict().items():
-        #     print(name)
+        submodule.eval()
 
-        # print(max(1, int(round(depth * param_config["depth_multiple"], 1))))
+        if index == NUM_SUBMODULES - 1:
+            submodule.stride = torch.tensor([8, 16, 32, 64])
 
-        submodule_list.append(temp_module)
+        _submodules[index] = submodule
 
-        a += len(temp_module.state_dict())
-        index += 1
+        return submodule
 
-# print(a)
+def consolidate_weights(directory = WEIGHTS_DIRECTORY, path = CONSOLIDATED_WEIGHTS_PATH):
+    """
+    P{i}.pt로 나뉜 서브모듈 가중치를 "M{i}." 키를 붙여 하나의 파일로 합칩니다.
+    프로젝트 루트에서 python -m yolov5.Yolov5 로 실행합니다.
+    """
+    state_dict = {}
 
+    for index in range(NUM_SUBMODULES):
+        for key, value in torch.load(os.path.join(directory, f"P{index}.pt"), map_location="cpu", weights_only=True).items():
+            state_dict[f"M{index}.{key}"] = value
 
-i = 0
-for submodule in submodule_list:
-    submodule.load_state_dict(torch.load(f"yolov5/weights/P{i}.pt"))
-    submodule.eval()
-    i += 1
+    torch.save(state_dict, path)
+
+def get_tensor_name(index):
+    """
+    index번째 텐서의 이름을 반환합니다. 모델 입력은 x, i번째 서브모듈의 출력은 x{i + 1}입니다. (P1 ~ P4의 이름과 같습니다.)
+    """
+    return "x" if index == 0 else f"x{index}"
+
+def get_input_indexes(index):
+    """
+    index번째 서브모듈이 읽는 텐서 번호들을 반환합니다. (예: 14번째 Concat은 x14와 x9를 읽습니다.)
+    """
+    sources = submodule_sources[index] if isinstance(submodule_sources[index], list) else [submodule_sources[index]]
+
+    return [index if source == -1 else source + 1 for source in sources]
+
+def get_live_tensor_names(cut):
+    """
+    cut번째 서브모듈 앞에서 자를 때, 이후 서브모듈이 읽어야 하는 텐서(skip connection 포함)의 이름을 번호 순서대로 반환합니다.
+    예를 들어 12에서 자르면 x5, x7, x9, x12가 살아 있습니다.
+    """
+    if cut == 0:
+        return [get_tensor_name(0)]
+
+    if cut == POSTPROCESS_INDEX:
+        return ["pred"]
+
+    if cut == POSTPROCESS_INDEX + 1:
+        return ["detections"]
+
+    live_indexes = {input_index for index in range(cut, NUM_SUBMODULES) for input_index in get_input_indexes(index) if input_index <= cut}
+
+    return [get_tensor_name(index) for index in sorted(live_indexes)]
 
-submodule_list[-1].stride = torch.tensor([8, 16, 32, 64])
 
 class P1(nn.Module):
+    input_names = ["x"]
+    output_names = ["x5", "x7", "x9", "x12"]
+
     def __init__(self):
         super().__init__()
-        self.M0 = submodule_list[0]
-        self.M1 = submodule_list[1]
-        self.M2 = submodule_list[2]
-        self.M3 = submodule_list[3]
-        self.M4 = submodule_list[4]
-        self.M5 = submodule_list[5]
-        self.M6 = submodule_list[6]
-        self.M7 = submodule_list[7]
-        self.M8 = submodule_list[8]
-        self.M9 = submodule_list[9]
-        self.M10 = submodule_list[10]
-        self.M11 = submodule_list[11]
+        self.M0 = get_submodule(0)
+        self.M1 = get_submodule(1)
+        self.M2 = get_submodule(2)
+        self.M3 = get_submodule(3)
+        self.M4 = get_submodule(4)
+        self.M5 = get_submodule(5)
+        self.M6 = get_submodule(6)
+        self.M7 = get_submodule(7)
+        self.M8 = get_submodule(8)
+        self.M9 = get_submodule(9)
+        self.M10 = get_submodule(10)
+        self.M11 = get_submodule(11)
 
     def forward(self, x):
         x1 = self.M0(x)
@@ -175,20 +273,23 @@ class P1(nn.Module):
         return [x5, x7, x9, x12]
 
 class P2(nn.Module):
+    input_names = ["x5", "x7", "x9", "x12"]
+    output_names = ["x13", "x17", "x21", "x24"]
+
     def __init__(self):
         super().__init__()
-        self.M12 = submodule_list[12]
-        self.M13 = submodule_list[13]
-        self.M14 = submodule_list[14]
-        self.M15 = submodule_list[15]
-        self.M16 = submodule_list[16]
-        self.M17 = submodule_list[17]
-        self.M18 = submodule_list[18]
-        self.M19 = submodule_list[19]
-        self.M20 = submodule_list[20]
-        self.M21 = submodule_list[21]
-        self.M22 = submodule_list[22]
-        self.M23 = submodule_list[23]
+        self.M12 = get_submodule(12)
+        self.M13 = get_submodule(13)
+        self.M14 = get_submodule(14)
+        self.M15 = get_submodule(15)
+        self.M16 = get_submodule(16)
+        self.M17 = get_submodule(17)
+        self.M18 = get_submodule(18)
+        self.M19 = get_submodule(19)
+        self.M20 = get_submodule(20)
+        self.M21 = get_submodule(21)
+        self.M22 = get_submodule(22)
+        self.M23 = get_submodule(23)
 
     def forward(self, x):
         x5, x7, x9, x12 = x
@@ -209,17 +310,20 @@ class P2(nn.Module):
         
 
 class P3(nn.Module):
+    input_names = ["x13", "x17", "x21", "x24"]
+    output_names = ["x24", "x27", "x30", "x33"]
+
     def __init__(self):
         super().__init__()
-        self.M24 = submodule_list[24]
-        self.M25 = submodule_list[25]
-        self.M26 = submodule_list[26]
-        self.M27 = submodule_list[27]
-        self.M28 = submodule_list[28]
-        self.M29 = submodule_list[29]
-        self.M30 = submodule_list[30]
-        self.M31 = submodule_list[31]
-        self.M32 = submodule_list[32]
+        self.M24 = get_submodule(24)
+        self.M25 = get_submodule(25)
+        self.M26 = get_submodule(26)
+        self.M27 = get_submodule(27)
+        self.M28 = get_submodule(28)
+        self.M29 = get_submodule(29)
+        self.M30 = get_submodule(30)
+        self.M31 = get_submodule(31)
+        self.M32 = get_submodule(32)
 
 
     def forward(self, x):
@@ -237,10 +341,79 @@ class P3(nn.Module):
 
         return [x24, x27, x30, x33]
 
-class P4(nn.Module):
+MAX_NMS = 30000 # 이미지마다 NMS에 넣는 최대 박스 수
+POSTPROCESS_FLOPS_PER_ELEMENT = 1 # pred 원소 하나당 후처리 연산 수 (objectness 임계값 비교, 후보의 클래스 점수 계산)
+
+def _keep_top_per_image(order, image_indexes, num_images, k):
+    """
+    order(박스 인덱스, 점수 내림차순)를 이미지 번호로 안정 정렬한 뒤, 이미지 안에서의 순위가 k보다 작은 것만 남깁니다.
+    이미지마다 반복하지 않고 이미지별 누적 개수(cumsum)로 순위를 구합니다.
+    """
+    sorted_image_indexes, image_order = torch.sort(image_indexes[order], stable=True)
+    order = order[image_order]
+    counts = torch.bincount(sorted_image_indexes, minlength=num_images)
+    ranks = torch.arange(len(order), device=order.device) - (torch.cumsum(counts, 0) - counts)[sorted_image_indexes]
+
+    return order[ranks < k]
+
+def postprocess(pred, conf_thres = 0.3, iou_thres = 0.45, max_det = 300):
+    """
+    Detect head의 출력(pred)에서 여러 이미지의 박스를 한 번에 디코딩하고 NMS를 실행합니다.
+    이미지마다 반복하지 않고, (이미지 번호, 클래스)마다 박스 좌표를 옮겨 torchvision의 NMS를 한 번 실행합니다.
+    결과는 non_max_suppression(pred, 0.3)과 같지만, 이미지별 리스트가 아닌 하나의 텐서로 반환합니다.
+
+    Args:
+        pred (torch.Tensor): [batch, boxes, 5 + classes] 크기의 Detect head 출력. (xywh, objectness, class scores)
+        conf_thres (float): confidence 임계값.
+        iou_thres (float): NMS IoU 임계값.
+        max_det (int): 이미지당 최대 검출 수.
+
+    Returns:
+        torch.Tensor: [detections, 7] 크기의 검출 결과. (image index, x1, y1, x2, y2, confidence, class)
+            이미지 번호 순서이며, 같은 이미지 안에서는 confidence가 높은 순서입니다.
+    """
+    # objectness로 먼저 거른 후보만 클래스 점수를 계산합니다.
+    image_indexes, box_indexes = (pred[..., 4] > conf_thres).nonzero(as_tuple=True)
+    candidates = pred[image_indexes, box_indexes]
+    scores, classes = (candidates[:, 5:] * candidates[:, 4:5]).max(1)
+
+    confident = scores > conf_thres
+    image_indexes, candidates, scores, classes = image_indexes[confident], candidates[confident], scores[confident], classes[confident]
+    boxes = xywh2xyxy(candidates[:, :4])
+
+    # yolov5처럼 이미지마다 점수가 높은 MAX_NMS개만 NMS에 넣으므로, 박스가 많은 이미지가 다른 이미지의 박스를 밀어내지 않습니다.
+    if len(scores) > MAX_NMS:
+        candidates = _keep_top_per_image(scores.argsort(descending=True), image_indexes, pred.shape[0], MAX_NMS)
+        image_indexes, boxes, scores, classes = image_indexes[candidates], boxes[candidates], scores[candidates], classes[candidates]
+
+    # (이미지 번호, 클래스)가 다른 박스끼리 겹치지 않도록 그룹마다 좌표를 옮긴 뒤 한 번의 NMS로 IoU를 계산합니다.
+    num_classes = pred.shape[-1] - 5
+    groups = image_indexes * num_classes + classes
+    offsets = groups.to(boxes.dtype) * (boxes.max() + 1) if len(boxes) > 0 else groups.to(boxes.dtype)
+    keep = torchvision.ops.nms(boxes + offsets[:, None], scores, iou_thres) # confidence 내림차순
+
+    # 이미지 번호 순서로, 이미지 안에서의 순위가 max_det보다 작은 검출만 남깁니다.
+    keep = _keep_top_per_image(keep, image_indexes, pred.shape[0], max_det)
+
+    return torch.cat((image_indexes[keep, None].float(), boxes[keep], scores[keep, None], classes[keep, None].float()), 1)
+
+def get_postprocess_gflops(pred):
+    """
+    후처리의 계산량을 반환합니다. (GFLOPs)
+    후처리는 nn.Module이 아니므로 calflops가 세지 못하며, pred의 원소 수에 비례한다고 추정합니다.
+    """
+    return pred.numel() * POSTPROCESS_FLOPS_PER_ELEMENT * 1e-9
+
+class P4Head(nn.Module):
+    """
+    NMS를 제외한 P4입니다. Detect head의 출력(pred)만 반환하므로 ONNX로 내보낼 수 있습니다.
+    """
+    input_names = ["x24", "x27", "x30", "x33"]
+    output_names = ["pred"]
+
     def __init__(self):
         super().__init__()
-        self.M33 = submodule_list[33]
+        self.M33 = get_submodule(33)
 
     def forward(self, x):
         x24, x27, x30, x33 = x
@@ -248,21 +421,71 @@ class P4(nn.Module):
         x34 = self.M33([x24, x27, x30, x33])
 
         pred = from_numpy(x34[0]) if len(x34) == 1 else [from_numpy(x) for x in x34]
-        pred = non_max_suppression(pred[0], 0.3)
+
+        return pred[0]
+
+class P4(P4Head):
+    def forward(self, x):
+        pred = super().forward(x)
+        pred = postprocess(pred)
 
         return pred
     
 
-# p1 = P1()
-# p2 = P2()
-# p3 = P3()
-# p4 = P4()
-
-# def warm_up():
-#     dummy = torch.rand(1, 3, 320, 320)
-#     x = p1(dummy)
-#     x = p2(x)
-#     x = p3(x)
-#     x = p4(x)
-    
-# warm_up()
\ No newline at end of file
+class Partition(nn.Module):
+    """
+    서브모듈 [start, end) 구간을 실행하는 파티션입니다. P1 ~ P4와 달리 임의의 위치에서 자를 수 있습니다.
+    입력은 start에서 살아 있는 텐서, 출력은 end에서 살아 있는 텐서이며 이름 순서를 따릅니다.
+    end가 NUM_SUBMODULES라면 Detect head의 출력(pred)을 반환하고, NUM_SUBMODULES + 1이라면 후처리(NMS)한 detections를 반환합니다.
+    따라서 [NUM_SUBMODULES, NUM_SUBMODULES + 1) 파티션은 pred를 입력으로 받아 후처리만 실행합니다.
+
+    Attributes:
+        start (int): 처음 실행할 서브모듈 번호.
+        end (int): 실행하지 않는 첫 서브모듈 번호.
+        input_names (List[str]): 입력 텐서 이름.
+        output_names (List[str]): 출력 텐서 이름.
+    """
+    def __init__(self, start, end):
+        """
+        Args:
+            start (int): 처음 실행할 서브모듈 번호.
+            end (int): 실행하지 않는 첫 서브모듈 번호.
+
+        Raises:
+            ValueError: 구간이 올바르지 않을 때 발생합니다.
+        """
+        super().__init__()
+
+        if not 0 <= start < end <= POSTPROCESS_INDEX + 1:
+            raise ValueError(f"Invalid submodule range: [{start}, {end}). Range must be in [0, {POSTPROCESS_INDEX + 1}].")
+
+        self.start = start
+        self.end = end
+        self.input_names = get_live_tensor_names(start)
+        self.output_names = get_live_tensor_names(end)
+
+        for index in range(start, min(end, NUM_SUBMODULES)):
+            self.add_module(f"M{index}", get_submodule(index))
+
+    def forward(self, x):
+        x = x if isinstance(x, list) else [x]
+        tensors = dict(zip(self.input_names, x))
+
+        for index in range(self.start, min(self.end, NUM_SUBMODULES)):
+            input_names = [get_tensor_name(input_index) for input_index in get_input_indexes(index)]
+            submodule_input = [tensors[name] for name in input_names] if isinstance(submodule_sources[index], list) else tensors[input_names[0]]
+
+            tensors[get_tensor_name(index + 1)] = getattr(self, f"M{index}")(submodule_input)
+
+        if self.start < NUM_SUBMODULES <= self.end:
+            tensors["pred"] = tensors[get_tensor_name(NUM_SUBMODULES)][0]
+
+        if self.end == POSTPROCESS_INDEX + 1:
+            return postprocess(tensors["pred"])
+
+        outputs = [tensors[name] for name in self.output_names]
+
+        return outputs[0] if len(outputs) == 1 else outputs
+
+if __name__ == "__main__":
+    consolidate_weights()